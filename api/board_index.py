@@ -0,0 +1,319 @@
+"""
+Board interlock graph for grant_finder.
+Built once from the Leaders table: each leader row is resolved to its
+foundation's EIN and its person name is normalized (case, punctuation,
+'LAST, FIRST' order, honorifics and suffixes), giving a sparse person x
+foundation graph stored as CSR arrays in both directions. The foundation x
+foundation co-membership it implies (foundations sharing board members)
+is precomputed the same way, so person and connection lookups are array
+slices instead of name scans. Names are blocked on first + last name, so
+'JOHN A SMITH' and 'JOHN SMITH' come back together as possible matches
+without being merged into one person.
+"""
+
+import threading
+from itertools import permutations
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from api.foundation_aggregates import to_int
+from api.recipient_index import normalize_name
+from utils.table_scan import iter_table_rows
+
+LEADER_COLUMNS = 'leader_id, foundation_id, person_name, title, tax_period_end'
+FILING_NAME_COLUMNS = 'foundation_id, ein, organization_name, tax_period_end'
+
+# Dropped from person names before matching
+NAME_AFFIXES = {
+    'MR', 'MRS', 'MS', 'MISS', 'DR', 'REV', 'HON', 'PROF', 'SIR',
+    'JR', 'SR', 'II', 'III', 'IV', 'ESQ', 'MD', 'PHD', 'CPA', 'JD', 'CFA'
+}
+
+# A normalized name on more boards than this is almost certainly several
+# people sharing a common name; it is kept but does not link foundations
+MAX_INTERLOCK_BOARDS = 25
+
+
+def normalize_person(name: Optional[str]) -> str:
+    """'Smith, John A. Jr.' -> 'JOHN A SMITH' ('' when nothing is left)."""
+    if not name:
+        return ''
+    name = str(name)
+    if name.count(',') == 1:
+        last, first = name.split(',')
+        # 'JOHN SMITH, JR' is a suffix, not 'LAST, FIRST'
+        if normalize_name(first) not in NAME_AFFIXES:
+            name = f'{first} {last}'
+    tokens = [t for t in normalize_name(name).split(' ') if t and t not in NAME_AFFIXES]
+    return ' '.join(tokens)
+
+
+def name_block(person_key: str) -> str:
+    """Blocking key of a normalized name: first and last token."""
+    tokens = person_key.split(' ')
+    if len(tokens) < 2:
+        return person_key
+    return f'{tokens[0]} {tokens[-1]}'
+
+
+def _csr(group: np.ndarray, n_groups: int):
+    """(offsets, order): members of group g are order[offsets[g]:offsets[g + 1]]."""
+    order = np.argsort(group, kind='stable').astype(np.int32)
+    offsets = np.zeros(n_groups + 1, dtype=np.int64)
+    np.cumsum(np.bincount(group, minlength=n_groups), out=offsets[1:])
+    return offsets, order
+
+
+class BoardIndex:
+    """Person <-> foundation (EIN) board membership and foundation co-membership."""
+
+    def __init__(self):
+        self.person_keys: List[str] = []
+        self.person_names: List[str] = []
+        self.by_key: Dict[str, int] = {}
+        self.by_block: Dict[str, List[int]] = {}
+
+        self.eins: List[int] = []
+        self.ein_codes: Dict[int, int] = {}
+        self.foundation_names: List[str] = []
+
+        # Edges (one per person and EIN), sorted by person
+        self.edge_person = np.zeros(0, dtype=np.int32)
+        self.edge_ein = np.zeros(0, dtype=np.int32)
+        self.edge_filings = np.zeros(0, dtype=np.int32)
+        self.edge_titles: List[str] = []
+        self.edge_periods: List[str] = []
+        self.person_offsets = np.zeros(1, dtype=np.int64)
+        self.ein_offsets = np.zeros(1, dtype=np.int64)
+        self.ein_edges = np.zeros(0, dtype=np.int32)
+
+        # Co-membership: EIN code -> linked EIN codes and shared board member counts
+        self.link_offsets = np.zeros(1, dtype=np.int64)
+        self.link_ein = np.zeros(0, dtype=np.int32)
+        self.link_shared = np.zeros(0, dtype=np.int32)
+
+    @classmethod
+    def build(cls, filings, leaders) -> 'BoardIndex':
+        """Build from foundation filing rows and Leaders rows (iterables of dicts)."""
+        index = cls()
+
+        # foundation_id -> EIN; foundation name from the latest filing
+        ein_by_filing: Dict[str, int] = {}
+        latest_name: Dict[int, tuple] = {}
+        for filing in filings:
+            ein = to_int(filing.get('ein'))
+            if not ein or not filing.get('foundation_id'):
+                continue
+            ein_by_filing[filing['foundation_id']] = ein
+            period = str(filing.get('tax_period_end') or '')
+            if ein not in latest_name or period >= latest_name[ein][0]:
+                latest_name[ein] = (period, filing.get('organization_name') or '')
+
+        # (person, EIN) -> [latest period, title, display name, filing count]
+        edges: Dict[tuple, list] = {}
+        for leader in leaders:
+            ein = ein_by_filing.get(leader.get('foundation_id'))
+            key = normalize_person(leader.get('person_name'))
+            if ein is None or not key:
+                continue
+            person = index._person_code(key)
+            ein_code = index._ein_code(ein, latest_name.get(ein, ('', ''))[1])
+            period = str(leader.get('tax_period_end') or '')
+            edge = edges.get((person, ein_code))
+            if edge is None:
+                edges[(person, ein_code)] = [period, leader.get('title') or '', leader['person_name'], 1]
+                continue
+            edge[3] += 1
+            if period >= edge[0]:
+                edge[0], edge[1], edge[2] = period, leader.get('title') or '', leader['person_name']
+
+        index._finalize(edges)
+        return index
+
+    def _person_code(self, key: str) -> int:
+        code = self.by_key.get(key)
+        if code is None:
+            code = len(self.person_keys)
+            self.by_key[key] = code
+            self.person_keys.append(key)
+            self.person_names.append(key)
+            self.by_block.setdefault(name_block(key), []).append(code)
+        return code
+
+    def _ein_code(self, ein: int, name: str) -> int:
+        code = self.ein_codes.get(ein)
+        if code is None:
+            code = len(self.eins)
+            self.ein_codes[ein] = code
+            self.eins.append(ein)
+            self.foundation_names.append(name)
+        return code
+
+    def _finalize(self, edges: Dict[tuple, list]) -> None:
+        """Lay the edges out as CSR arrays and precompute co-membership."""
+        pairs = sorted(edges)
+        n_people, n_eins = len(self.person_keys), len(self.eins)
+
+        self.edge_person = np.array([p for p, _ in pairs], dtype=np.int32)
+        self.edge_ein = np.array([e for _, e in pairs], dtype=np.int32)
+        self.edge_filings = np.array([edges[pair][3] for pair in pairs], dtype=np.int32)
+        self.edge_periods = [edges[pair][0] for pair in pairs]
+        self.edge_titles = [edges[pair][1] for pair in pairs]
+
+        # Display name: the spelling on the person's most recent filing
+        latest = {}
+        for pair in pairs:
+            period, _, raw_name, _ = edges[pair]
+            if pair[0] not in latest or period >= latest[pair[0]][0]:
+                latest[pair[0]] = (period, raw_name)
+        for person, (_, raw_name) in latest.items():
+            self.person_names[person] = str(raw_name).strip()
+
+        self.person_offsets = np.zeros(n_people + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.edge_person, minlength=n_people), out=self.person_offsets[1:])
+        self.ein_offsets, self.ein_edges = _csr(self.edge_ein, n_eins)
+
+        # Every ordered pair of boards a person sits on links those two foundations
+        degrees = np.diff(self.person_offsets)
+        sources, targets = [], []
+        for person in np.nonzero((degrees > 1) & (degrees <= MAX_INTERLOCK_BOARDS))[0]:
+            boards = self.edge_ein[self.person_offsets[person]:self.person_offsets[person + 1]]
+            for a, b in permutations(boards.tolist(), 2):
+                sources.append(a)
+                targets.append(b)
+        if not sources:
+            self.link_offsets = np.zeros(n_eins + 1, dtype=np.int64)
+            return
+
+        link_keys, shared = np.unique(
+            np.array(sources, dtype=np.int64) * n_eins + np.array(targets, dtype=np.int64),
+            return_counts=True
+        )
+        link_source = (link_keys // n_eins).astype(np.int32)
+        self.link_ein = (link_keys % n_eins).astype(np.int32)
+        self.link_shared = shared.astype(np.int32)
+        self.link_offsets = np.zeros(n_eins + 1, dtype=np.int64)
+        np.cumsum(np.bincount(link_source, minlength=n_eins), out=self.link_offsets[1:])
+
+    def _boards(self, person: int) -> List[Dict]:
+        boards = []
+        for edge in range(self.person_offsets[person], self.person_offsets[person + 1]):
+            ein_code = int(self.edge_ein[edge])
+            boards.append({
+                'foundation_ein': self.eins[ein_code],
+                'foundation_name': self.foundation_names[ein_code],
+                'title': self.edge_titles[edge],
+                'latest_period': self.edge_periods[edge],
+                'filing_count': int(self.edge_filings[edge])
+            })
+        boards.sort(key=lambda b: (b['latest_period'], b['foundation_name']), reverse=True)
+        return boards
+
+    def board_count(self, person: int) -> int:
+        return int(self.person_offsets[person + 1] - self.person_offsets[person])
+
+    def find_people(self, name: str) -> List[Dict]:
+        """
+        People matching a name: the exact normalized name first, then others
+        in its first + last name block (e.g. with or without a middle initial),
+        each with every board they sit on.
+        """
+        key = normalize_person(name)
+        if not key:
+            return []
+
+        candidates = set(self.by_block.get(name_block(key), []))
+        if key in self.by_key:
+            candidates.add(self.by_key[key])
+
+        people = []
+        for person in candidates:
+            people.append({
+                'name': self.person_names[person],
+                'normalized_name': self.person_keys[person],
+                'exact_match': self.person_keys[person] == key,
+                'board_count': self.board_count(person),
+                'boards': self._boards(person)
+            })
+        people.sort(key=lambda p: (not p['exact_match'], -p['board_count'], p['normalized_name']))
+        return people
+
+    def connections(self, ein: int, limit: int = 50) -> Optional[Dict]:
+        """
+        A foundation's board members and the foundations linked to it through
+        them, most shared members first. None when the EIN has no leaders.
+        """
+        ein_code = self.ein_codes.get(int(ein))
+        if ein_code is None:
+            return None
+
+        members = {}
+        for edge in self.ein_edges[self.ein_offsets[ein_code]:self.ein_offsets[ein_code + 1]]:
+            person = int(self.edge_person[edge])
+            members[person] = {
+                'name': self.person_names[person],
+                'title': self.edge_titles[edge],
+                'board_count': self.board_count(person)
+            }
+
+        start, end = self.link_offsets[ein_code], self.link_offsets[ein_code + 1]
+        linked = self.link_ein[start:end]
+        shared = self.link_shared[start:end]
+        order = np.lexsort((linked, -shared))[:limit]
+
+        links = []
+        for i in order:
+            other = int(linked[i])
+            other_people = set(
+                int(self.edge_person[edge])
+                for edge in self.ein_edges[self.ein_offsets[other]:self.ein_offsets[other + 1]]
+            )
+            shared_people = sorted(
+                members[person]['name'] for person in other_people & set(members)
+                if members[person]['board_count'] <= MAX_INTERLOCK_BOARDS
+            )
+            links.append({
+                'foundation_ein': self.eins[other],
+                'foundation_name': self.foundation_names[other],
+                'shared_count': int(shared[i]),
+                'shared_people': shared_people
+            })
+
+        board = sorted(members.values(), key=lambda m: (-m['board_count'], m['name']))
+        return {
+            'foundation_ein': self.eins[ein_code],
+            'foundation_name': self.foundation_names[ein_code],
+            'board_members': board,
+            'connection_count': int(end - start),
+            'connections': links
+        }
+
+
+_index: Optional[BoardIndex] = None
+_index_lock = threading.Lock()
+
+
+def build_board_index() -> BoardIndex:
+    """Build a fresh graph from the foundation and Leaders tables."""
+    return BoardIndex.build(
+        iter_table_rows('foundation', FILING_NAME_COLUMNS, order_by='foundation_id'),
+        iter_table_rows('Leaders', LEADER_COLUMNS, order_by='leader_id')
+    )
+
+
+def get_board_index() -> BoardIndex:
+    """Return the process-wide graph, building it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = build_board_index()
+    return _index
+
+
+def reset_board_index() -> None:
+    """Drop the cached graph so the next lookup rebuilds it (e.g. after a data reload)."""
+    global _index
+    with _index_lock:
+        _index = None
@@ -0,0 +1,328 @@
+"""
+EIN-level foundation aggregates for grant_finder.
+A foundation files one return per tax year, so the foundation table holds
+several rows per EIN. This module rolls every filing of an EIN into one
+record and precomputes its per-tax-year series in a single grouped pass
+over the grants table. Grant amount distributions are kept as KLL sketches
+(per EIN and year, per EIN, per recipient state) so medians, percentiles
+and histograms never need the raw amounts; purposes and cities are kept as
+Space-Saving top-K and HyperLogLog summaries updated as grants stream in.
+When a prebuilt snapshot exists (build_snapshot.py) the aggregates are read
+from it lazily, one EIN at a time, instead of being built from the database.
+"""
+
+import pickle
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from api.giving_cube import GivingCube
+from utils.quantile_sketch import KLLSketch
+from utils.snapshot import Snapshot, SnapshotWriter, open_snapshot
+from utils.stream_summaries import HyperLogLog, SpaceSaving, normalize_text
+from utils.table_scan import iter_table_rows
+
+FILING_COLUMNS = (
+    'foundation_id, ein, organization_name, tax_period_end, state, '
+    'total_assets_eoy, total_distributions'
+)
+GRANT_COLUMNS = 'foundation_id, grant_amount, recipient_state, recipient_city, grant_purpose, tax_period_end'
+
+# Log-scaled grant amount buckets (lower edges, dollars) for distribution histograms
+AMOUNT_BUCKET_EDGES = [0, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000, 500000, 1000000, 5000000]
+
+# Tracked entries per top-K summary; well above the 3 purposes / 10 cities shown
+TOP_K_CAPACITY = 32
+
+
+def tax_year(period) -> int:
+    """'2023-12-31' -> 2023 (0 when unknown)."""
+    period = str(period or '')
+    return int(period[:4]) if period[:4].isdigit() else 0
+
+
+def to_int(value) -> int:
+    """Parse the numeric text columns of the foundation table."""
+    if value is None or value == '':
+        return 0
+    try:
+        return int(float(value))
+    except (ValueError, TypeError):
+        return 0
+
+
+def _new_year_totals() -> Dict:
+    # Module-level (not a lambda) so aggregates can be pickled into snapshots
+    return {'grant_count': 0, 'total_amount': 0, 'sketch': KLLSketch()}
+
+
+def describe_distribution(sketch: KLLSketch, percentiles: Optional[List[float]] = None) -> Dict:
+    """Percentiles and a log-bucket histogram read from a sketch."""
+    percentiles = percentiles or [10, 25, 50, 75, 90]
+    counts = sketch.histogram(AMOUNT_BUCKET_EDGES)
+    histogram = []
+    for i, low in enumerate(AMOUNT_BUCKET_EDGES):
+        high = AMOUNT_BUCKET_EDGES[i + 1] if i + 1 < len(AMOUNT_BUCKET_EDGES) else None
+        histogram.append({'min': low, 'max': high, 'count': counts[i]})
+    return {
+        'grant_count': sketch.n,
+        'min_grant': int(sketch.min or 0),
+        'max_grant': int(sketch.max or 0),
+        'median_grant': int(sketch.quantile(0.5)),
+        'percentiles': {f'{p:g}': int(sketch.quantile(p / 100.0)) for p in percentiles},
+        'histogram': histogram
+    }
+
+
+class FoundationAggregate:
+    """All filings and grants of one EIN."""
+
+    def __init__(self, ein: int):
+        self.ein = ein
+        self.filings: List[Dict] = []
+        self.grant_count = 0
+        self.total_amount = 0
+        self.min_grant = None
+        self.max_grant = None
+        self.sketch = KLLSketch()
+        self.state_totals = defaultdict(float)
+        self.top_cities = SpaceSaving(TOP_K_CAPACITY)
+        self.top_purposes = SpaceSaving(TOP_K_CAPACITY)
+        self.distinct_cities = HyperLogLog()
+        self.distinct_purposes = HyperLogLog()
+        self.latest_period = ''
+        self.years = defaultdict(_new_year_totals)
+        self.summary: Dict = {}
+        self.history: List[Dict] = []
+
+    @property
+    def name(self) -> str:
+        return self.filings[0].get('organization_name', '') if self.filings else ''
+
+    @property
+    def names(self) -> List[str]:
+        """Every name the EIN has filed under (names change over time)."""
+        return list(dict.fromkeys(f.get('organization_name') or '' for f in self.filings))
+
+    def add_filing(self, filing: Dict) -> None:
+        self.filings.append(filing)
+
+    def add_grant(self, grant: Dict) -> None:
+        amount = grant.get('grant_amount')
+        if not amount:
+            return
+
+        self.grant_count += 1
+        self.total_amount += amount
+        self.min_grant = amount if self.min_grant is None else min(self.min_grant, amount)
+        self.max_grant = amount if self.max_grant is None else max(self.max_grant, amount)
+
+        if grant.get('recipient_state'):
+            self.state_totals[grant['recipient_state']] += amount
+        city = normalize_text(grant.get('recipient_city'))
+        if city:
+            self.top_cities.update(city, label=grant['recipient_city'].strip())
+            self.distinct_cities.add(city)
+        purpose = normalize_text(grant.get('grant_purpose'))
+        if purpose:
+            self.top_purposes.update(purpose, label=grant['grant_purpose'].strip())
+            self.distinct_purposes.add(purpose)
+
+        period = str(grant.get('tax_period_end') or '')
+        if period > self.latest_period:
+            self.latest_period = period
+
+        year = self.years[tax_year(period)]
+        year['grant_count'] += 1
+        year['total_amount'] += amount
+        year['sketch'].update(amount)
+
+    def finalize(self) -> None:
+        """Compute derived fields and the yearly series."""
+        self.filings.sort(key=lambda f: str(f.get('tax_period_end') or ''), reverse=True)
+
+        # The EIN-wide distribution is the merge of its yearly sketches
+        self.sketch = KLLSketch.merged(year['sketch'] for year in self.years.values())
+
+        count = self.grant_count
+        states_by_total = sorted(self.state_totals.items(), key=lambda x: (-x[1], x[0]))
+        self.summary = {
+            'filer_ein': self.ein,
+            'filer_organization_name': self.name,
+            'filing_count': len(self.filings),
+            'grant_count': count,
+            'total_amount': int(self.total_amount),
+            'median_grant': int(self.sketch.quantile(0.5)),
+            'avg_grant': int(self.total_amount / count) if count else 0,
+            'min_grant': int(self.min_grant or 0),
+            'max_grant': int(self.max_grant or 0),
+            'states_served': [state for state, _ in states_by_total],
+            'cities_served': [city for city, _ in self.top_cities.top(10)],
+            'top_purposes': [purpose for purpose, _ in self.top_purposes.top(3)],
+            'state_count': len(states_by_total),
+            'city_count': self.distinct_cities.count(),
+            'purpose_count': self.distinct_purposes.count(),
+            'latest_period': self.latest_period,
+            'primary_state': states_by_total[0][0] if states_by_total else ''
+        }
+
+        # Filing-level financials per tax year (latest filing wins for amended returns)
+        filing_years = {}
+        for filing in reversed(self.filings):
+            filing_years[tax_year(filing.get('tax_period_end'))] = filing
+
+        history = []
+        for year in sorted(set(self.years) | set(filing_years)):
+            if not year:
+                continue
+            grants = self.years.get(year) or _new_year_totals()
+            filing = filing_years.get(year, {})
+            history.append({
+                'tax_year': year,
+                'grant_count': grants['grant_count'],
+                'total_amount': int(grants['total_amount']),
+                'median_grant': int(grants['sketch'].quantile(0.5)),
+                'avg_grant': int(grants['total_amount'] / grants['grant_count']) if grants['grant_count'] else 0,
+                'total_distributions': to_int(filing.get('total_distributions')),
+                'total_assets': to_int(filing.get('total_assets_eoy'))
+            })
+        self.history = history
+
+
+class FoundationAggregates:
+    """EIN -> FoundationAggregate, plus the filing -> EIN map used to group grants."""
+
+    def __init__(self):
+        self.by_ein: Dict[int, FoundationAggregate] = {}
+        self.ein_by_foundation_id: Dict[str, int] = {}
+        self.state_sketches: Dict[str, KLLSketch] = defaultdict(KLLSketch)
+        self.cube = GivingCube(AMOUNT_BUCKET_EDGES)
+
+    def add_filing(self, filing: Dict) -> None:
+        if not filing.get('ein') or not filing.get('foundation_id'):
+            return
+        ein = int(filing['ein'])
+        self.ein_by_foundation_id[filing['foundation_id']] = ein
+        if ein not in self.by_ein:
+            self.by_ein[ein] = FoundationAggregate(ein)
+        self.by_ein[ein].add_filing(filing)
+
+    def add_grant(self, grant: Dict) -> None:
+        ein = self.ein_by_foundation_id.get(grant.get('foundation_id'))
+        if ein is not None:
+            self.by_ein[ein].add_grant(grant)
+        if grant.get('recipient_state') and grant.get('grant_amount'):
+            self.state_sketches[grant['recipient_state']].update(grant['grant_amount'])
+            self.cube.add(ein, grant['recipient_state'], tax_year(grant.get('tax_period_end')), grant['grant_amount'])
+
+    def finalize(self) -> None:
+        for aggregate in self.by_ein.values():
+            aggregate.finalize()
+        self.cube.finalize()
+
+    def get(self, ein: int) -> Optional[FoundationAggregate]:
+        return self.by_ein.get(int(ein))
+
+    def summaries(self):
+        """(ein, names, summary) for every EIN, for listings that need no sketches."""
+        for ein, aggregate in self.by_ein.items():
+            yield ein, aggregate.names, aggregate.summary
+
+    def write_snapshot(self, writer: SnapshotWriter) -> None:
+        """Add the aggregates to a snapshot: one pickled record per EIN, plus listing rows."""
+        eins = sorted(self.by_ein)
+        writer.add_records('aggregates', (pickle.dumps(self.by_ein[ein], pickle.HIGHEST_PROTOCOL) for ein in eins), keys=eins)
+        writer.add_records('aggregate_summaries', (
+            pickle.dumps((self.by_ein[ein].names, self.by_ein[ein].summary), pickle.HIGHEST_PROTOCOL) for ein in eins
+        ), keys=eins)
+        writer.add_blob('state_sketches', pickle.dumps(dict(self.state_sketches), pickle.HIGHEST_PROTOCOL))
+        writer.add_blob('giving_cube', pickle.dumps(self.cube, pickle.HIGHEST_PROTOCOL))
+
+    @classmethod
+    def build(cls, filings, grants) -> 'FoundationAggregates':
+        """One pass over filings, then one grouped pass over grants."""
+        aggregates = cls()
+        for filing in filings:
+            aggregates.add_filing(filing)
+        for grant in grants:
+            aggregates.add_grant(grant)
+        aggregates.finalize()
+        return aggregates
+
+
+class SnapshotAggregates:
+    """Same read interface as FoundationAggregates, decoded from a snapshot on demand."""
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+        self.records = snapshot.records('aggregates')
+        self.listing = snapshot.records('aggregate_summaries')
+        self._cache: Dict[int, FoundationAggregate] = {}
+        self._summaries: Optional[List] = None
+        self._state_sketches: Optional[Dict[str, KLLSketch]] = None
+        self._cube: Optional[GivingCube] = None
+
+    def get(self, ein: int) -> Optional[FoundationAggregate]:
+        ein = int(ein)
+        aggregate = self._cache.get(ein)
+        if aggregate is None:
+            record = self.records.find(ein)
+            if record is None:
+                return None
+            aggregate = self._cache[ein] = pickle.loads(record)
+        return aggregate
+
+    def summaries(self):
+        if self._summaries is None:
+            self._summaries = [
+                (self.listing.keys[i],) + pickle.loads(self.listing[i]) for i in range(len(self.listing))
+            ]
+        return iter(self._summaries)
+
+    @property
+    def by_ein(self) -> Dict[int, FoundationAggregate]:
+        """Every aggregate (decodes the whole section; prefer get() and summaries())."""
+        return {ein: self.get(ein) for ein in self.records.keys}
+
+    @property
+    def state_sketches(self) -> Dict[str, KLLSketch]:
+        if self._state_sketches is None:
+            self._state_sketches = pickle.loads(self.snapshot.blob('state_sketches'))
+        return self._state_sketches
+
+    @property
+    def cube(self) -> GivingCube:
+        if self._cube is None:
+            self._cube = pickle.loads(self.snapshot.blob('giving_cube'))
+        return self._cube
+
+
+_aggregates = None
+_aggregates_lock = threading.Lock()
+
+
+def get_foundation_aggregates():
+    """
+    Return the process-wide EIN aggregates: from the snapshot when there is
+    one, otherwise built from the database on first use.
+    """
+    global _aggregates
+    if _aggregates is None:
+        with _aggregates_lock:
+            if _aggregates is None:
+                snapshot = open_snapshot()
+                if snapshot is not None and 'aggregates' in snapshot:
+                    _aggregates = SnapshotAggregates(snapshot)
+                else:
+                    _aggregates = FoundationAggregates.build(
+                        iter_table_rows('foundation', FILING_COLUMNS, order_by='foundation_id'),
+                        iter_table_rows('grants', GRANT_COLUMNS, order_by='grant_id')
+                    )
+    return _aggregates
+
+
+def reset_foundation_aggregates() -> None:
+    """Drop cached aggregates so the next request rebuilds them (e.g. after a data reload)."""
+    global _aggregates
+    with _aggregates_lock:
+        _aggregates = None
@@ -0,0 +1,222 @@
+"""
+Foundation profile payloads for grant_finder.
+Assembles the /api/foundation/<ein>/stats response and manages its
+pre-rendered form: build_profiles.py writes one gzip-compressed JSON file
+per EIN plus a manifest of input fingerprints, and the stats route serves
+those files as-is when they exist. A fingerprint hashes every filing,
+grant and leader row a profile is built from, so a rebuild only re-renders
+the EINs whose rows changed. Artifacts from a build that predates the last
+data change are ignored, so the route falls back to live data until
+build_profiles.py runs again.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from api import supabase_api
+from utils.snapshot import is_stale
+from utils.table_scan import iter_table_rows
+
+# Bump when the payload format changes so every artifact is regenerated
+PROFILE_VERSION = 1
+
+DEFAULT_PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   'public', 'profiles')
+MANIFEST_NAME = 'manifest.json'
+
+
+def _grant_row(grant: Dict) -> Dict:
+    return {
+        'recipient_name': grant['recipient_name'],
+        'recipient_city': grant['recipient_city'],
+        'recipient_state': grant['recipient_state'],
+        'grant_amount': grant['grant_amount'],
+        'grant_purpose': grant['grant_purpose'],
+        'tax_period': grant['tax_period']
+    }
+
+
+def build_profile(ein: int) -> Optional[Dict]:
+    """The full profile payload of a foundation, or None when it has no grants."""
+    # Get foundation aggregated data
+    foundation_data = supabase_api.get_foundation_aggregated_stats(ein)
+
+    if not foundation_data:
+        return None
+
+    # Get all grants for state breakdown and top/recent grants
+    all_grants = supabase_api.get_foundation_grants(ein)
+
+    # Calculate state-by-state statistics
+    states_data = supabase_api.get_foundation_state_breakdown(ein)
+
+    # Top 10 grants (already sorted by amount descending) and most recent 10
+    top_grants_list = [_grant_row(grant) for grant in all_grants[:10]]
+    recent_grants_sorted = sorted(all_grants, key=lambda x: x['tax_period'], reverse=True)
+    recent_grants_list = [_grant_row(grant) for grant in recent_grants_sorted[:10]]
+
+    # Get officers
+    officers = supabase_api.get_foundation_officers(ein)
+
+    # Helper functions to safely get values
+    def safe_get(key, default=''):
+        val = foundation_data.get(key, default)
+        if val is None:
+            return default
+        return val
+
+    def safe_int(key, default=0):
+        val = foundation_data.get(key, default)
+        if val is None or val == '':
+            return default
+        try:
+            return int(val)
+        except (ValueError, TypeError):
+            return default
+
+    def safe_bool(key):
+        val = foundation_data.get(key, False)
+        if isinstance(val, bool):
+            return val
+        if isinstance(val, str):
+            return val.lower() in ['true', '1', 'x', 't']
+        return bool(val)
+
+    return {
+        'foundation_name': foundation_data['foundation_name'],
+        'foundation_ein': foundation_data['foundation_ein'],
+        'grant_count': foundation_data['grant_count'],
+        'total_amount': foundation_data['total_amount'],
+        'median_grant': foundation_data['median_grant'],
+        'avg_grant': foundation_data['avg_grant'],
+        'min_grant': foundation_data['min_grant'],
+        'max_grant': foundation_data['max_grant'],
+        'states_served': foundation_data['states_served'],
+        'cities_served': foundation_data['cities_served'],
+        'top_purposes': foundation_data['top_purposes'],
+        'state_count': foundation_data['state_count'],
+        'city_count': foundation_data['city_count'],
+        'purpose_count': foundation_data['purpose_count'],
+        'latest_period': safe_get('latest_period'),
+        'primary_state': safe_get('primary_state'),
+        'states_data': states_data,
+        'top_grants': top_grants_list,
+        'recent_grants': recent_grants_list,
+        # Foundation-level information
+        'formation_year': safe_get('formation_year'),
+        'foundation_address': safe_get('foundation_address_line1'),
+        'foundation_address2': safe_get('foundation_address_line2'),
+        'foundation_city': safe_get('foundation_city'),
+        'foundation_state': safe_get('foundation_state'),
+        'foundation_zip': safe_get('foundation_zip'),
+        'foundation_phone': safe_get('foundation_phone'),
+        'foundation_website': safe_get('foundation_website'),
+        'legal_domicile_state': safe_get('legal_domicile_state'),
+        'total_assets': safe_int('total_assets_eoy'),
+        'fair_market_value': safe_int('fair_market_value_eoy'),
+        'total_revenue': safe_int('total_revenue'),
+        'total_expenses': safe_int('total_expenses'),
+        'total_distributions_paid': safe_int('total_distributions'),
+        'investment_income': safe_int('investment_income'),
+        'is_private_operating_foundation': safe_bool('is_private_operating_foundation'),
+        'is_501c3': safe_bool('is_501c3'),
+        'mission': safe_get('mission_description'),
+        # Officers/Directors
+        'officers': officers
+    }
+
+
+def encode_profile(profile: Dict) -> bytes:
+    """Compact, key-sorted JSON, gzip-compressed reproducibly (no timestamp)."""
+    body = json.dumps(profile, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def _hash_rows(hashers: Dict[int, Any], rows: Iterable[Dict], ein_of) -> None:
+    for row in rows:
+        ein = ein_of(row)
+        if ein is None:
+            continue
+        if ein not in hashers:
+            hashers[ein] = hashlib.blake2b(str(PROFILE_VERSION).encode(), digest_size=16)
+        hashers[ein].update(json.dumps(row, sort_keys=True, default=str).encode('utf-8'))
+
+
+def profile_fingerprints() -> Dict[int, str]:
+    """
+    EIN -> digest of every filing, grant and leader row of the EIN, from one
+    ordered scan per table (far cheaper than rendering each profile).
+    """
+    ein_by_foundation_id: Dict[str, int] = {}
+    hashers: Dict[int, Any] = {}
+
+    def filing_ein(row):
+        if not row.get('ein') or not row.get('foundation_id'):
+            return None
+        ein_by_foundation_id[row['foundation_id']] = int(row['ein'])
+        return int(row['ein'])
+
+    _hash_rows(hashers, iter_table_rows('foundation', '*', order_by='foundation_id'), filing_ein)
+    child_ein = lambda row: ein_by_foundation_id.get(row.get('foundation_id'))
+    _hash_rows(hashers, iter_table_rows('grants', '*', order_by='grant_id'), child_ein)
+    _hash_rows(hashers, iter_table_rows('Leaders', '*', order_by='leader_id'), child_ein)
+    return {ein: hasher.hexdigest() for ein, hasher in hashers.items()}
+
+
+def profile_dir() -> str:
+    """GRANT_FINDER_PROFILES, or public/profiles in the repository (empty disables artifacts)."""
+    return os.environ.get('GRANT_FINDER_PROFILES', DEFAULT_PROFILE_DIR)
+
+
+def artifact_path(directory: str, ein: int) -> str:
+    return os.path.join(directory, f'{int(ein)}.json.gz')
+
+
+# (directory, manifest mtime) -> the manifest's built_at, so requests only stat the manifest
+_built_at: Dict[Tuple[str, float], int] = {}
+_built_at_lock = threading.Lock()
+
+
+def artifacts_built_at(directory: str) -> int:
+    """When build_profiles.py last wrote the directory's manifest (0 when unknown)."""
+    try:
+        mtime = os.stat(os.path.join(directory, MANIFEST_NAME)).st_mtime
+    except OSError:
+        return 0
+    key = (directory, mtime)
+    built_at = _built_at.get(key)
+    if built_at is None:
+        with _built_at_lock:
+            built_at = int(load_manifest(directory).get('built_at') or 0)
+            _built_at.clear()
+            _built_at[key] = built_at
+    return built_at
+
+
+def read_artifact(ein: int) -> Optional[Tuple[bytes, str]]:
+    """(gzip bytes, etag) of a pre-rendered profile, or None when there is none or it is stale."""
+    directory = profile_dir()
+    if not directory or is_stale(artifacts_built_at(directory)):
+        return None
+    try:
+        with open(artifact_path(directory, ein), 'rb') as fh:
+            data = fh.read()
+    except OSError:
+        return None
+    return data, hashlib.blake2b(data, digest_size=12).hexdigest()
+
+
+def load_manifest(directory: str) -> Dict:
+    """The manifest of a previous build ({'version', 'profiles': {ein: fingerprint}})."""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME)) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return {'version': PROFILE_VERSION, 'profiles': {}}
+    if manifest.get('version') != PROFILE_VERSION:
+        manifest['profiles'] = {}
+    return manifest
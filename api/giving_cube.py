@@ -0,0 +1,167 @@
+"""
+Foundation x recipient state x tax year giving cube for grant_finder.
+Each cell holds a grant count, a total and a KLL sketch of amounts, so
+state maps (one foundation, or all funders nationally) are read as cube
+slices instead of grant scans. National cells are maintained alongside the
+per-foundation ones so the /api/states view never merges every funder, and
+finalize() counts the distinct funders per state for every amount bucket
+range, so its funder counts are table lookups.
+"""
+
+import bisect
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.quantile_sketch import KLLSketch
+
+# Cells are small and numerous; a smaller k keeps memory in check (~2% rank error)
+CELL_SKETCH_K = 64
+
+
+class CubeCell:
+    """Grant count, total and amount sketch for one cube coordinate."""
+
+    __slots__ = ('grant_count', 'total_amount', 'sketch')
+
+    def __init__(self):
+        self.grant_count = 0
+        self.total_amount = 0
+        self.sketch = KLLSketch(CELL_SKETCH_K)
+
+    def add(self, amount: int) -> None:
+        self.grant_count += 1
+        self.total_amount += amount
+        self.sketch.update(amount)
+
+
+def _summarize(state: str, cells: List[CubeCell], min_amount: Optional[int], max_amount: Optional[int]) -> Dict:
+    """One map row from the cells of a state, optionally restricted to an amount range."""
+    if len(cells) == 1:
+        sketch = cells[0].sketch
+    else:
+        sketch = KLLSketch.merged((cell.sketch for cell in cells), k=CELL_SKETCH_K)
+
+    if min_amount is None and max_amount is None:
+        count = sum(cell.grant_count for cell in cells)
+        total = sum(cell.total_amount for cell in cells)
+        median = sketch.quantile(0.5)
+    else:
+        count = sketch.count_between(min_amount, max_amount)
+        total = sketch.sum_between(min_amount, max_amount)
+        median = sketch.range_quantile(0.5, min_amount, max_amount)
+
+    return {
+        'state': state,
+        'grant_count': int(count),
+        'total_amount': int(total),
+        'avg_grant': int(total / count) if count else 0,
+        'median_grant': int(median)
+    }
+
+
+class GivingCube:
+    """Sparse cube keyed by EIN, then (state, tax year); plus national (state, tax year) cells."""
+
+    def __init__(self, bucket_edges: Sequence[int] = (0,)):
+        self.bucket_edges = list(bucket_edges)
+        self.by_ein: Dict[int, Dict[Tuple[str, int], CubeCell]] = {}
+        self.national: Dict[Tuple[str, int], CubeCell] = defaultdict(CubeCell)
+        # (state, tax year) -> EIN -> bitmask of the amount buckets it gave in there
+        self.funders: Dict[Tuple[str, int], Dict[int, int]] = defaultdict(dict)
+        # (state, tax year, or None for all years) -> distinct funders by [low bucket][high bucket]
+        self.funder_counts: Dict[Tuple[str, Optional[int]], List[List[int]]] = {}
+
+    def _bucket(self, amount: int) -> int:
+        """Index of the bucket_edges bucket holding amount."""
+        return max(bisect.bisect_right(self.bucket_edges, amount) - 1, 0)
+
+    def add(self, ein: Optional[int], state: str, year: int, amount: int) -> None:
+        if not state or not amount:
+            return
+        key = (state, year)
+        self.national[key].add(amount)
+        if ein is None:
+            return
+        funders = self.funders[key]
+        funders[ein] = funders.get(ein, 0) | 1 << self._bucket(amount)
+        cells = self.by_ein.get(ein)
+        if cells is None:
+            cells = self.by_ein[ein] = {}
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[key] = CubeCell()
+        cell.add(amount)
+
+    def _range_counts(self, masks: Iterable[int]) -> List[List[int]]:
+        """counts[low][high]: how many of the bucket masks have a bucket in low..high."""
+        by_mask = Counter(masks)
+        n = len(self.bucket_edges)
+        counts = [[0] * n for _ in range(n)]
+        for low in range(n):
+            for high in range(low, n):
+                wanted = (1 << (high + 1)) - (1 << low)
+                counts[low][high] = sum(count for mask, count in by_mask.items() if mask & wanted)
+        return counts
+
+    def finalize(self) -> None:
+        """Precompute the funder counts national_states reads, per state and tax year and over all years."""
+        all_years: Dict[str, Dict[int, int]] = defaultdict(dict)
+        counts = {}
+        for (state, year), masks in self.funders.items():
+            counts[(state, year)] = self._range_counts(masks.values())
+            state_masks = all_years[state]
+            for ein, mask in masks.items():
+                state_masks[ein] = state_masks.get(ein, 0) | mask
+        for state, masks in all_years.items():
+            counts[(state, None)] = self._range_counts(masks.values())
+        self.funder_counts = counts
+
+    @property
+    def years(self) -> List[int]:
+        return sorted(set(year for _, year in self.national if year))
+
+    @staticmethod
+    def _slice(
+        cells: Dict[Tuple[str, int], CubeCell],
+        year: Optional[int],
+        min_amount: Optional[int],
+        max_amount: Optional[int]
+    ) -> List[Dict]:
+        by_state: Dict[str, List[CubeCell]] = defaultdict(list)
+        for (state, cell_year), cell in cells.items():
+            if year is None or cell_year == year:
+                by_state[state].append(cell)
+
+        rows = [_summarize(state, state_cells, min_amount, max_amount) for state, state_cells in by_state.items()]
+        rows = [row for row in rows if row['grant_count']]
+        rows.sort(key=lambda x: (-x['grant_count'], x['state']))
+        return rows
+
+    def foundation_states(
+        self,
+        ein: int,
+        year: Optional[int] = None,
+        min_amount: Optional[int] = None,
+        max_amount: Optional[int] = None
+    ) -> List[Dict]:
+        """Per-state rows for one foundation (the profile map)."""
+        return self._slice(self.by_ein.get(int(ein), {}), year, min_amount, max_amount)
+
+    def national_states(
+        self,
+        year: Optional[int] = None,
+        min_amount: Optional[int] = None,
+        max_amount: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Per-state rows across all funders, with the number of funders active in
+        each state. Under an amount filter that is the funders with a grant in
+        the amount buckets the range overlaps (exact when its bounds are bucket edges).
+        """
+        rows = self._slice(self.national, year, min_amount, max_amount)
+        low = self._bucket(min_amount or 0)
+        high = self._bucket(max_amount) if max_amount is not None else len(self.bucket_edges) - 1
+        for row in rows:
+            counts = self.funder_counts.get((row['state'], year))
+            row['foundation_count'] = counts[low][high] if counts and low <= high else 0
+        return rows
@@ -0,0 +1,240 @@
+"""
+Prospect scoring for grant_finder.
+Ranks every foundation (EIN) for a nonprofit's profile: the state it works
+in, the grant size it is asking for and its mission keywords. A feature
+matrix is built once per process from the EIN aggregates and the giving
+cube (one row per EIN: median grant, largest grant, latest tax year, and a
+CSR list of per-state grant shares), so a match is a handful of vectorized
+passes over all foundations plus one BM25 pass when keywords are given.
+
+Components, each in [0, 1]:
+    geography   share of the foundation's grants going to the state
+    grant_size  closeness of the ask to the median grant on a log scale
+    purpose     mission + grant purpose relevance, relative to the best match
+    recency     halves for every RECENCY_HALF_LIFE years since the latest filing
+The score is their weighted mean over the components the profile supplies.
+"""
+
+import math
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from api.foundation_aggregates import get_foundation_aggregates, tax_year
+
+# Relative weight of each score component
+MATCH_WEIGHTS = {'geography': 0.35, 'grant_size': 0.25, 'purpose': 0.3, 'recency': 0.1}
+
+# Spread of the grant size fit, in decades: an ask 3x the median scores ~0.6, 10x ~0.14
+GRANT_SIZE_SIGMA = 0.5
+
+# Asks above a foundation's largest grant ever get this factor on top
+ABOVE_MAX_FACTOR = 0.5
+
+RECENCY_HALF_LIFE = 2.0
+
+
+class ProspectMatrix:
+    """Per-EIN scoring features as aligned numpy arrays."""
+
+    def __init__(self):
+        self.eins = np.zeros(0, dtype=np.int64)
+        self.summaries: List[Dict] = []
+        self.rows: Dict[int, int] = {}
+        self.log_median = np.zeros(0, dtype=np.float32)
+        self.max_grant = np.zeros(0, dtype=np.float64)
+        self.total_amount = np.zeros(0, dtype=np.float64)
+        self.recency = np.zeros(0, dtype=np.float32)
+
+        # State -> (rows, share of the row's grants given in the state)
+        self.state_rows: Dict[str, np.ndarray] = {}
+        self.state_shares: Dict[str, np.ndarray] = {}
+
+        # Keyword scoring: grant index foundation code / mission filing index -> row (-1 if none)
+        self._purpose_rows: Optional[np.ndarray] = None
+        self._mission_rows: Optional[np.ndarray] = None
+        self._keyword_lock = threading.Lock()
+
+    @classmethod
+    def build(cls, aggregates) -> 'ProspectMatrix':
+        """Build from the EIN aggregates (in-memory or snapshot) and their giving cube."""
+        matrix = cls()
+        summaries = [(ein, summary) for ein, _, summary in aggregates.summaries() if summary.get('grant_count')]
+        summaries.sort(key=lambda x: x[0])
+        matrix.eins = np.array([ein for ein, _ in summaries], dtype=np.int64)
+        matrix.summaries = [summary for _, summary in summaries]
+        matrix.rows = {ein: row for row, (ein, _) in enumerate(summaries)}
+
+        medians = np.array([s['median_grant'] for s in matrix.summaries], dtype=np.float64)
+        matrix.log_median = np.log10(np.maximum(medians, 1)).astype(np.float32)
+        matrix.max_grant = np.array([s['max_grant'] for s in matrix.summaries], dtype=np.float64)
+        matrix.total_amount = np.array([s['total_amount'] for s in matrix.summaries], dtype=np.float64)
+
+        years = np.array([tax_year(s['latest_period']) for s in matrix.summaries], dtype=np.float32)
+        newest = years.max() if len(years) else 0
+        matrix.recency = np.where(years > 0, 0.5 ** ((newest - years) / RECENCY_HALF_LIFE), 0).astype(np.float32)
+
+        # Per-state grant shares from the cube (all tax years)
+        rows_by_state: Dict[str, List[int]] = defaultdict(list)
+        shares_by_state: Dict[str, List[float]] = defaultdict(list)
+        cube = aggregates.cube
+        for row, (ein, _) in enumerate(summaries):
+            counts: Dict[str, int] = defaultdict(int)
+            for (state, _), cell in cube.by_ein.get(ein, {}).items():
+                counts[state] += cell.grant_count
+            total = sum(counts.values())
+            for state, count in counts.items():
+                rows_by_state[state].append(row)
+                shares_by_state[state].append(count / total)
+        for state in rows_by_state:
+            matrix.state_rows[state] = np.array(rows_by_state[state], dtype=np.int32)
+            matrix.state_shares[state] = np.array(shares_by_state[state], dtype=np.float32)
+        return matrix
+
+    def __len__(self) -> int:
+        return len(self.eins)
+
+    def _row_codes(self, eins) -> np.ndarray:
+        """Row of each EIN (or foundation_id resolved to an EIN), -1 when it has none."""
+        return np.array([self.rows.get(ein, -1) if ein is not None else -1 for ein in eins], dtype=np.int32)
+
+    def _keyword_maps(self):
+        """Map the search indexes' foundation codes and filings onto matrix rows (once)."""
+        from api.search_index import get_foundation_text_index, get_grant_index
+
+        if self._purpose_rows is None:
+            with self._keyword_lock:
+                if self._purpose_rows is None:
+                    text_index = get_foundation_text_index()
+                    grant_index = get_grant_index()
+                    self._mission_rows = self._row_codes(text_index.eins)
+                    self._purpose_rows = self._row_codes(
+                        text_index.ein_by_foundation_id.get(fid) for fid in grant_index.foundations.values
+                    )
+        return self._purpose_rows, self._mission_rows
+
+    def geography(self, state: str) -> np.ndarray:
+        scores = np.zeros(len(self), dtype=np.float32)
+        rows = self.state_rows.get(state)
+        if rows is not None:
+            scores[rows] = self.state_shares[state]
+        return scores
+
+    def grant_size(self, ask: float) -> np.ndarray:
+        distance = (math.log10(max(ask, 1)) - self.log_median) / GRANT_SIZE_SIGMA
+        scores = np.exp(-0.5 * distance * distance)
+        return np.where(ask > self.max_grant, scores * ABOVE_MAX_FACTOR, scores).astype(np.float32)
+
+    def purpose(self, keywords: str) -> np.ndarray:
+        """
+        Best mission score across an EIN's filings plus the mean purpose score
+        over its grants (as in search_index.score_foundations), scaled to the best.
+        """
+        from api.search_index import get_foundation_text_index, get_grant_index
+
+        purpose_rows, mission_rows = self._keyword_maps()
+        grant_index = get_grant_index()
+        n = len(self)
+
+        mission = np.zeros(n, dtype=np.float64)
+        mission_scores = get_foundation_text_index().mission_index.score(keywords)
+        known = mission_rows >= 0
+        np.maximum.at(mission, mission_rows[known], mission_scores[known])
+
+        purpose = np.zeros(n, dtype=np.float64)
+        if len(grant_index):
+            n_codes = len(grant_index.foundations.values)
+            totals = np.bincount(grant_index.foundation_codes, weights=grant_index.purpose_scores(keywords),
+                                 minlength=n_codes)
+            counts = np.bincount(grant_index.foundation_codes, minlength=n_codes)
+            known = purpose_rows >= 0
+            row_totals = np.bincount(purpose_rows[known], weights=totals[known], minlength=n)
+            row_counts = np.bincount(purpose_rows[known], weights=counts[known], minlength=n)
+            purpose = np.divide(row_totals, row_counts, out=np.zeros(n), where=row_counts > 0)
+
+        relevance = mission + purpose
+        best = relevance.max() if n else 0
+        return (relevance / best if best > 0 else relevance).astype(np.float32)
+
+    def match(
+        self,
+        state: Optional[str] = None,
+        ask: Optional[float] = None,
+        keywords: Optional[str] = None,
+        limit: int = 25
+    ) -> Optional[List[Dict]]:
+        """
+        Top foundations for the profile, best first, with each component's
+        score; None when no grants go to recipients in state (unknown state).
+        """
+        if state and state not in self.state_rows:
+            return None
+
+        components = {}
+        if state:
+            components['geography'] = self.geography(state)
+        if ask:
+            components['grant_size'] = self.grant_size(ask)
+        if keywords:
+            components['purpose'] = self.purpose(keywords)
+        components['recency'] = self.recency
+
+        weight_total = sum(MATCH_WEIGHTS[name] for name in components)
+        scores = np.zeros(len(self), dtype=np.float32)
+        for name, values in components.items():
+            scores += values * np.float32(MATCH_WEIGHTS[name] / weight_total)
+
+        # A profile with keywords only matches foundations that share some of them
+        if keywords:
+            scores[components['purpose'] <= 0] = 0
+        # Likewise, a profile with a state only matches foundations that fund there
+        if state:
+            scores[components['geography'] <= 0] = 0
+
+        limit = min(limit, len(self))
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        # Best score first; ties go to the larger funder
+        order = candidates[np.lexsort((-self.total_amount[candidates], -scores[candidates]))]
+
+        results = []
+        for row in order.tolist():
+            summary = self.summaries[row]
+            results.append({
+                'foundation_ein': int(self.eins[row]),
+                'foundation_name': summary['filer_organization_name'],
+                'score': round(float(scores[row]), 4),
+                'breakdown': {name: round(float(values[row]), 4) for name, values in components.items()},
+                'grant_count': summary['grant_count'],
+                'total_amount': summary['total_amount'],
+                'median_grant': summary['median_grant'],
+                'max_grant': summary['max_grant'],
+                'primary_state': summary['primary_state'],
+                'latest_period': summary['latest_period'],
+                'top_purposes': summary['top_purposes']
+            })
+        return results
+
+
+_matrix: Optional[ProspectMatrix] = None
+_matrix_lock = threading.Lock()
+
+
+def get_prospect_matrix() -> ProspectMatrix:
+    """Return the process-wide feature matrix, building it on first use."""
+    global _matrix
+    if _matrix is None:
+        with _matrix_lock:
+            if _matrix is None:
+                _matrix = ProspectMatrix.build(get_foundation_aggregates())
+    return _matrix
+
+
+def reset_prospect_matrix() -> None:
+    """Drop the cached matrix so the next match rebuilds it (e.g. after a data reload)."""
+    global _matrix
+    with _matrix_lock:
+        _matrix = None
@@ -0,0 +1,161 @@
+"""
+In-memory recipient index for grant_finder.
+Built once from the Recipients table; maps each recipient to its grant IDs
+and supports normalized name and EIN lookups without scanning grants.
+"""
+
+import re
+import bisect
+import threading
+from typing import Dict, List, Optional
+
+from utils.table_scan import iter_table_rows
+
+RECIPIENT_COLUMNS = 'recipient_id, recipient_name, recipient_ein, city, state, zip, grant_ids'
+
+_NON_ALNUM = re.compile(r'[^A-Z0-9 ]+')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Uppercase a name and strip punctuation so spelling variants collide."""
+    if not name:
+        return ''
+    name = str(name).upper().replace('&', ' AND ')
+    name = _NON_ALNUM.sub(' ', name)
+    return _SPACES.sub(' ', name).strip()
+
+
+def normalize_ein(ein) -> str:
+    """Reduce an EIN to its 9 digits ('' if it has none)."""
+    if ein is None:
+        return ''
+    digits = re.sub(r'\D', '', str(ein).split('.')[0])
+    if not digits:
+        return ''
+    return digits.zfill(9)
+
+
+class RecipientIndex:
+    """Recipient -> grants map plus normalized name/EIN lookup tables."""
+
+    def __init__(self):
+        self.recipients: Dict[str, Dict] = {}
+        self.by_ein: Dict[str, List[str]] = {}
+        self.by_name: Dict[str, List[str]] = {}
+        self.by_token: Dict[str, List[str]] = {}
+        self._tokens: List[str] = []
+
+    def add(self, row: Dict) -> None:
+        """Add one Recipients row to the index."""
+        recipient_id = row.get('recipient_id')
+        if not recipient_id:
+            return
+
+        grant_ids = row.get('grant_ids') or []
+        if isinstance(grant_ids, str):
+            grant_ids = [g.strip(' "\'') for g in grant_ids.strip('[]').split(',') if g.strip(' "\'')]
+
+        name = normalize_name(row.get('recipient_name'))
+        ein = normalize_ein(row.get('recipient_ein'))
+
+        self.recipients[recipient_id] = {
+            'recipient_id': recipient_id,
+            'recipient_name': row.get('recipient_name') or '',
+            'recipient_ein': ein,
+            'city': row.get('city') or '',
+            'state': row.get('state') or '',
+            'zip': row.get('zip') or '',
+            'grant_ids': tuple(grant_ids),
+        }
+
+        if ein:
+            self.by_ein.setdefault(ein, []).append(recipient_id)
+        if name:
+            self.by_name.setdefault(name, []).append(recipient_id)
+            for token in set(name.split(' ')):
+                self.by_token.setdefault(token, []).append(recipient_id)
+
+    def finalize(self) -> None:
+        """Sort the token vocabulary for prefix lookups."""
+        self._tokens = sorted(self.by_token)
+
+    def get(self, recipient_id: str) -> Optional[Dict]:
+        return self.recipients.get(recipient_id)
+
+    def _token_prefix_ids(self, prefix: str) -> set:
+        """All recipients with a name token starting with prefix."""
+        ids = set()
+        i = bisect.bisect_left(self._tokens, prefix)
+        while i < len(self._tokens) and self._tokens[i].startswith(prefix):
+            ids.update(self.by_token[self._tokens[i]])
+            i += 1
+        return ids
+
+    def search(
+        self,
+        name: Optional[str] = None,
+        ein: Optional[str] = None,
+        state: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Find recipients by EIN and/or name.
+        Every word of the name must prefix-match a word of the recipient name.
+        Exact name matches come first, then recipients with the most grants.
+        """
+        candidates = None
+
+        if ein:
+            candidates = set(self.by_ein.get(normalize_ein(ein), []))
+
+        query = normalize_name(name)
+        if query:
+            for token in query.split(' '):
+                ids = self._token_prefix_ids(token)
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    return []
+
+        if candidates is None:
+            return []
+
+        results = [self.recipients[rid] for rid in candidates]
+        if state:
+            results = [r for r in results if r['state'] == state]
+
+        results.sort(key=lambda r: (
+            normalize_name(r['recipient_name']) != query,
+            -len(r['grant_ids']),
+            r['recipient_name']
+        ))
+        return results
+
+
+_index: Optional[RecipientIndex] = None
+_index_lock = threading.Lock()
+
+
+def build_recipient_index() -> RecipientIndex:
+    """Build a fresh index from the Recipients table."""
+    index = RecipientIndex()
+    for row in iter_table_rows('Recipients', RECIPIENT_COLUMNS, order_by='recipient_id', page_size=1000):
+        index.add(row)
+    index.finalize()
+    return index
+
+
+def get_recipient_index() -> RecipientIndex:
+    """Return the process-wide index, building it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = build_recipient_index()
+    return _index
+
+
+def reset_recipient_index() -> None:
+    """Drop the cached index so the next lookup rebuilds it (e.g. after a data reload)."""
+    global _index
+    with _index_lock:
+        _index = None
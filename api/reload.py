@@ -0,0 +1,32 @@
+"""
+Data reloads for grant_finder.
+The app keeps several process-wide structures built from the tables: the
+grant and mission search indexes, EIN aggregates, the recipient, board and
+prospect indexes, similar-foundation neighbours, the mapped snapshot and
+the encoded response cache. reset_indexes drops all of them, so the next
+request (or the cache warmer) rebuilds them from the current data; call it
+whenever the data changes, e.g. after an ingestion or a replica sync.
+"""
+from utils.response_cache import cache
+from utils.snapshot import invalidate_snapshot
+
+
+def reset_indexes() -> None:
+    """Drop every index, the snapshot and the cached responses built from the old data."""
+    # Deferred: the index modules import numpy, which cold starts should not pay for
+    from api.board_index import reset_board_index
+    from api.foundation_aggregates import reset_foundation_aggregates
+    from api.prospect_match import reset_prospect_matrix
+    from api.recipient_index import reset_recipient_index
+    from api.search_index import reset_search_indexes
+    from api.similar_foundations import reset_similar_foundations
+
+    # Snapshot first: the aggregates would otherwise be reloaded from the stale file
+    invalidate_snapshot()
+    reset_board_index()
+    reset_foundation_aggregates()
+    reset_prospect_matrix()
+    reset_recipient_index()
+    reset_search_indexes()
+    reset_similar_foundations()
+    cache.clear()
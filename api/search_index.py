@@ -0,0 +1,583 @@
+"""
+In-memory search indexes for grant_finder.
+GrantIndex keeps the grants table as dictionary-encoded numpy columns, a
+BM25 index over distinct grant purposes, roaring bitmaps per recipient state,
+amount bucket and tax year, and an amount-sorted permutation, so filtered
+searches are bitmap intersections plus a walk down the permutation.
+FoundationTextIndex ranks filings by mission description and matches names.
+Both are mapped from the snapshot's array sections when build_snapshot.py
+wrote them there, otherwise built once per process from paged table scans.
+"""
+import threading
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from api.foundation_aggregates import AMOUNT_BUCKET_EDGES
+from utils.bitmap import RoaringBitmap
+from utils.bm25 import BM25Index
+from utils.snapshot import Snapshot, SnapshotWriter, open_snapshot
+from utils.table_scan import iter_table_rows
+
+GRANT_INDEX_COLUMNS = (
+    'grant_id, foundation_id, grant_amount, recipient_state, recipient_city, '
+    'recipient_foundation_status, grant_purpose, tax_period_end'
+)
+FOUNDATION_INDEX_COLUMNS = 'foundation_id, ein, organization_name, mission_description'
+
+# Results larger than this are paged by walking the amount permutation instead of sorting
+WALK_THRESHOLD = 50000
+
+# Permutation entries examined per step when streaming every match (exports)
+STREAM_WINDOW = 1 << 16
+
+# GrantIndex columns stored as snapshot array sections
+GRANT_INDEX_ARRAYS = (
+    'grant_ids', 'amounts', 'years', 'foundation_codes', 'state_codes', 'city_codes', 'status_codes',
+    'purpose_codes', 'amount_buckets', 'by_amount', 'amount_rank', 'negated_sorted_amounts'
+)
+GRANT_INDEX_DICTIONARIES = ('foundations', 'states', 'cities', 'statuses', 'purposes')
+
+
+class _Dictionary:
+    """Assigns small integer codes to repeated string values."""
+
+    def __init__(self):
+        self._codes: Optional[Dict[str, int]] = {}
+        self.values: List[str] = []
+
+    @classmethod
+    def from_values(cls, values: List[str]) -> '_Dictionary':
+        """Dictionary over stored values; the value -> code map is built on first use."""
+        dictionary = cls()
+        dictionary.values = values
+        dictionary._codes = None
+        return dictionary
+
+    @property
+    def codes(self) -> Dict[str, int]:
+        if self._codes is None:
+            self._codes = {value: code for code, value in enumerate(self.values)}
+        return self._codes
+
+    def encode(self, value) -> int:
+        value = value or ''
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+def amount_bucket_codes(amounts: np.ndarray) -> np.ndarray:
+    """Index of the AMOUNT_BUCKET_EDGES bucket holding each amount."""
+    codes = np.searchsorted(np.array(AMOUNT_BUCKET_EDGES), amounts, side='right') - 1
+    return np.clip(codes, 0, None).astype(np.int8)
+
+
+def _postings(codes: np.ndarray, n_values: int):
+    """CSR postings: rows with code c are order[offsets[c]:offsets[c + 1]] (ascending)."""
+    order = np.argsort(codes, kind='stable').astype(np.int32)
+    offsets = np.zeros(n_values + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=n_values), out=offsets[1:])
+    return order, offsets
+
+
+def _tax_year(period) -> int:
+    """'2023-12-31' -> 2023 (0 when unknown)."""
+    period = str(period or '')
+    return int(period[:4]) if period[:4].isdigit() else 0
+
+
+class GrantIndex:
+    """Columnar copy of the grants table with a purpose text index."""
+
+    def __init__(self):
+        self.grant_ids = np.zeros(0, dtype='S36')
+        self.amounts = np.zeros(0, dtype=np.int64)
+        self.years = np.zeros(0, dtype=np.int16)
+        self.foundation_codes = np.zeros(0, dtype=np.int32)
+        self.state_codes = np.zeros(0, dtype=np.int16)
+        self.city_codes = np.zeros(0, dtype=np.int32)
+        self.status_codes = np.zeros(0, dtype=np.int16)
+        self.purpose_codes = np.zeros(0, dtype=np.int32)
+        self.amount_buckets = np.zeros(0, dtype=np.int8)
+        # Row numbers by amount, largest first, and each row's position in that order
+        self.by_amount = np.zeros(0, dtype=np.int32)
+        self.amount_rank = np.zeros(0, dtype=np.int32)
+        self.negated_sorted_amounts = np.zeros(0, dtype=np.int64)
+        self.state_bitmaps: List[RoaringBitmap] = []
+        self.bucket_bitmaps: List[RoaringBitmap] = []
+        self.year_bitmaps: Dict[int, RoaringBitmap] = {}
+        self.foundation_postings = (np.zeros(0, dtype=np.int32), np.zeros(1, dtype=np.int64))
+        self.city_postings = (np.zeros(0, dtype=np.int32), np.zeros(1, dtype=np.int64))
+        self.foundations = _Dictionary()
+        self.states = _Dictionary()
+        self.cities = _Dictionary()
+        self.statuses = _Dictionary()
+        self.purposes = _Dictionary()
+        self.purpose_index = BM25Index()
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    @classmethod
+    def build(cls, rows) -> 'GrantIndex':
+        """Build from an iterable of grant rows (GRANT_INDEX_COLUMNS)."""
+        index = cls()
+        grant_ids, amounts, years = [], [], []
+        foundations, states, cities, statuses, purposes = [], [], [], [], []
+
+        for row in rows:
+            grant_ids.append(row['grant_id'])
+            amounts.append(int(row.get('grant_amount') or 0))
+            years.append(_tax_year(row.get('tax_period_end')))
+            foundations.append(index.foundations.encode(row.get('foundation_id')))
+            states.append(index.states.encode(row.get('recipient_state')))
+            cities.append(index.cities.encode((row.get('recipient_city') or '').upper()))
+            statuses.append(index.statuses.encode(row.get('recipient_foundation_status')))
+            purposes.append(index.purposes.encode(row.get('grant_purpose')))
+
+        index.grant_ids = np.array(grant_ids, dtype='S36')
+        index.amounts = np.array(amounts, dtype=np.int64)
+        index.years = np.array(years, dtype=np.int16)
+        index.foundation_codes = np.array(foundations, dtype=np.int32)
+        index.state_codes = np.array(states, dtype=np.int16)
+        index.city_codes = np.array(cities, dtype=np.int32)
+        index.status_codes = np.array(statuses, dtype=np.int16)
+        index.purpose_codes = np.array(purposes, dtype=np.int32)
+        index.amount_buckets = amount_bucket_codes(index.amounts)
+        index._build_filters()
+        # Purposes repeat heavily ("GENERAL SUPPORT"), so index distinct texts only
+        index.purpose_index = BM25Index.build(index.purposes.values)
+        return index
+
+    def write_snapshot(self, writer: SnapshotWriter) -> None:
+        """Store the columns, postings and purpose index as array sections (see from_snapshot)."""
+        bitmap_postings, years = self._bitmap_postings()
+        writer.add_json('grant_index', {
+            'years': years.tolist(),
+            'dictionaries': {name: getattr(self, name).values for name in GRANT_INDEX_DICTIONARIES}
+        })
+        for name in GRANT_INDEX_ARRAYS:
+            writer.add_array(f'grant_index.{name}', getattr(self, name))
+        postings = dict(bitmap_postings, foundation=self.foundation_postings, city=self.city_postings)
+        for name, (order, offsets) in postings.items():
+            writer.add_array(f'grant_index.{name}_order', order)
+            writer.add_array(f'grant_index.{name}_offsets', offsets)
+        self.purpose_index.write_snapshot(writer, 'grant_index.purposes')
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> 'GrantIndex':
+        """The index write_snapshot stored, its columns mapped read-only from the snapshot."""
+        meta = snapshot.json('grant_index')
+        index = cls()
+        for name in GRANT_INDEX_DICTIONARIES:
+            setattr(index, name, _Dictionary.from_values(meta['dictionaries'][name]))
+        for name in GRANT_INDEX_ARRAYS:
+            setattr(index, name, snapshot.array(f'grant_index.{name}'))
+
+        def postings(name):
+            return snapshot.array(f'grant_index.{name}_order'), snapshot.array(f'grant_index.{name}_offsets')
+
+        index.foundation_postings = postings('foundation')
+        index.city_postings = postings('city')
+        bitmap_postings = {name: postings(name) for name in ('state', 'bucket', 'year')}
+        index._build_bitmaps(bitmap_postings, np.array(meta['years'], dtype=np.int16))
+        index.purpose_index = BM25Index.from_snapshot(snapshot, 'grant_index.purposes')
+        return index
+
+    def purpose_scores(self, query: str) -> np.ndarray:
+        """BM25 score of every grant's purpose for the query."""
+        return self.purpose_index.score(query)[self.purpose_codes]
+
+    def _build_filters(self) -> None:
+        """Bitmaps, postings and the amount permutation used by filter_rows/top_by_amount."""
+        self.by_amount = np.argsort(-self.amounts, kind='stable').astype(np.int32)
+        self.amount_rank = np.empty(len(self), dtype=np.int32)
+        self.amount_rank[self.by_amount] = np.arange(len(self), dtype=np.int32)
+        self.negated_sorted_amounts = -self.amounts[self.by_amount]
+        self._build_bitmaps(*self._bitmap_postings())
+        self.foundation_postings = _postings(self.foundation_codes, len(self.foundations.values))
+        self.city_postings = _postings(self.city_codes, len(self.cities.values))
+
+    def _bitmap_postings(self):
+        """({'state'|'bucket'|'year': CSR postings}, distinct tax years) behind the filter bitmaps."""
+        years = np.unique(self.years)
+        return {
+            'state': _postings(self.state_codes, len(self.states.values)),
+            'bucket': _postings(self.amount_buckets, len(AMOUNT_BUCKET_EDGES)),
+            'year': _postings(np.searchsorted(years, self.years), len(years))
+        }, years
+
+    def _build_bitmaps(self, postings, years: np.ndarray) -> None:
+        def bitmaps(order, offsets):
+            return [RoaringBitmap.from_sorted(order[offsets[c]:offsets[c + 1]]) for c in range(len(offsets) - 1)]
+
+        self.state_bitmaps = bitmaps(*postings['state'])
+        self.bucket_bitmaps = bitmaps(*postings['bucket'])
+        self.year_bitmaps = dict(zip(years.tolist(), bitmaps(*postings['year'])))
+
+    @staticmethod
+    def _posting_rows(postings, codes: List[int]) -> np.ndarray:
+        order, offsets = postings
+        parts = [order[offsets[c]:offsets[c + 1]] for c in codes]
+        return np.sort(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int32)
+
+    def _filter_bitmap(
+        self,
+        foundation_ids: Optional[List[str]],
+        min_amount: Optional[int],
+        max_amount: Optional[int],
+        state: Optional[str],
+        city: Optional[str],
+        year: Optional[int]
+    ) -> Optional[RoaringBitmap]:
+        """
+        Intersection of the bitmaps for the categorical filters (None when
+        there are none). Amount buckets are only a coarse pre-filter here.
+        """
+        bitmaps = []
+        if foundation_ids is not None:
+            codes = [self.foundations.codes[f] for f in foundation_ids if f in self.foundations.codes]
+            bitmaps.append(RoaringBitmap.from_sorted(self._posting_rows(self.foundation_postings, codes)))
+        if state:
+            code = self.states.codes.get(state.upper())
+            bitmaps.append(self.state_bitmaps[code] if code is not None else RoaringBitmap())
+        if city:
+            # Same semantics as ilike '%city%': any city name containing the text
+            needle = city.upper()
+            codes = [c for c, name in enumerate(self.cities.values) if needle in name]
+            bitmaps.append(RoaringBitmap.from_sorted(self._posting_rows(self.city_postings, codes)))
+        if year:
+            bitmaps.append(self.year_bitmaps.get(int(year), RoaringBitmap()))
+        if not bitmaps:
+            return None
+        if min_amount is not None or max_amount is not None:
+            # Worth intersecting only when the bucket range is narrow; exact bounds are applied after
+            low = amount_bucket_codes(np.array([min_amount or 0]))[0]
+            high = amount_bucket_codes(np.array([max_amount]))[0] if max_amount is not None else len(AMOUNT_BUCKET_EDGES) - 1
+            if high - low < 3:
+                bitmaps.append(RoaringBitmap.union(self.bucket_bitmaps[low:high + 1]))
+        return RoaringBitmap.intersection(bitmaps)
+
+    def _amount_slice(self, min_amount: Optional[int], max_amount: Optional[int]):
+        """[start, stop) of the by_amount positions whose amount is in range."""
+        ascending = self.negated_sorted_amounts
+        start = int(np.searchsorted(ascending, -max_amount, side='left')) if max_amount is not None else 0
+        stop = int(np.searchsorted(ascending, -min_amount, side='right')) if min_amount is not None else len(self)
+        return start, max(start, stop)
+
+    def filter_rows(
+        self,
+        foundation_ids: Optional[List[str]] = None,
+        min_amount: Optional[int] = None,
+        max_amount: Optional[int] = None,
+        state: Optional[str] = None,
+        city: Optional[str] = None,
+        year: Optional[int] = None
+    ) -> np.ndarray:
+        """Sorted row numbers of grants passing the /api/search filters."""
+        bitmap = self._filter_bitmap(foundation_ids, min_amount, max_amount, state, city, year)
+        if bitmap is None:
+            if min_amount is None and max_amount is None:
+                return np.arange(len(self))
+            start, stop = self._amount_slice(min_amount, max_amount)
+            return np.sort(self.by_amount[start:stop]).astype(np.int64)
+        return self._in_amount_range(bitmap.to_array(), min_amount, max_amount)
+
+    def _in_amount_range(self, rows: np.ndarray, min_amount: Optional[int], max_amount: Optional[int]) -> np.ndarray:
+        if min_amount is not None:
+            rows = rows[self.amounts[rows] >= min_amount]
+        if max_amount is not None:
+            rows = rows[self.amounts[rows] <= max_amount]
+        return rows
+
+    def filter_mask(self, *args, **kwargs) -> np.ndarray:
+        """Boolean mask form of filter_rows (same arguments)."""
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.filter_rows(*args, **kwargs)] = True
+        return mask
+
+    def top_by_amount(
+        self,
+        offset: int,
+        limit: int,
+        foundation_ids: Optional[List[str]] = None,
+        min_amount: Optional[int] = None,
+        max_amount: Optional[int] = None,
+        state: Optional[str] = None,
+        city: Optional[str] = None,
+        year: Optional[int] = None
+    ):
+        """
+        (row numbers of one page, total matches) for grants passing the
+        filters, largest amount first.
+        """
+        # A negative offset would slice from the other end of the ordering
+        offset, limit = max(offset, 0), max(limit, 0)
+        bitmap = self._filter_bitmap(foundation_ids, min_amount, max_amount, state, city, year)
+        if bitmap is None:
+            # Amount-only (or no) filters: the page is a contiguous run of the permutation
+            start, stop = self._amount_slice(min_amount, max_amount)
+            page = self.by_amount[min(start + offset, stop):min(start + offset + limit, stop)]
+            return page.astype(np.int64), stop - start
+
+        start, stop = self._amount_slice(min_amount, max_amount)
+        if start == 0 and stop == len(self):
+            total_count = len(bitmap)
+        else:
+            total_count = self._count_in_range(bitmap, min_amount, max_amount)
+
+        wanted = offset + limit
+        if total_count > WALK_THRESHOLD:
+            # Dense result: walk the permutation from the largest amount until the page is full
+            found, count, position, chunk = [], 0, start, 4096
+            while position < stop and count < wanted:
+                candidates = self.by_amount[position:min(position + chunk, stop)]
+                hits = candidates[bitmap.contains(candidates)]
+                found.append(hits)
+                count += len(hits)
+                position += chunk
+                chunk = min(chunk * 2, 1 << 18)
+            rows = np.concatenate(found) if found else np.zeros(0, dtype=np.int32)
+            return rows[offset:wanted].astype(np.int64), total_count
+
+        # Sparse result: sort the few candidates by their position in the permutation
+        ranks = self.amount_rank[bitmap.to_array()]
+        if start > 0 or stop < len(self):
+            ranks = ranks[(ranks >= start) & (ranks < stop)]
+        if wanted < len(ranks):
+            ranks = np.partition(ranks, wanted - 1)[:wanted]
+        ranks = np.sort(ranks)[offset:wanted]
+        return self.by_amount[ranks].astype(np.int64), total_count
+
+    def iter_by_amount(
+        self,
+        chunk_size: int,
+        foundation_ids: Optional[List[str]] = None,
+        min_amount: Optional[int] = None,
+        max_amount: Optional[int] = None,
+        state: Optional[str] = None,
+        city: Optional[str] = None,
+        year: Optional[int] = None
+    ) -> Iterator[np.ndarray]:
+        """
+        Row numbers of every grant passing the filters, largest amount first,
+        in chunks of chunk_size: top_by_amount for all pages in one walk of the
+        permutation, holding at most a window of it at a time.
+        """
+        bitmap = self._filter_bitmap(foundation_ids, min_amount, max_amount, state, city, year)
+        start, stop = self._amount_slice(min_amount, max_amount)
+        pending = np.zeros(0, dtype=np.int64)
+        for position in range(start, stop, STREAM_WINDOW):
+            candidates = self.by_amount[position:min(position + STREAM_WINDOW, stop)].astype(np.int64)
+            if bitmap is not None:
+                candidates = candidates[bitmap.contains(candidates)]
+            pending = np.concatenate([pending, candidates])
+            while len(pending) >= chunk_size:
+                yield pending[:chunk_size]
+                pending = pending[chunk_size:]
+        if len(pending):
+            yield pending
+
+    def _count_in_range(self, bitmap: RoaringBitmap, min_amount: Optional[int], max_amount: Optional[int]) -> int:
+        """Matches within an amount range: whole buckets by cardinality, edge buckets exactly."""
+        last = len(AMOUNT_BUCKET_EDGES) - 1
+        low = amount_bucket_codes(np.array([min_amount or 0]))[0]
+        high = amount_bucket_codes(np.array([max_amount]))[0] if max_amount is not None else last
+        total = 0
+        for bucket in range(low, high + 1):
+            covers_low = min_amount is None or min_amount <= AMOUNT_BUCKET_EDGES[bucket] or bucket == 0 and min_amount <= 0
+            covers_high = max_amount is None or (bucket < last and max_amount >= AMOUNT_BUCKET_EDGES[bucket + 1] - 1)
+            if covers_low and covers_high:
+                total += bitmap.intersection_count(self.bucket_bitmaps[bucket])
+            else:
+                part = (bitmap & self.bucket_bitmaps[bucket]).to_array()
+                total += len(self._in_amount_range(part, min_amount, max_amount))
+        return total
+
+    def ranked_search(self, query: str, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Row numbers of grants matching the query, best first (ties by amount)."""
+        scores = self.purpose_scores(query)
+        matched = scores > 0
+        if mask is not None:
+            matched &= mask
+        rows = np.flatnonzero(matched)
+        order = np.lexsort((-self.amounts[rows], -scores[rows]))
+        return rows[order]
+
+    def facet_counts(self, rows: np.ndarray) -> Dict[str, List[Dict]]:
+        """
+        Counts per recipient state, amount bucket, tax year and recipient
+        status for the given rows (row numbers or a boolean mask), one
+        bincount per facet column.
+        """
+        def by_value(codes, values):
+            counts = np.bincount(codes[rows], minlength=len(values))
+            facet = [
+                {'value': values[code], 'count': int(counts[code])}
+                for code in np.flatnonzero(counts) if values[code]
+            ]
+            facet.sort(key=lambda x: (-x['count'], x['value']))
+            return facet
+
+        bucket_counts = np.bincount(self.amount_buckets[rows], minlength=len(AMOUNT_BUCKET_EDGES))
+        amount = []
+        for i, low in enumerate(AMOUNT_BUCKET_EDGES):
+            high = AMOUNT_BUCKET_EDGES[i + 1] if i + 1 < len(AMOUNT_BUCKET_EDGES) else None
+            amount.append({'min': low, 'max': high, 'count': int(bucket_counts[i])})
+
+        year_counts = np.bincount(self.years[rows].astype(np.int64), minlength=1)
+        tax_year = [
+            {'value': int(year), 'count': int(year_counts[year])}
+            for year in np.flatnonzero(year_counts)[::-1] if year
+        ]
+
+        return {
+            'state': by_value(self.state_codes, self.states.values),
+            'amount': amount,
+            'tax_year': tax_year,
+            'recipient_status': by_value(self.status_codes, self.statuses.values)
+        }
+
+
+class FoundationTextIndex:
+    """BM25 over foundation mission descriptions, one document per filing."""
+
+    def __init__(self):
+        self.foundation_ids: List[str] = []
+        self.eins: List[int] = []
+        self.names: List[str] = []
+        self.ein_by_foundation_id: Dict[str, int] = {}
+        self.mission_index = BM25Index()
+
+    @classmethod
+    def build(cls, rows) -> 'FoundationTextIndex':
+        index = cls()
+        missions = []
+        for row in rows:
+            index.foundation_ids.append(row['foundation_id'])
+            index.eins.append(int(row['ein']) if row.get('ein') else 0)
+            index.names.append((row.get('organization_name') or '').upper())
+            missions.append(row.get('mission_description'))
+        index.mission_index = BM25Index.build(missions)
+        index.ein_by_foundation_id = dict(zip(index.foundation_ids, index.eins))
+        return index
+
+    def write_snapshot(self, writer: SnapshotWriter) -> None:
+        writer.add_json('foundation_text_index', {
+            'foundation_ids': self.foundation_ids, 'eins': self.eins, 'names': self.names
+        })
+        self.mission_index.write_snapshot(writer, 'foundation_text_index.missions')
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> 'FoundationTextIndex':
+        meta = snapshot.json('foundation_text_index')
+        index = cls()
+        index.foundation_ids = meta['foundation_ids']
+        index.eins = meta['eins']
+        index.names = meta['names']
+        index.ein_by_foundation_id = dict(zip(index.foundation_ids, index.eins))
+        index.mission_index = BM25Index.from_snapshot(snapshot, 'foundation_text_index.missions')
+        return index
+
+    def match_foundation_ids(self, name: str) -> List[str]:
+        """Filing IDs whose organization name contains the text (like ilike '%name%')."""
+        needle = name.upper()
+        return [fid for fid, org in zip(self.foundation_ids, self.names) if needle in org]
+
+
+def score_foundations(query: str) -> Dict[int, float]:
+    """
+    Relevance of each foundation (by EIN) for a text query.
+    Best mission score across the EIN's filings plus the mean purpose score
+    over all its grants, so foundations whose giving consistently matches
+    rank above one-off grants.
+    """
+    grant_index = get_grant_index()
+    foundation_index = get_foundation_text_index()
+
+    mission: Dict[int, float] = {}
+    mission_scores = foundation_index.mission_index.score(query)
+    for i in np.flatnonzero(mission_scores):
+        ein = foundation_index.eins[i]
+        mission[ein] = max(mission.get(ein, 0.0), float(mission_scores[i]))
+
+    purpose_totals: Dict[int, float] = defaultdict(float)
+    grant_counts: Dict[int, int] = defaultdict(int)
+    if len(grant_index):
+        grant_scores = grant_index.purpose_scores(query)
+        n_foundations = len(grant_index.foundations.values)
+        totals = np.bincount(grant_index.foundation_codes, weights=grant_scores, minlength=n_foundations)
+        counts = np.bincount(grant_index.foundation_codes, minlength=n_foundations)
+        ein_by_foundation_id = foundation_index.ein_by_foundation_id
+        for code in np.flatnonzero(counts):
+            ein = ein_by_foundation_id.get(grant_index.foundations.values[code])
+            if ein is None:
+                continue
+            purpose_totals[ein] += float(totals[code])
+            grant_counts[ein] += int(counts[code])
+
+    scores = dict(mission)
+    for ein, total in purpose_totals.items():
+        if total > 0:
+            scores[ein] = scores.get(ein, 0.0) + total / grant_counts[ein]
+    return scores
+
+
+_grant_index: Optional[GrantIndex] = None
+_foundation_text_index: Optional[FoundationTextIndex] = None
+_index_lock = threading.Lock()
+
+
+def _snapshot_index(cls, section: str):
+    """The index the snapshot stores under section (cls.from_snapshot), or None when it has none."""
+    snapshot = open_snapshot()
+    if snapshot is None or section not in snapshot:
+        return None
+    try:
+        return cls.from_snapshot(snapshot)
+    except Exception as e:
+        print(f"Error loading {section} from snapshot: {e}")
+        return None
+
+
+def get_grant_index() -> GrantIndex:
+    """Return the process-wide grant index: from the snapshot when there is one, else built on first use."""
+    global _grant_index
+    if _grant_index is None:
+        with _index_lock:
+            if _grant_index is None:
+                index = _snapshot_index(GrantIndex, 'grant_index')
+                if index is None:
+                    index = GrantIndex.build(
+                        iter_table_rows('grants', GRANT_INDEX_COLUMNS, order_by='grant_id', page_size=1000)
+                    )
+                _grant_index = index
+    return _grant_index
+
+
+def get_foundation_text_index() -> FoundationTextIndex:
+    """Return the process-wide mission index: from the snapshot when there is one, else built on first use."""
+    global _foundation_text_index
+    if _foundation_text_index is None:
+        with _index_lock:
+            if _foundation_text_index is None:
+                index = _snapshot_index(FoundationTextIndex, 'foundation_text_index')
+                if index is None:
+                    index = FoundationTextIndex.build(
+                        iter_table_rows('foundation', FOUNDATION_INDEX_COLUMNS, order_by='foundation_id', page_size=1000)
+                    )
+                _foundation_text_index = index
+    return _foundation_text_index
+
+
+def reset_search_indexes() -> None:
+    """Drop cached indexes so the next search rebuilds them (e.g. after a data reload)."""
+    global _grant_index, _foundation_text_index
+    with _index_lock:
+        _grant_index = None
+        _foundation_text_index = None
@@ -0,0 +1,263 @@
+"""
+Similar-foundation recommendations for grant_finder.
+Each EIN gets a feature vector built from its grants: TF-IDF of grant
+purpose terms (vocabulary capped to the most common terms), its recipient
+state distribution and its grant amount profile (share of grants per
+amount bucket), each block L2-normalized and weighted. Top-k cosine
+neighbours are computed in blocks of rows, one matrix product per block,
+with blocks spread over threads (numpy releases the GIL in BLAS).
+build_similar.py stores the neighbour lists in snapshot/similar.snap, keyed
+by EIN, so a lookup is a binary search over the mapped file. The build scans
+every grant and is quadratic in foundations, so it only runs as that offline
+job: without the file there are no neighbours to serve.
+"""
+
+import math
+import os
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from api.foundation_aggregates import AMOUNT_BUCKET_EDGES, to_int
+from api.search_index import amount_bucket_codes
+from utils.bm25 import tokenize
+from utils.snapshot import Snapshot, SnapshotWriter, read_snapshot
+from utils.table_scan import iter_table_rows
+
+SIMILAR_GRANT_COLUMNS = 'grant_id, foundation_id, grant_amount, recipient_state, grant_purpose'
+
+DEFAULT_SIMILAR_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'snapshot', 'similar.snap')
+
+# Neighbours kept per foundation
+NEIGHBOURS = 20
+
+# Purpose vocabulary: terms in at least MIN_TERM_FOUNDATIONS foundations and at
+# most MAX_TERM_SHARE of them, the MAX_TERMS most common of those
+MAX_TERMS = 2048
+MIN_TERM_FOUNDATIONS = 2
+MAX_TERM_SHARE = 0.5
+
+# Share of the cosine similarity contributed by each feature block
+FEATURE_WEIGHTS = {'purpose': 0.6, 'state': 0.25, 'amount': 0.15}
+
+# Rows scored per matrix product
+BLOCK_SIZE = 512
+
+
+class FoundationFeatures:
+    """Sparse per-EIN counts gathered in one pass over the grants table."""
+
+    def __init__(self):
+        self.terms: Dict[int, Counter] = defaultdict(Counter)
+        self.states: Dict[int, Counter] = defaultdict(Counter)
+        self.amounts: Dict[int, List[float]] = defaultdict(list)
+        self._tokens: Dict[str, List[str]] = {}
+
+    def add_grant(self, ein: int, grant: Dict) -> None:
+        amount = grant.get('grant_amount')
+        if not amount:
+            return
+        self.amounts[ein].append(amount)
+        if grant.get('recipient_state'):
+            self.states[ein][grant['recipient_state']] += 1
+
+        # Purposes repeat heavily; tokenize each distinct text once
+        purpose = grant.get('grant_purpose') or ''
+        tokens = self._tokens.get(purpose)
+        if tokens is None:
+            tokens = self._tokens[purpose] = sorted(set(tokenize(purpose)))
+        self.terms[ein].update(tokens)
+
+    def matrix(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(EINs, unit-length float32 feature rows) for every EIN with grants."""
+        eins = np.array(sorted(self.amounts), dtype=np.int64)
+        n = len(eins)
+
+        # Vocabulary and IDF weights
+        document_frequency = Counter()
+        for counts in self.terms.values():
+            document_frequency.update(counts.keys())
+        eligible = [
+            (df, term) for term, df in document_frequency.items()
+            if df >= MIN_TERM_FOUNDATIONS and df <= MAX_TERM_SHARE * n
+        ]
+        vocabulary = [term for _, term in sorted(eligible, key=lambda x: (-x[0], x[1]))[:MAX_TERMS]]
+        term_codes = {term: i for i, term in enumerate(vocabulary)}
+        idf = np.array([math.log((1 + n) / (1 + document_frequency[t])) + 1 for t in vocabulary], dtype=np.float32)
+
+        states = sorted(set(state for counts in self.states.values() for state in counts))
+        state_codes = {state: i for i, state in enumerate(states)}
+
+        purpose = np.zeros((n, len(vocabulary)), dtype=np.float32)
+        state = np.zeros((n, len(states)), dtype=np.float32)
+        amount = np.zeros((n, len(AMOUNT_BUCKET_EDGES)), dtype=np.float32)
+        for row, ein in enumerate(eins.tolist()):
+            for term, tf in self.terms[ein].items():
+                code = term_codes.get(term)
+                if code is not None:
+                    purpose[row, code] = 1 + math.log(tf)
+            for recipient_state, count in self.states[ein].items():
+                state[row, state_codes[recipient_state]] = count
+            codes = amount_bucket_codes(np.array(self.amounts[ein], dtype=np.float64))
+            amount[row] = np.bincount(codes, minlength=len(AMOUNT_BUCKET_EDGES))
+        purpose *= idf
+
+        blocks = []
+        for block, weight in ((purpose, FEATURE_WEIGHTS['purpose']),
+                              (state, FEATURE_WEIGHTS['state']),
+                              (amount, FEATURE_WEIGHTS['amount'])):
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            blocks.append(block / np.where(norms > 0, norms, 1) * np.float32(math.sqrt(weight)))
+        features = np.hstack(blocks)
+
+        # Rows missing a block (e.g. no purposes) are rescaled so scores stay cosines
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        return eins, features / np.where(norms > 0, norms, 1)
+
+
+def top_neighbours(features: np.ndarray, k: int = NEIGHBOURS, workers: int = os.cpu_count() or 1):
+    """(indices, scores) of each row's k most similar other rows, best first."""
+    n = len(features)
+    k = min(k, max(n - 1, 0))
+    indices = np.zeros((n, k), dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+    if k == 0:
+        return indices, scores
+
+    # Contiguous transpose, shared by every block's product
+    columns = np.ascontiguousarray(features.T)
+
+    def score_block(start: int) -> None:
+        end = min(start + BLOCK_SIZE, n)
+        similarity = features[start:end] @ columns
+        similarity[np.arange(end - start), np.arange(start, end)] = -np.inf
+        best = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(similarity, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        indices[start:end] = np.take_along_axis(best, order, axis=1)
+        scores[start:end] = np.take_along_axis(best_scores, order, axis=1)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(score_block, range(0, n, BLOCK_SIZE)))
+    return indices, scores
+
+
+class SimilarFoundations:
+    """EIN -> [(neighbour EIN, cosine similarity)], best first."""
+
+    def __init__(self, neighbours: Dict[int, List[Tuple[int, float]]]):
+        self.neighbours = neighbours
+
+    @classmethod
+    def build(cls, filings, grants, k: int = NEIGHBOURS, workers: int = os.cpu_count() or 1) -> 'SimilarFoundations':
+        """Features from one pass over filings and grants, then blocked top-k neighbours."""
+        ein_by_filing = {}
+        for filing in filings:
+            if filing.get('ein') and filing.get('foundation_id'):
+                ein_by_filing[filing['foundation_id']] = to_int(filing['ein'])
+
+        features = FoundationFeatures()
+        for grant in grants:
+            ein = ein_by_filing.get(grant.get('foundation_id'))
+            if ein:
+                features.add_grant(ein, grant)
+
+        eins, matrix = features.matrix()
+        indices, scores = top_neighbours(matrix, k, workers)
+        neighbours = {}
+        for row, ein in enumerate(eins.tolist()):
+            neighbours[ein] = [
+                (int(eins[i]), float(score))
+                for i, score in zip(indices[row], scores[row]) if score > 0
+            ]
+        return cls(neighbours)
+
+    def get(self, ein: int) -> Optional[List[Tuple[int, float]]]:
+        return self.neighbours.get(int(ein))
+
+    def write_snapshot(self, writer: SnapshotWriter) -> None:
+        """One record per EIN: int64 neighbour EINs followed by their float32 scores."""
+        eins = sorted(self.neighbours)
+        records = []
+        for ein in eins:
+            pairs = self.neighbours[ein]
+            records.append(
+                np.array([e for e, _ in pairs], dtype='<i8').tobytes()
+                + np.array([s for _, s in pairs], dtype='<f4').tobytes()
+            )
+        writer.add_records('similar_foundations', records, keys=eins)
+
+
+class SnapshotSimilarFoundations:
+    """SimilarFoundations read from a mapped snapshot, one EIN at a time."""
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+        self.records = snapshot.records('similar_foundations')
+
+    def get(self, ein: int) -> Optional[List[Tuple[int, float]]]:
+        record = self.records.find(int(ein))
+        if record is None:
+            return None
+        count = len(record) // 12
+        eins = np.frombuffer(record, dtype='<i8', count=count)
+        scores = np.frombuffer(record, dtype='<f4', count=count, offset=count * 8)
+        return [(int(e), float(s)) for e, s in zip(eins, scores)]
+
+
+def similar_path() -> str:
+    """GRANT_FINDER_SIMILAR, or snapshot/similar.snap in the repository (empty disables neighbours)."""
+    return os.environ.get('GRANT_FINDER_SIMILAR', DEFAULT_SIMILAR_PATH)
+
+
+def build_similar_foundations(k: int = NEIGHBOURS, workers: int = os.cpu_count() or 1) -> SimilarFoundations:
+    """Build fresh neighbour lists from the foundation and grants tables (build_similar.py only)."""
+    return SimilarFoundations.build(
+        iter_table_rows('foundation', 'foundation_id, ein', order_by='foundation_id'),
+        iter_table_rows('grants', SIMILAR_GRANT_COLUMNS, order_by='grant_id'),
+        k, workers
+    )
+
+
+def write_similar_foundations(path: str, k: int = NEIGHBOURS, workers: int = os.cpu_count() or 1) -> SimilarFoundations:
+    """Build the neighbour lists and write them to path; returns them."""
+    similar = build_similar_foundations(k, workers)
+    writer = SnapshotWriter()
+    similar.write_snapshot(writer)
+    writer.add_json('similar_meta', {'neighbours': k})
+    writer.write(path)
+    return similar
+
+
+_similar: Optional[SnapshotSimilarFoundations] = None
+_similar_loaded = False
+_similar_lock = threading.Lock()
+
+
+def get_similar_foundations() -> Optional[SnapshotSimilarFoundations]:
+    """Return the process-wide neighbour lists from the built file; None when there is none or it is stale (never built in-process)."""
+    global _similar, _similar_loaded
+    if not _similar_loaded:
+        with _similar_lock:
+            if not _similar_loaded:
+                # Same staleness rule as the main snapshot: a file built before the last data change is ignored
+                snapshot = read_snapshot(similar_path())
+                if snapshot is not None:
+                    try:
+                        _similar = SnapshotSimilarFoundations(snapshot)
+                    except Exception as e:
+                        print(f"Error opening similar foundations {snapshot.path}: {e}")
+                _similar_loaded = True
+    return _similar
+
+
+def reset_similar_foundations() -> None:
+    """Drop the cached neighbour lists so the next lookup reloads them (e.g. after a rebuild)."""
+    global _similar, _similar_loaded
+    with _similar_lock:
+        _similar = None
+        _similar_loaded = False
@@ -4,10 +4,94 @@ Replaces CSV-based pandas operations with Supabase queries.
 """
 
 from utils.supabase_client import supabase
-from typing import Dict, List, Optional, Tuple, Any
-from collections import defaultdict, Counter
+from utils.snapshot import NameIndex, open_snapshot
+from api.recipient_index import get_recipient_index
+from api.foundation_aggregates import get_foundation_aggregates, describe_distribution
+from utils.table_scan import parallel_map, scan_table
+from utils.singleflight import singleflight
+from utils.columnar import Row
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+from collections import defaultdict
+from operator import attrgetter
 
+class GrantResult(Row):
+    """One /api/search (and grants export) row."""
 
+    __slots__ = (
+        'foundation_name', 'foundation_ein', 'recipient_name', 'recipient_city', 'recipient_state',
+        'recipient_relationship', 'recipient_foundation_status', 'grant_amount', 'cash_amount',
+        'non_cash_amount', 'grant_purpose', 'tax_period'
+    )
+    dictionary_columns = (
+        'foundation_name', 'foundation_ein', 'recipient_state', 'recipient_relationship',
+        'recipient_foundation_status', 'tax_period'
+    )
+
+    def __init__(self, foundation_name, foundation_ein, recipient_name, recipient_city, recipient_state,
+                 recipient_relationship, recipient_foundation_status, grant_amount, cash_amount,
+                 non_cash_amount, grant_purpose, tax_period):
+        self.foundation_name = foundation_name
+        self.foundation_ein = foundation_ein
+        self.recipient_name = recipient_name
+        self.recipient_city = recipient_city
+        self.recipient_state = recipient_state
+        self.recipient_relationship = recipient_relationship
+        self.recipient_foundation_status = recipient_foundation_status
+        self.grant_amount = grant_amount
+        self.cash_amount = cash_amount
+        self.non_cash_amount = non_cash_amount
+        self.grant_purpose = grant_purpose
+        self.tax_period = tax_period
+
+
+class FoundationGrant(Row):
+    """One grant of a foundation's full grant list."""
+
+    __slots__ = (
+        'recipient_name', 'recipient_ein', 'recipient_city', 'recipient_state', 'recipient_relationship',
+        'recipient_foundation_status', 'grant_amount', 'cash_amount', 'non_cash_amount', 'grant_purpose',
+        'tax_period'
+    )
+    dictionary_columns = ('recipient_state', 'recipient_relationship', 'recipient_foundation_status', 'tax_period')
+
+    def __init__(self, recipient_name, recipient_ein, recipient_city, recipient_state, recipient_relationship,
+                 recipient_foundation_status, grant_amount, cash_amount, non_cash_amount, grant_purpose,
+                 tax_period):
+        self.recipient_name = recipient_name
+        self.recipient_ein = recipient_ein
+        self.recipient_city = recipient_city
+        self.recipient_state = recipient_state
+        self.recipient_relationship = recipient_relationship
+        self.recipient_foundation_status = recipient_foundation_status
+        self.grant_amount = grant_amount
+        self.cash_amount = cash_amount
+        self.non_cash_amount = non_cash_amount
+        self.grant_purpose = grant_purpose
+        self.tax_period = tax_period
+
+
+# /api/export: rows per primary-key fetch, and fetches run ahead in parallel
+EXPORT_CHUNK_SIZE = 200
+EXPORT_PREFETCH = 4
+
+# get_stats: key-range partitions of the grants table scanned in parallel
+STATS_SCAN_PARTITIONS = 8
+
+# /api/foundations/batch: EINs per IN-list query
+BATCH_CHUNK_SIZE = 100
+
+# get_recipient: grant and filing IDs per IN-list query (chunks are fetched in parallel)
+RECIPIENT_CHUNK_SIZE = 200
+BATCH_FILING_COLUMNS = (
+    'foundation_id, ein, organization_name, tax_period_end, formation_year, '
+    'address_line1, address_line2, city, state, zip, phone, website, legal_domicile_state, '
+    'total_assets_eoy, fair_market_value_eoy, total_revenue, total_expenses, '
+    'total_distributions, investment_income, is_private_operating_foundation, is_501c3, '
+    'mission_description'
+)
+
+
+@singleflight
 def get_foundation_by_ein(ein: int) -> Optional[Dict]:
     """
     Get foundation record by EIN.
@@ -18,6 +102,7 @@ def get_foundation_by_ein(ein: int) -> Optional[Dict]:
             .select('*')\
             .eq('ein', str(ein))\
             .order('tax_period_end', desc=True)\
+            .order('foundation_id', desc=True)\
             .limit(1)\
             .execute()
         
@@ -29,191 +114,313 @@ def get_foundation_by_ein(ein: int) -> Optional[Dict]:
         return None
 
 
-def get_all_foundation_eins() -> List[str]:
-    """Get all unique foundation organization names for autocomplete."""
+@singleflight
+def get_foundation_filings(ein: int) -> List[Dict]:
+    """
+    Get every tax filing for an EIN, most recent first.
+    A foundation files one return per year, each with its own foundation_id.
+    """
     try:
-        # Get distinct organization names
         response = supabase.table('foundation')\
-            .select('organization_name')\
+            .select('*')\
+            .eq('ein', str(ein))\
+            .order('tax_period_end', desc=True)\
+            .order('foundation_id', desc=True)\
             .execute()
         
-        if response.data:
-            # Get unique names
-            names = list(set([f['organization_name'] for f in response.data if f.get('organization_name')]))
-            return sorted(names)
+        return response.data or []
+    except Exception as e:
+        print(f"Error fetching filings for EIN {ein}: {e}")
         return []
+
+
+@singleflight
+def get_all_foundation_eins() -> List[str]:
+    """Get all unique foundation organization names for autocomplete."""
+    try:
+        snapshot = open_snapshot()
+        if snapshot is not None and 'foundation_names' in snapshot:
+            return NameIndex(snapshot, 'foundation_names').all()
+        
+        # Get distinct organization names, scanning every filing
+        names = set()
+        for filing in scan_table('foundation', 'organization_name', key='foundation_id'):
+            if filing.get('organization_name'):
+                names.add(filing['organization_name'])
+        
+        return sorted(names)
     except Exception as e:
         print(f"Error fetching foundation names: {e}")
         return []
 
 
+@singleflight
+def search_foundation_names(query: str, limit: int = 50) -> List[str]:
+    """
+    Foundation names containing query (case-insensitive), sorted, at most limit.
+    Served from the snapshot's name index when there is one.
+    """
+    snapshot = open_snapshot()
+    if snapshot is not None and 'foundation_names' in snapshot:
+        return NameIndex(snapshot, 'foundation_names').search(query, limit)
+    
+    query = query.upper()
+    return [name for name in get_all_foundation_eins() if query in name.upper()][:limit]
+
+
+@singleflight
 def search_grants(
     foundation_name: Optional[str] = None,
     min_amount: Optional[int] = None,
     max_amount: Optional[int] = None,
     state: Optional[str] = None,
     city: Optional[str] = None,
+    text_query: Optional[str] = None,
     page: int = 1,
-    per_page: int = 20
-) -> Tuple[List[Dict], int]:
+    per_page: int = 20,
+    year: Optional[int] = None
+) -> Tuple[List[GrantResult], int]:
     """
     Search grants with filters and pagination.
+    Filtering and ordering run on the in-memory grant index (bitmap
+    intersections, then largest amounts first, or purpose relevance with
+    text_query); only the requested page is fetched from the database.
     Returns (results, total_count).
     """
+    # Deferred: the index modules import numpy, which cold starts should not pay for
+    from api.search_index import get_grant_index
+    
     try:
-        # Start building query
-        query = supabase.table('grants').select('*', count='exact')
-        
-        # Apply filters
-        if foundation_name:
-            # Need to join with foundation table to filter by name
-            # First get foundation IDs that match the name
-            foundation_response = supabase.table('foundation')\
-                .select('foundation_id')\
-                .ilike('organization_name', f'%{foundation_name}%')\
-                .execute()
-            
-            if foundation_response.data:
-                foundation_ids = [f['foundation_id'] for f in foundation_response.data]
-                if foundation_ids:
-                    # Filter grants by these foundation IDs
-                    query = query.in_('foundation_id', foundation_ids)
-                else:
-                    # No matching foundations, return empty
-                    return [], 0
-            else:
-                return [], 0
-        
-        if min_amount is not None:
-            query = query.gte('grant_amount', min_amount)
-        
-        if max_amount is not None:
-            query = query.lte('grant_amount', max_amount)
-        
-        if state:
-            query = query.eq('recipient_state', state.upper())
-        
-        if city:
-            query = query.ilike('recipient_city', f'%{city}%')
-        
-        # Sort by grant amount descending
-        query = query.order('grant_amount', desc=True)
-        
-        # Get total count first (before pagination)
-        count_response = query.execute()
-        total_count = count_response.count if hasattr(count_response, 'count') else len(count_response.data)
+        foundation_ids = _match_foundation_ids(foundation_name) if foundation_name else None
+        if foundation_ids is not None and not foundation_ids:
+            # No matching foundations, return empty
+            return [], 0
         
-        # Apply pagination
+        index = get_grant_index()
+        page, per_page = max(page, 1), max(per_page, 1)
         start_idx = (page - 1) * per_page
-        query = query.range(start_idx, start_idx + per_page - 1)
-        
-        response = query.execute()
         
-        if not response.data:
-            return [], 0
-        
-        # Now we need to enrich with foundation names
-        # Get unique foundation IDs from results
-        foundation_ids = list(set([g['foundation_id'] for g in response.data]))
+        if text_query:
+            mask = index.filter_mask(foundation_ids, min_amount, max_amount, state, city, year)
+            rows = index.ranked_search(text_query, mask)
+            total_count = len(rows)
+            page_rows = rows[start_idx:start_idx + per_page]
+        else:
+            page_rows, total_count = index.top_by_amount(
+                start_idx, per_page, foundation_ids, min_amount, max_amount, state, city, year
+            )
         
-        # Fetch foundation names
-        foundation_map = {}
-        if foundation_ids:
-            foundation_response = supabase.table('foundation')\
-                .select('foundation_id, ein, organization_name')\
-                .in_('foundation_id', foundation_ids)\
-                .execute()
-            
-            if foundation_response.data:
-                for f in foundation_response.data:
-                    foundation_map[f['foundation_id']] = {
-                        'name': f['organization_name'],
-                        'ein': f['ein']
-                    }
-        
-        # Format results
-        results = []
-        for grant in response.data:
-            foundation_info = foundation_map.get(grant['foundation_id'], {})
-            results.append({
-                'foundation_name': foundation_info.get('name', ''),
-                'foundation_ein': foundation_info.get('ein', ''),
-                'recipient_name': grant.get('recipient_name', ''),
-                'recipient_city': grant.get('recipient_city', ''),
-                'recipient_state': grant.get('recipient_state', ''),
-                'recipient_relationship': grant.get('recipient_relationship', ''),
-                'recipient_foundation_status': grant.get('recipient_foundation_status', ''),
-                'grant_amount': int(grant.get('grant_amount', 0)) if grant.get('grant_amount') else 0,
-                'cash_amount': int(grant.get('cash_grant_amount', 0)) if grant.get('cash_grant_amount') else 0,
-                'non_cash_amount': int(grant.get('non_cash_grant_amount', 0)) if grant.get('non_cash_grant_amount') else 0,
-                'grant_purpose': grant.get('grant_purpose', 'No purpose specified') or 'No purpose specified',
-                'tax_period': str(grant.get('tax_period_end', ''))
-            })
+        page_ids = [g.decode() for g in index.grant_ids[page_rows]]
+        if not page_ids:
+            return [], total_count
         
-        return results, total_count
+        return _format_grant_results(_fetch_grants_by_id(page_ids)), total_count
         
     except Exception as e:
         print(f"Error searching grants: {e}")
         return [], 0
 
 
-def get_stats() -> Dict:
-    """Get global statistics about all grants and foundations."""
+def iter_grants_export(
+    foundation_name: Optional[str] = None,
+    min_amount: Optional[int] = None,
+    max_amount: Optional[int] = None,
+    state: Optional[str] = None,
+    city: Optional[str] = None,
+    text_query: Optional[str] = None,
+    year: Optional[int] = None,
+    limit: Optional[int] = None
+) -> Iterator[List[GrantResult]]:
+    """
+    Every grant matching the /api/search filters, in /api/search order, as
+    chunks of formatted rows for streaming exports. The grant index yields
+    the ordered matches chunk by chunk; each chunk is fetched by primary key
+    (a few chunks at a time, in parallel), so memory stays flat and no
+    count query is ever run.
+    """
+    from api.search_index import get_grant_index
+    
+    foundation_ids = _match_foundation_ids(foundation_name) if foundation_name else None
+    if foundation_ids is not None and not foundation_ids:
+        return
+    
+    index = get_grant_index()
+    if text_query:
+        mask = index.filter_mask(foundation_ids, min_amount, max_amount, state, city, year)
+        rows = index.ranked_search(text_query, mask)
+        row_chunks = (rows[i:i + EXPORT_CHUNK_SIZE] for i in range(0, len(rows), EXPORT_CHUNK_SIZE))
+    else:
+        row_chunks = index.iter_by_amount(
+            EXPORT_CHUNK_SIZE, foundation_ids, min_amount, max_amount, state, city, year
+        )
+    
+    fetch = lambda ids: _format_grant_results(_fetch_grants_by_id(ids))
+    batch, remaining = [], limit
+    for rows in row_chunks:
+        if remaining is not None:
+            rows = rows[:remaining]
+            remaining -= len(rows)
+        if len(rows):
+            batch.append([g.decode() for g in index.grant_ids[rows]])
+        if len(batch) == EXPORT_PREFETCH or remaining == 0:
+            yield from parallel_map(fetch, batch)
+            batch = []
+        if remaining == 0:
+            return
+    yield from parallel_map(fetch, batch)
+
+
+def _match_foundation_ids(foundation_name: str) -> List[str]:
+    """Filing IDs whose organization name contains the text."""
+    from api.search_index import get_foundation_text_index
+    return get_foundation_text_index().match_foundation_ids(foundation_name)
+
+
+def _fetch_grants_by_id(grant_ids: List[str]) -> List[Dict]:
+    """Fetch grant rows by primary key, returned in the order of grant_ids."""
+    response = supabase.table('grants')\
+        .select('*')\
+        .in_('grant_id', grant_ids)\
+        .execute()
+    
+    by_id = {g['grant_id']: g for g in response.data or []}
+    return [by_id[g] for g in grant_ids if g in by_id]
+
+
+@singleflight
+def get_search_facets(
+    foundation_name: Optional[str] = None,
+    min_amount: Optional[int] = None,
+    max_amount: Optional[int] = None,
+    state: Optional[str] = None,
+    city: Optional[str] = None,
+    text_query: Optional[str] = None,
+    year: Optional[int] = None
+) -> Dict:
+    """
+    Facet counts (recipient state, amount bucket, tax year, recipient status)
+    for the grants matching the /api/search filters, read from the grant index.
+    """
+    from api.search_index import get_grant_index
+    
     try:
-        # Get total grants and sum
-        grants_response = supabase.table('grants')\
-            .select('grant_amount', count='exact')\
-            .execute()
-        
-        total_grants = grants_response.count if hasattr(grants_response, 'count') else len(grants_response.data)
+        foundation_ids = _match_foundation_ids(foundation_name) if foundation_name else None
         
-        # Calculate statistics from grant amounts
-        grant_amounts = [g['grant_amount'] for g in grants_response.data if g.get('grant_amount')]
-        
-        if grant_amounts:
-            total_amount = sum(grant_amounts)
-            avg_grant = total_amount / len(grant_amounts) if grant_amounts else 0
-            min_grant = min(grant_amounts)
-            max_grant = max(grant_amounts)
+        # An empty foundation_ids list (no name match) yields no rows
+        index = get_grant_index()
+        if text_query:
+            mask = index.filter_mask(foundation_ids, min_amount, max_amount, state, city, year)
+            rows = index.ranked_search(text_query, mask)
         else:
-            total_amount = avg_grant = min_grant = max_grant = 0
+            rows = index.filter_rows(foundation_ids, min_amount, max_amount, state, city, year)
+        
+        return index.facet_counts(rows)
         
-        # Get unique states
-        states_response = supabase.table('grants')\
-            .select('recipient_state')\
+    except Exception as e:
+        print(f"Error computing search facets: {e}")
+        return {}
+
+
+def _format_grant_results(grant_rows: List[Dict]) -> List[GrantResult]:
+    """Enrich raw grant rows with foundation names and format for /api/search."""
+    # Get unique foundation IDs from results
+    foundation_ids = list(set([g['foundation_id'] for g in grant_rows]))
+    
+    # Fetch foundation names
+    foundation_map = {}
+    if foundation_ids:
+        foundation_response = supabase.table('foundation')\
+            .select('foundation_id, ein, organization_name')\
+            .in_('foundation_id', foundation_ids)\
             .execute()
         
-        states = sorted(list(set([
-            g['recipient_state'] for g in states_response.data 
-            if g.get('recipient_state')
-        ])))
+        if foundation_response.data:
+            for f in foundation_response.data:
+                foundation_map[f['foundation_id']] = {
+                    'name': f['organization_name'],
+                    'ein': f['ein']
+                }
+    
+    # Format results
+    results = []
+    for grant in grant_rows:
+        foundation_info = foundation_map.get(grant['foundation_id'], {})
+        results.append(GrantResult(
+            foundation_info.get('name', ''),
+            foundation_info.get('ein', ''),
+            grant.get('recipient_name', ''),
+            grant.get('recipient_city', ''),
+            grant.get('recipient_state', ''),
+            grant.get('recipient_relationship', ''),
+            grant.get('recipient_foundation_status', ''),
+            int(grant.get('grant_amount', 0)) if grant.get('grant_amount') else 0,
+            int(grant.get('cash_grant_amount', 0)) if grant.get('cash_grant_amount') else 0,
+            int(grant.get('non_cash_grant_amount', 0)) if grant.get('non_cash_grant_amount') else 0,
+            grant.get('grant_purpose', 'No purpose specified') or 'No purpose specified',
+            str(grant.get('tax_period_end', ''))
+        ))
+    
+    return results
+
+
+@singleflight
+def get_stats() -> Dict:
+    """Get global statistics about all grants and foundations."""
+    try:
+        snapshot = open_snapshot()
+        if snapshot is not None and 'stats' in snapshot:
+            return snapshot.json('stats')
+        
+        # One streaming pass over the grants table, in parallel key ranges
+        total_grants = 0
+        grant_amounts = 0
+        total_amount = 0
+        min_grant = max_grant = None
+        states = set()
+        foundation_grants = defaultdict(lambda: [0, 0])
+        
+        grant_rows = scan_table(
+            'grants', 'grant_id, foundation_id, grant_amount, recipient_state',
+            key='grant_id', partitions=STATS_SCAN_PARTITIONS
+        )
+        for grant in grant_rows:
+            total_grants += 1
+            if grant.get('recipient_state'):
+                states.add(grant['recipient_state'])
+            
+            amount = grant.get('grant_amount')
+            if not amount:
+                continue
+            grant_amounts += 1
+            total_amount += amount
+            min_grant = amount if min_grant is None else min(min_grant, amount)
+            max_grant = amount if max_grant is None else max(max_grant, amount)
+            
+            # Foundation-level stats (grants and total per filing)
+            if grant.get('foundation_id'):
+                totals = foundation_grants[grant['foundation_id']]
+                totals[0] += 1
+                totals[1] += amount
+        
+        avg_grant = total_amount / grant_amounts if grant_amounts else 0
+        states = sorted(states)
         
         # Get unique foundations count
-        foundations_response = supabase.table('foundation')\
-            .select('organization_name')\
-            .execute()
-        
-        unique_foundations = len(set([
-            f['organization_name'] for f in foundations_response.data 
+        unique_foundations = len(set(
+            f['organization_name'] for f in scan_table('foundation', 'organization_name', key='foundation_id')
             if f.get('organization_name')
-        ]))
+        ))
         
-        # Calculate foundation-level stats (need to aggregate grants per foundation)
-        foundation_grants = defaultdict(list)
-        for grant in grants_response.data:
-            if grant.get('grant_amount') and grant.get('foundation_id'):
-                foundation_grants[grant['foundation_id']].append(grant['grant_amount'])
-        
-        grants_per_foundation = [len(grants) for grants in foundation_grants.values()]
-        totals_per_foundation = [sum(grants) for grants in foundation_grants.values()]
+        grants_per_foundation = [count for count, _ in foundation_grants.values()]
+        totals_per_foundation = [total for _, total in foundation_grants.values()]
         
         return {
             'total_grants': total_grants,
             'total_foundations': unique_foundations,
             'total_amount': int(total_amount),
             'avg_grant': int(avg_grant),
-            'min_grant': int(min_grant),
-            'max_grant': int(max_grant),
+            'min_grant': int(min_grant or 0),
+            'max_grant': int(max_grant or 0),
             'states': states,
             'avg_grants_per_foundation': int(sum(grants_per_foundation) / len(grants_per_foundation)) if grants_per_foundation else 0,
             'median_grants_per_foundation': int(sorted(grants_per_foundation)[len(grants_per_foundation) // 2]) if grants_per_foundation else 0,
@@ -238,6 +445,7 @@ def get_stats() -> Dict:
         }
 
 
+@singleflight
 def get_foundation_officers(ein: int) -> List[Dict]:
     """Get list of officers/directors for a foundation by EIN."""
     try:
@@ -249,16 +457,16 @@ def get_foundation_officers(ein: int) -> List[Dict]:
         foundation_id = foundation['foundation_id']
         
         # Get leaders for this foundation
-        response = supabase.table('Leaders')\
-            .select('*')\
-            .eq('foundation_id', foundation_id)\
-            .execute()
+        leaders = list(scan_table(
+            'Leaders', '*', key='leader_id',
+            where=lambda query: query.eq('foundation_id', foundation_id)
+        ))
         
-        if not response.data:
+        if not leaders:
             return []
         
         officers_list = []
-        for officer in response.data:
+        for officer in leaders:
             # Calculate total compensation
             total_comp = 0
             compensation = officer.get('compensation', 0) or 0
@@ -291,107 +499,181 @@ def get_foundation_officers(ein: int) -> List[Dict]:
         return []
 
 
+def _aggregated_stats(filings: List[Dict], summary: Dict) -> Dict:
+    """Profile record from an EIN's filings (most recent first) and its grant rollup."""
+    foundation = filings[0]
+    
+    return {
+        'foundation_id': foundation['foundation_id'],
+        'foundation_ein': int(foundation['ein']),
+        'foundation_name': foundation['organization_name'],
+        'filing_count': len(filings),
+        'grant_count': summary['grant_count'],
+        'total_amount': summary['total_amount'],
+        'median_grant': summary['median_grant'],
+        'avg_grant': summary['avg_grant'],
+        'min_grant': summary['min_grant'],
+        'max_grant': summary['max_grant'],
+        'states_served': summary['states_served'],
+        'cities_served': summary['cities_served'],
+        'top_purposes': summary['top_purposes'],
+        'state_count': summary['state_count'],
+        'city_count': summary['city_count'],
+        'purpose_count': summary['purpose_count'],
+        'latest_period': summary['latest_period'],
+        'primary_state': summary['primary_state'],
+        # Include foundation-level data
+        'formation_year': foundation.get('formation_year', ''),
+        'foundation_address_line1': foundation.get('address_line1', ''),
+        'foundation_address_line2': foundation.get('address_line2', ''),
+        'foundation_city': foundation.get('city', ''),
+        'foundation_state': foundation.get('state', ''),
+        'foundation_zip': foundation.get('zip', ''),
+        'foundation_phone': foundation.get('phone', ''),
+        'foundation_website': foundation.get('website', ''),
+        'legal_domicile_state': foundation.get('legal_domicile_state', ''),
+        'total_assets_eoy': foundation.get('total_assets_eoy'),
+        'fair_market_value_eoy': foundation.get('fair_market_value_eoy'),
+        'total_revenue': foundation.get('total_revenue'),
+        'total_expenses': foundation.get('total_expenses'),
+        'total_distributions': foundation.get('total_distributions'),
+        'investment_income': foundation.get('investment_income'),
+        'is_private_operating_foundation': foundation.get('is_private_operating_foundation', False),
+        'is_501c3': foundation.get('is_501c3', False),
+        'mission_description': foundation.get('mission_description', '')
+    }
+
+
+@singleflight
 def get_foundation_aggregated_stats(ein: int) -> Optional[Dict]:
     """
     Get aggregated statistics for a single foundation.
     Includes grant counts, totals, medians, states served, etc.
     """
     try:
-        # Get foundation record
-        foundation = get_foundation_by_ein(ein)
-        if not foundation:
-            return None
-        
-        foundation_id = foundation['foundation_id']
-        
-        # Get all grants for this foundation
-        grants_response = supabase.table('grants')\
-            .select('*')\
-            .eq('foundation_id', foundation_id)\
-            .execute()
-        
-        if not grants_response.data:
+        # Get every filing; the most recent one supplies contact and financial data
+        filings = get_foundation_filings(ein)
+        if not filings:
             return None
         
-        grants = grants_response.data
-        grant_amounts = [g['grant_amount'] for g in grants if g.get('grant_amount')]
-        
-        if not grant_amounts:
+        # Grant statistics come from the precomputed EIN rollup
+        aggregate = get_foundation_aggregates().get(ein)
+        if not aggregate or not aggregate.grant_count:
             return None
         
-        # Calculate aggregations
-        grant_count = len(grant_amounts)
-        total_amount = sum(grant_amounts)
-        avg_grant = total_amount / grant_count
-        min_grant = min(grant_amounts)
-        max_grant = max(grant_amounts)
-        
-        # Calculate median
-        sorted_amounts = sorted(grant_amounts)
-        median_grant = sorted_amounts[len(sorted_amounts) // 2]
-        
-        # Get unique states and cities
-        states = list(set([g['recipient_state'] for g in grants if g.get('recipient_state')]))
-        cities = list(set([g['recipient_city'] for g in grants if g.get('recipient_city')]))[:10]
-        
-        # Get top purposes (top 3)
-        purposes = [g['grant_purpose'] for g in grants if g.get('grant_purpose')]
-        purpose_counts = Counter(purposes)
-        top_purposes = [purpose for purpose, count in purpose_counts.most_common(3)]
-        
-        # Get latest period
-        periods = [g['tax_period_end'] for g in grants if g.get('tax_period_end')]
-        latest_period = max(periods) if periods else ''
-        
-        # Calculate primary state (state with highest total grant amount)
-        state_totals = defaultdict(float)
-        for grant in grants:
-            if grant.get('recipient_state') and grant.get('grant_amount'):
-                state_totals[grant['recipient_state']] += grant['grant_amount']
-        
-        primary_state = max(state_totals.items(), key=lambda x: x[1])[0] if state_totals else ''
-        
-        return {
-            'foundation_id': foundation_id,
-            'foundation_ein': int(foundation['ein']),
-            'foundation_name': foundation['organization_name'],
-            'grant_count': grant_count,
-            'total_amount': int(total_amount),
-            'median_grant': int(median_grant),
-            'avg_grant': int(avg_grant),
-            'min_grant': int(min_grant),
-            'max_grant': int(max_grant),
-            'states_served': states,
-            'cities_served': cities,
-            'top_purposes': top_purposes,
-            'latest_period': str(latest_period),
-            'primary_state': primary_state,
-            # Include foundation-level data
-            'formation_year': foundation.get('formation_year', ''),
-            'foundation_address_line1': foundation.get('address_line1', ''),
-            'foundation_address_line2': foundation.get('address_line2', ''),
-            'foundation_city': foundation.get('city', ''),
-            'foundation_state': foundation.get('state', ''),
-            'foundation_zip': foundation.get('zip', ''),
-            'foundation_phone': foundation.get('phone', ''),
-            'foundation_website': foundation.get('website', ''),
-            'legal_domicile_state': foundation.get('legal_domicile_state', ''),
-            'total_assets_eoy': foundation.get('total_assets_eoy'),
-            'fair_market_value_eoy': foundation.get('fair_market_value_eoy'),
-            'total_revenue': foundation.get('total_revenue'),
-            'total_expenses': foundation.get('total_expenses'),
-            'total_distributions': foundation.get('total_distributions'),
-            'investment_income': foundation.get('investment_income'),
-            'is_private_operating_foundation': foundation.get('is_private_operating_foundation', False),
-            'is_501c3': foundation.get('is_501c3', False),
-            'mission_description': foundation.get('mission_description', '')
-        }
+        return _aggregated_stats(filings, aggregate.summary)
         
     except Exception as e:
         print(f"Error getting aggregated stats for EIN {ein}: {e}")
         return None
 
 
+def _fetch_filings_for_eins(eins: List[int]) -> List[Dict]:
+    """Every filing of a chunk of EINs, scanned by primary key past the max-rows limit."""
+    ein_list = [str(ein) for ein in eins]
+    return list(scan_table(
+        'foundation', BATCH_FILING_COLUMNS, key='foundation_id',
+        where=lambda query: query.in_('ein', ein_list)
+    ))
+
+
+@singleflight
+def get_foundations_batch(eins: List[int]) -> Tuple[List[Dict], List[int]]:
+    """
+    Aggregated stats and contact info for many foundations at once (CRM sync).
+    Filings are fetched with IN-list queries over chunks of EINs, run in
+    parallel; grant statistics come from the precomputed EIN rollup.
+    Returns (foundations in request order, EINs not found).
+    """
+    eins = list(dict.fromkeys(int(ein) for ein in eins))
+    aggregates = get_foundation_aggregates()
+    
+    # EINs without grants have no profile; skip their filings entirely
+    known = []
+    for ein in eins:
+        aggregate = aggregates.get(ein)
+        if aggregate and aggregate.grant_count:
+            known.append(ein)
+    chunks = [known[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(known), BATCH_CHUNK_SIZE)]
+    
+    try:
+        filings_by_ein = defaultdict(list)
+        for rows in parallel_map(_fetch_filings_for_eins, chunks):
+            for row in rows:
+                filings_by_ein[int(row['ein'])].append(row)
+    except Exception as e:
+        print(f"Error fetching filings for {len(known)} EINs: {e}")
+        return [], eins
+    
+    foundations, not_found = [], []
+    for ein in eins:
+        filings = filings_by_ein.get(ein)
+        if not filings:
+            not_found.append(ein)
+            continue
+        # Most recent first (ties by filing ID), as get_foundation_filings returns them
+        filings.sort(key=lambda f: (str(f.get('tax_period_end') or ''), f['foundation_id']), reverse=True)
+        foundations.append(_aggregated_stats(filings, aggregates.get(ein).summary))
+    
+    return foundations, not_found
+
+
+def _matching_foundations(
+    foundation_name: Optional[str] = None,
+    state: Optional[str] = None,
+    min_total: Optional[int] = None,
+    max_total: Optional[int] = None,
+    min_grants: Optional[int] = None,
+    min_median: Optional[int] = None,
+    max_median: Optional[int] = None,
+    text_query: Optional[str] = None
+) -> List[Tuple[Dict, Optional[float]]]:
+    """(summary, relevance) of every foundation passing the filters, in listing order."""
+    from api.search_index import score_foundations
+    
+    relevance = score_foundations(text_query) if text_query else None
+    name_query = foundation_name.upper() if foundation_name else None
+    
+    matches = []
+    for ein, names, summary in get_foundation_aggregates().summaries():
+        if not summary.get('grant_count'):
+            continue
+        
+        # Apply filters
+        if relevance is not None and ein not in relevance:
+            continue
+        if name_query and not any(name_query in name.upper() for name in names):
+            continue
+        if state and state not in summary['states_served']:
+            continue
+        if min_total is not None and summary['total_amount'] < min_total:
+            continue
+        if max_total is not None and summary['total_amount'] > max_total:
+            continue
+        if min_grants is not None and summary['grant_count'] < min_grants:
+            continue
+        if min_median is not None and summary['median_grant'] < min_median:
+            continue
+        if max_median is not None and summary['median_grant'] > max_median:
+            continue
+        
+        matches.append((summary, round(relevance[ein], 4) if relevance is not None else None))
+    
+    # Sort by relevance when searching by text, otherwise by total amount descending
+    if relevance is not None:
+        matches.sort(key=lambda x: (x[1], x[0]['total_amount']), reverse=True)
+    else:
+        matches.sort(key=lambda x: x[0]['total_amount'], reverse=True)
+    return matches
+
+
+def _foundation_row(summary: Dict, relevance: Optional[float]) -> Dict:
+    row = dict(summary)
+    row['relevance'] = relevance
+    return row
+
+
+@singleflight
 def get_all_foundations_aggregated(
     foundation_name: Optional[str] = None,
     state: Optional[str] = None,
@@ -400,112 +682,28 @@ def get_all_foundations_aggregated(
     min_grants: Optional[int] = None,
     min_median: Optional[int] = None,
     max_median: Optional[int] = None,
+    text_query: Optional[str] = None,
     page: int = 1,
     per_page: int = 20
 ) -> Tuple[List[Dict], int]:
     """
-    Get all foundations with aggregated grant statistics.
+    Get all foundations with aggregated grant statistics, one row per EIN
+    (all filings rolled up), read from the precomputed EIN aggregates.
+    With text_query, only foundations whose mission or grant purposes match
+    are returned, ranked by relevance.
     Returns (results, total_count).
     """
     try:
-        # Get all foundations
-        foundations_query = supabase.table('foundation').select('*')
-        
-        if foundation_name:
-            foundations_query = foundations_query.ilike('organization_name', f'%{foundation_name}%')
-        
-        foundations_response = foundations_query.execute()
-        
-        if not foundations_response.data:
-            return [], 0
-        
-        # Get all grants
-        grants_response = supabase.table('grants')\
-            .select('foundation_id, grant_amount, recipient_state, recipient_city, grant_purpose, tax_period_end')\
-            .execute()
-        
-        # Group grants by foundation
-        foundation_grants = defaultdict(list)
-        for grant in grants_response.data:
-            if grant.get('foundation_id') and grant.get('grant_amount'):
-                foundation_grants[grant['foundation_id']].append(grant)
-        
-        # Build aggregated data for each foundation
-        aggregated = []
-        for foundation in foundations_response.data:
-            foundation_id = foundation['foundation_id']
-            grants = foundation_grants.get(foundation_id, [])
-            
-            if not grants:
-                continue
-            
-            grant_amounts = [g['grant_amount'] for g in grants]
-            grant_count = len(grant_amounts)
-            total_amount = sum(grant_amounts)
-            avg_grant = total_amount / grant_count
-            min_grant = min(grant_amounts)
-            max_grant = max(grant_amounts)
-            sorted_amounts = sorted(grant_amounts)
-            median_grant = sorted_amounts[len(sorted_amounts) // 2]
-            
-            # Get unique states and cities
-            states = list(set([g['recipient_state'] for g in grants if g.get('recipient_state')]))
-            cities = list(set([g['recipient_city'] for g in grants if g.get('recipient_city')]))[:10]
-            
-            # Get top purposes
-            purposes = [g['grant_purpose'] for g in grants if g.get('grant_purpose')]
-            purpose_counts = Counter(purposes)
-            top_purposes = [purpose for purpose, count in purpose_counts.most_common(3)]
-            
-            # Latest period
-            periods = [g['tax_period_end'] for g in grants if g.get('tax_period_end')]
-            latest_period = max(periods) if periods else ''
-            
-            # Primary state
-            state_totals = defaultdict(float)
-            for grant in grants:
-                if grant.get('recipient_state') and grant.get('grant_amount'):
-                    state_totals[grant['recipient_state']] += grant['grant_amount']
-            primary_state = max(state_totals.items(), key=lambda x: x[1])[0] if state_totals else ''
-            
-            # Apply filters
-            if state and state not in states:
-                continue
-            if min_total is not None and total_amount < min_total:
-                continue
-            if max_total is not None and total_amount > max_total:
-                continue
-            if min_grants is not None and grant_count < min_grants:
-                continue
-            if min_median is not None and median_grant < min_median:
-                continue
-            if max_median is not None and median_grant > max_median:
-                continue
-            
-            aggregated.append({
-                'filer_ein': int(foundation['ein']),
-                'filer_organization_name': foundation['organization_name'],
-                'grant_count': grant_count,
-                'total_amount': int(total_amount),
-                'median_grant': int(median_grant),
-                'avg_grant': int(avg_grant),
-                'min_grant': int(min_grant),
-                'max_grant': int(max_grant),
-                'states_served': states,
-                'cities_served': cities,
-                'top_purposes': top_purposes,
-                'latest_period': str(latest_period),
-                'primary_state': primary_state
-            })
+        matches = _matching_foundations(
+            foundation_name, state, min_total, max_total, min_grants, min_median, max_median, text_query
+        )
         
-        # Sort by total amount descending
-        aggregated.sort(key=lambda x: x['total_amount'], reverse=True)
-        
-        # Pagination
-        total_count = len(aggregated)
+        # Pagination; only the page's rows are copied out of the aggregates
+        total_count = len(matches)
+        page, per_page = max(page, 1), max(per_page, 1)
         start_idx = (page - 1) * per_page
         end_idx = start_idx + per_page
-        page_results = aggregated[start_idx:end_idx]
+        page_results = [_foundation_row(summary, relevance) for summary, relevance in matches[start_idx:end_idx]]
         
         return page_results, total_count
         
@@ -514,41 +712,117 @@ def get_all_foundations_aggregated(
         return [], 0
 
 
-def get_foundation_grants(ein: int) -> List[Dict]:
-    """Get all grants for a specific foundation."""
+def iter_foundations_export(
+    foundation_name: Optional[str] = None,
+    state: Optional[str] = None,
+    min_total: Optional[int] = None,
+    max_total: Optional[int] = None,
+    min_grants: Optional[int] = None,
+    min_median: Optional[int] = None,
+    max_median: Optional[int] = None,
+    text_query: Optional[str] = None,
+    limit: Optional[int] = None
+) -> Iterator[List[Dict]]:
+    """Every foundation matching the /api/foundations_aggregated filters, in chunks of rows."""
+    matches = _matching_foundations(
+        foundation_name, state, min_total, max_total, min_grants, min_median, max_median, text_query
+    )
+    if limit is not None:
+        matches = matches[:limit]
+    for i in range(0, len(matches), EXPORT_CHUNK_SIZE):
+        yield [_foundation_row(summary, relevance) for summary, relevance in matches[i:i + EXPORT_CHUNK_SIZE]]
+
+
+@singleflight
+def get_foundation_history(ein: int) -> Optional[Dict]:
+    """
+    Get the per-tax-year series for a foundation (all filings of the EIN).
+    Served from the precomputed EIN aggregates; no grants are scanned.
+    """
     try:
-        foundation = get_foundation_by_ein(ein)
-        if not foundation:
-            return []
+        aggregate = get_foundation_aggregates().get(ein)
+        if not aggregate:
+            return None
         
-        foundation_id = foundation['foundation_id']
+        return {
+            'foundation_ein': aggregate.ein,
+            'foundation_name': aggregate.name,
+            'filing_count': len(aggregate.filings),
+            'years': aggregate.history
+        }
         
-        # Get all grants
-        response = supabase.table('grants')\
-            .select('*')\
-            .eq('foundation_id', foundation_id)\
-            .order('grant_amount', desc=True)\
-            .execute()
+    except Exception as e:
+        print(f"Error getting history for EIN {ein}: {e}")
+        return None
+
+
+@singleflight
+def get_foundation_distribution(ein: int, percentiles: Optional[List[float]] = None) -> Optional[Dict]:
+    """Grant amount percentiles and histogram for a foundation, from its precomputed sketch."""
+    try:
+        aggregate = get_foundation_aggregates().get(ein)
+        if not aggregate or not aggregate.sketch.n:
+            return None
+        
+        distribution = describe_distribution(aggregate.sketch, percentiles)
+        distribution['foundation_ein'] = aggregate.ein
+        distribution['foundation_name'] = aggregate.name
+        return distribution
+        
+    except Exception as e:
+        print(f"Error getting distribution for EIN {ein}: {e}")
+        return None
+
+
+@singleflight
+def get_state_distribution(state: str, percentiles: Optional[List[float]] = None) -> Optional[Dict]:
+    """Grant amount percentiles and histogram for all grants to one recipient state."""
+    try:
+        sketch = get_foundation_aggregates().state_sketches.get(state.upper())
+        if not sketch or not sketch.n:
+            return None
+        
+        distribution = describe_distribution(sketch, percentiles)
+        distribution['state'] = state.upper()
+        return distribution
         
-        if not response.data:
+    except Exception as e:
+        print(f"Error getting distribution for state {state}: {e}")
+        return None
+
+
+@singleflight
+def get_foundation_grants(ein: int) -> List[FoundationGrant]:
+    """Get all grants for a specific foundation, largest first."""
+    try:
+        filing_ids = [f['foundation_id'] for f in get_foundation_filings(ein)]
+        if not filing_ids:
             return []
         
-        grants = []
-        for grant in response.data:
-            grants.append({
-                'recipient_name': grant.get('recipient_name', ''),
-                'recipient_ein': grant.get('recipient_ein', ''),
-                'recipient_city': grant.get('recipient_city', ''),
-                'recipient_state': grant.get('recipient_state', ''),
-                'recipient_relationship': grant.get('recipient_relationship', ''),
-                'recipient_foundation_status': grant.get('recipient_foundation_status', ''),
-                'grant_amount': int(grant.get('grant_amount', 0)) if grant.get('grant_amount') else 0,
-                'cash_amount': int(grant.get('cash_grant_amount', 0)) if grant.get('cash_grant_amount') else 0,
-                'non_cash_amount': int(grant.get('non_cash_grant_amount', 0)) if grant.get('non_cash_grant_amount') else 0,
-                'grant_purpose': grant.get('grant_purpose', 'No purpose specified') or 'No purpose specified',
-                'tax_period': str(grant.get('tax_period_end', ''))
-            })
+        # Get all grants across every filing of this EIN, however many there are
+        grant_rows = scan_table(
+            'grants', '*', key='grant_id',
+            where=lambda query: query.in_('foundation_id', filing_ids)
+        )
         
+        grants = []
+        for grant in grant_rows:
+            grants.append(FoundationGrant(
+                grant.get('recipient_name', ''),
+                grant.get('recipient_ein', ''),
+                grant.get('recipient_city', ''),
+                grant.get('recipient_state', ''),
+                grant.get('recipient_relationship', ''),
+                grant.get('recipient_foundation_status', ''),
+                int(grant.get('grant_amount', 0)) if grant.get('grant_amount') else 0,
+                int(grant.get('cash_grant_amount', 0)) if grant.get('cash_grant_amount') else 0,
+                int(grant.get('non_cash_grant_amount', 0)) if grant.get('non_cash_grant_amount') else 0,
+                grant.get('grant_purpose', 'No purpose specified') or 'No purpose specified',
+                str(grant.get('tax_period_end', ''))
+            ))
+        
+        # Largest grants first
+        grants.sort(key=attrgetter('grant_amount'), reverse=True)
         return grants
         
     except Exception as e:
@@ -556,56 +830,263 @@ def get_foundation_grants(ein: int) -> List[Dict]:
         return []
 
 
-def get_foundation_state_breakdown(ein: int) -> List[Dict]:
-    """Get state-by-state breakdown of grants for a foundation."""
+@singleflight
+def get_foundation_state_breakdown(
+    ein: int,
+    year: Optional[int] = None,
+    min_amount: Optional[int] = None,
+    max_amount: Optional[int] = None
+) -> List[Dict]:
+    """Get state-by-state breakdown of grants for a foundation (a slice of the giving cube)."""
     try:
-        foundation = get_foundation_by_ein(ein)
-        if not foundation:
-            return []
+        return get_foundation_aggregates().cube.foundation_states(ein, year, min_amount, max_amount)
         
-        foundation_id = foundation['foundation_id']
-        
-        # Get all grants for this foundation
-        response = supabase.table('grants')\
-            .select('recipient_state, grant_amount')\
-            .eq('foundation_id', foundation_id)\
-            .execute()
-        
-        if not response.data:
-            return []
+    except Exception as e:
+        print(f"Error getting state breakdown for EIN {ein}: {e}")
+        return []
+
+
+@singleflight
+def get_national_state_breakdown(
+    year: Optional[int] = None,
+    min_amount: Optional[int] = None,
+    max_amount: Optional[int] = None
+) -> Dict:
+    """Giving by recipient state across all funders, optionally for one tax year and amount range."""
+    try:
+        cube = get_foundation_aggregates().cube
+        states = cube.national_states(year, min_amount, max_amount)
+        return {
+            'states': states,
+            'years': cube.years,
+            'grant_count': sum(s['grant_count'] for s in states),
+            'total_amount': sum(s['total_amount'] for s in states)
+        }
         
-        # Group by state
-        state_data = defaultdict(lambda: {'grants': [], 'count': 0})
-        for grant in response.data:
-            state = grant.get('recipient_state')
-            amount = grant.get('grant_amount')
-            if state and amount:
-                state_data[state]['grants'].append(amount)
-                state_data[state]['count'] += 1
-        
-        # Calculate statistics for each state
-        states_list = []
-        for state, data in state_data.items():
-            grants = data['grants']
-            total = sum(grants)
-            avg = total / len(grants)
-            sorted_grants = sorted(grants)
-            median = sorted_grants[len(sorted_grants) // 2]
-            
-            states_list.append({
-                'state': state,
-                'grant_count': data['count'],
-                'total_amount': int(total),
-                'avg_grant': int(avg),
-                'median_grant': int(median)
+    except Exception as e:
+        print(f"Error getting national state breakdown: {e}")
+        return {'states': [], 'years': [], 'grant_count': 0, 'total_amount': 0}
+
+
+def _chunks(items: List, size: int) -> List[List]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _fetch_recipient_grants(grant_ids: List[str]) -> List[Dict]:
+    response = supabase.table('grants')\
+        .select('grant_id, foundation_id, grant_amount, grant_purpose, tax_period_end')\
+        .in_('grant_id', grant_ids)\
+        .execute()
+    return response.data or []
+
+
+def _fetch_recipient_funders(foundation_ids: List[str]) -> List[Dict]:
+    response = supabase.table('foundation')\
+        .select('foundation_id, ein, organization_name')\
+        .in_('foundation_id', foundation_ids)\
+        .execute()
+    return response.data or []
+
+
+@singleflight
+def get_recipient(recipient_id: str) -> Optional[Dict]:
+    """
+    Get a recipient with its funders and grant history.
+    Grant IDs come from the recipient index, so grants are fetched by
+    primary key instead of scanning by recipient name.
+    """
+    try:
+        recipient = get_recipient_index().get(recipient_id)
+        if not recipient:
+            return None
+
+        # Fetch the recipient's grants by primary key (chunked to keep URLs short, chunks in parallel)
+        grant_ids = list(recipient['grant_ids'])
+        grant_rows = []
+        for rows in parallel_map(_fetch_recipient_grants, _chunks(grant_ids, RECIPIENT_CHUNK_SIZE)):
+            grant_rows.extend(rows)
+
+        # Resolve funder names and EINs
+        foundation_ids = list(set([g['foundation_id'] for g in grant_rows if g.get('foundation_id')]))
+        foundation_map = {}
+        for rows in parallel_map(_fetch_recipient_funders, _chunks(foundation_ids, RECIPIENT_CHUNK_SIZE)):
+            for f in rows:
+                foundation_map[f['foundation_id']] = f
+
+        # Aggregate by funder EIN and build the grant history
+        funders = {}
+        history = []
+        for grant in grant_rows:
+            foundation = foundation_map.get(grant.get('foundation_id'), {})
+            ein = int(foundation['ein']) if foundation.get('ein') else None
+            amount = int(grant.get('grant_amount') or 0)
+            period = str(grant.get('tax_period_end') or '')
+
+            history.append({
+                'foundation_name': foundation.get('organization_name', ''),
+                'foundation_ein': ein,
+                'grant_amount': amount,
+                'grant_purpose': grant.get('grant_purpose') or 'No purpose specified',
+                'tax_period': period
+            })
+
+            funder = funders.setdefault(ein, {
+                'foundation_name': foundation.get('organization_name', ''),
+                'foundation_ein': ein,
+                'grant_count': 0,
+                'total_amount': 0,
+                'first_period': period,
+                'latest_period': period
             })
+            funder['grant_count'] += 1
+            funder['total_amount'] += amount
+            if period and (not funder['first_period'] or period < funder['first_period']):
+                funder['first_period'] = period
+            if period > funder['latest_period']:
+                funder['latest_period'] = period
+
+        funders_list = sorted(funders.values(), key=lambda x: x['total_amount'], reverse=True)
+        history.sort(key=lambda x: (x['tax_period'], x['grant_amount']), reverse=True)
+
+        return {
+            'recipient_id': recipient['recipient_id'],
+            'recipient_name': recipient['recipient_name'],
+            'recipient_ein': recipient['recipient_ein'],
+            'city': recipient['city'],
+            'state': recipient['state'],
+            'zip': recipient['zip'],
+            'grant_count': len(history),
+            'total_amount': sum(g['grant_amount'] for g in history),
+            'funder_count': len(funders_list),
+            'funders': funders_list,
+            'grants': history
+        }
+
+    except Exception as e:
+        print(f"Error getting recipient {recipient_id}: {e}")
+        return None
+
+
+@singleflight
+def search_recipients(
+    name: Optional[str] = None,
+    ein: Optional[str] = None,
+    state: Optional[str] = None,
+    page: int = 1,
+    per_page: int = 20
+) -> Tuple[List[Dict], int]:
+    """
+    Search recipients by normalized name and/or EIN using the recipient index.
+    Returns (results, total_count).
+    """
+    try:
+        matches = get_recipient_index().search(name=name, ein=ein, state=state)
+
+        start_idx = (page - 1) * per_page
+        results = []
+        for recipient in matches[start_idx:start_idx + per_page]:
+            results.append({
+                'recipient_id': recipient['recipient_id'],
+                'recipient_name': recipient['recipient_name'],
+                'recipient_ein': recipient['recipient_ein'],
+                'city': recipient['city'],
+                'state': recipient['state'],
+                'grant_count': len(recipient['grant_ids'])
+            })
+
+        return results, len(matches)
+
+    except Exception as e:
+        print(f"Error searching recipients: {e}")
+        return [], 0
+
+
+@singleflight
+def get_person_boards(name: str, limit: int = 20) -> Tuple[List[Dict], int]:
+    """
+    People matching a name and every foundation board they sit on, from the
+    board interlock graph. Returns (people, total_count).
+    """
+    from api.board_index import get_board_index
+    try:
+        people = get_board_index().find_people(name)
+        return people[:limit], len(people)
+
+    except Exception as e:
+        print(f"Error finding boards for person {name}: {e}")
+        return [], 0
+
+
+@singleflight
+def get_foundation_connections(ein: int, limit: int = 50) -> Optional[Dict]:
+    """A foundation's board members and the foundations sharing them (None when it has no leaders)."""
+    from api.board_index import get_board_index
+    try:
+        return get_board_index().connections(ein, limit)
+
+    except Exception as e:
+        print(f"Error getting board connections for EIN {ein}: {e}")
+        return None
+
+
+@singleflight
+def get_similar_foundations(ein: int, limit: int = 10) -> Optional[List[Dict]]:
+    """
+    Foundations most like this one (purpose terms, recipient states, grant
+    sizes), from the precomputed neighbour lists. None when the EIN has no grants
+    or no neighbour file has been built (build_similar.py).
+    """
+    from api.similar_foundations import get_similar_foundations as get_neighbours
+    try:
+        similar = get_neighbours()
+        if similar is None:
+            return None
         
-        # Sort by grant count descending
-        states_list.sort(key=lambda x: x['grant_count'], reverse=True)
+        neighbours = similar.get(ein)
+        if neighbours is None:
+            return None
         
-        return states_list
+        aggregates = get_foundation_aggregates()
+        results = []
+        for other, score in neighbours[:limit]:
+            aggregate = aggregates.get(other)
+            if not aggregate:
+                continue
+            summary = aggregate.summary
+            results.append({
+                'foundation_ein': other,
+                'foundation_name': summary['filer_organization_name'],
+                'similarity': round(score, 4),
+                'grant_count': summary['grant_count'],
+                'total_amount': summary['total_amount'],
+                'median_grant': summary['median_grant'],
+                'primary_state': summary['primary_state'],
+                'top_purposes': summary['top_purposes']
+            })
+        return results
         
     except Exception as e:
-        print(f"Error getting state breakdown for EIN {ein}: {e}")
-        return []
+        print(f"Error getting similar foundations for EIN {ein}: {e}")
+        return None
+
 
+@singleflight
+def match_foundations(
+    state: Optional[str] = None,
+    ask: Optional[float] = None,
+    keywords: Optional[str] = None,
+    limit: int = 25
+) -> Optional[List[Dict]]:
+    """
+    Foundations to approach for a nonprofit's state, grant ask and mission
+    keywords, best first, with a per-component score breakdown.
+    With a state, only foundations funding recipients there are returned;
+    None when no foundation does (unknown state).
+    """
+    from api.prospect_match import get_prospect_matrix
+    try:
+        return get_prospect_matrix().match(state=state, ask=ask, keywords=keywords, limit=limit)
+
+    except Exception as e:
+        print(f"Error matching foundations: {e}")
+        return []
@@ -1,7 +1,19 @@
-from flask import Flask, render_template, request, jsonify
-from api import supabase_api
+import gzip
+import hmac
+import os
+import re
+
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
+from api import foundation_profiles, reload, supabase_api
+from utils import cache_warmer, columnar, export_formats, request_metrics, response_cache, singleflight
+from utils.json_provider import FastJSONProvider
+from utils.response_cache import cached_response
+from utils.supabase_client import on_data_changed
 
 app = Flask(__name__, static_folder='public', static_url_path='')
+app.json = FastJSONProvider(app)
+request_metrics.init_app(app, supabase_api.supabase)
+cache_warmer.init_app(app)
 
 
 @app.route('/')
@@ -9,43 +21,129 @@ def index():
     return render_template('index.html')
 
 
+# Header carrying GRANT_FINDER_DEBUG_TOKEN for the debug actions that change state
+DEBUG_TOKEN_HEADER = 'X-Debug-Token'
+
+
+def _debug_authorized() -> bool:
+    """True when the request carries the configured debug token (never when none is configured)"""
+    token = os.environ.get('GRANT_FINDER_DEBUG_TOKEN', '')
+    return bool(token) and hmac.compare_digest(request.headers.get(DEBUG_TOKEN_HEADER, ''), token)
+
+
+def _debug_forbidden():
+    return jsonify({'error': f'Requires the {DEBUG_TOKEN_HEADER} header set to GRANT_FINDER_DEBUG_TOKEN'}), 403
+
+
+@app.route('/debug/metrics')
+def debug_metrics():
+    """Rolling per-route latencies (p50/p95/p99), backend call accounting, coalesced reads and cache hits"""
+    if request.args.get('reset', '').lower() in ['1', 'true', 'yes']:
+        if not _debug_authorized():
+            return _debug_forbidden()
+        request_metrics.metrics.reset()
+        singleflight.flights.reset()
+        response_cache.cache.reset_stats()
+    snapshot = request_metrics.metrics.snapshot()
+    snapshot['coalescing'] = singleflight.flights.snapshot()
+    snapshot['response_cache'] = response_cache.cache.snapshot()
+    return jsonify(snapshot)
+
+
+def data_changed():
+    """New data was loaded: drop every index, the snapshot and cached responses, then re-warm (True if a warm run started)"""
+    reload.reset_indexes()
+    return cache_warmer.schedule_warm(app)
+
+
+# Replica syncs that change rows (sync_replica.py) rebuild the same way
+on_data_changed(data_changed)
+
+
+@app.route('/debug/warm', methods=['POST'])
+def debug_warm():
+    """Rebuild from the current data and replay the most requested paths in the background (e.g. after an ingestion)"""
+    if not _debug_authorized():
+        return _debug_forbidden()
+    started = data_changed()
+    if not cache_warmer.warming_enabled():
+        return jsonify({'scheduled': False}), 200
+    return jsonify({'scheduled': True, 'started': started}), 202
+
+
 @app.route('/api/stats')
+@cached_response
 def get_stats():
     """Get basic statistics about the dataset"""
     stats = supabase_api.get_stats()
     return jsonify(stats)
 
 
+def _pagination():
+    """(page, per_page) from the query string, both at least 1"""
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    return max(page, 1), max(per_page, 1)
+
+
+def _grant_filters() -> dict:
+    """/api/search filter parameters, as supabase_api keyword arguments"""
+    return {
+        'foundation_name': request.args.get('foundation', '').strip() or None,
+        'min_amount': request.args.get('min_amount', type=int),
+        'max_amount': request.args.get('max_amount', type=int),
+        'state': request.args.get('state', '').strip().upper() or None,
+        'city': request.args.get('city', '').strip() or None,
+        'text_query': request.args.get('q', '').strip() or None,
+        'year': request.args.get('year', type=int)
+    }
+
+
+def _row_format():
+    """Grant list layout from ?format= ('rows' by default, or 'columnar'); None when unknown"""
+    row_format = request.args.get('format', '').strip().lower() or 'rows'
+    return row_format if row_format in columnar.ROW_FORMATS else None
+
+
+def _row_format_error():
+    return jsonify({'error': f"format must be one of {', '.join(columnar.ROW_FORMATS)}"}), 400
+
+
+def _grant_list(rows, row_class, row_format: str):
+    """Grant rows as a list of dicts, or one column header plus arrays per column"""
+    if row_format == 'columnar':
+        return columnar.encode_columnar(rows, row_class)
+    return columnar.to_dicts(rows)
+
+
 @app.route('/api/search')
+@cached_response
 def search_grants():
     """Search and filter grants"""
+    row_format = _row_format()
+    if row_format is None:
+        return _row_format_error()
+    
     # Get query parameters
-    foundation_name = request.args.get('foundation', '').strip()
-    min_amount = request.args.get('min_amount', type=int)
-    max_amount = request.args.get('max_amount', type=int)
-    state = request.args.get('state', '').strip().upper()
-    city = request.args.get('city', '').strip()
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
+    filters = _grant_filters()
+    page, per_page = _pagination()
     
     # Search grants using Supabase API
-    results, total_results = supabase_api.search_grants(
-        foundation_name=foundation_name if foundation_name else None,
-        min_amount=min_amount,
-        max_amount=max_amount,
-        state=state if state else None,
-        city=city if city else None,
-        page=page,
-        per_page=per_page
-    )
+    results, total_results = supabase_api.search_grants(page=page, per_page=per_page, **filters)
     
-    return jsonify({
-        'results': results,
+    response = {
+        'results': _grant_list(results, supabase_api.GrantResult, row_format),
         'total': total_results,
         'page': page,
         'per_page': per_page,
         'total_pages': (total_results + per_page - 1) // per_page if total_results > 0 else 0
-    })
+    }
+    
+    # Optional facet counts for the same filter set (?facets=1)
+    if request.args.get('facets', '').lower() in ['1', 'true', 'yes']:
+        response['facets'] = supabase_api.get_search_facets(**filters)
+    
+    return jsonify(response)
 
 
 @app.route('/api/foundations')
@@ -53,65 +151,106 @@ def get_foundations():
     """Get list of all foundation names for autocomplete"""
     query = request.args.get('q', '').strip().upper()
     
-    foundations = supabase_api.get_all_foundation_eins()
-    
-    if query:
-        foundations = [f for f in foundations if query in f.upper()]
-    
     # Limit to 50 results for autocomplete
-    foundations = foundations[:50]
+    foundations = supabase_api.search_foundation_names(query, limit=50)
     
     return jsonify(foundations)
 
 
+# Largest EIN list accepted by /api/foundations/batch
+MAX_BATCH_EINS = 5000
+
+# '12-3456789', '123456789' or a shorter number with its leading zeros dropped
+EIN_PATTERN = re.compile(r'[0-9]{2}-?[0-9]{7}|[0-9]{1,9}')
+
+
+def _parse_ein(raw):
+    """An EIN from a JSON int or string, or None when it is not one (floats, bools, stray characters)."""
+    if isinstance(raw, int) and not isinstance(raw, bool):
+        return raw if 0 < raw <= 999999999 else None
+    if isinstance(raw, str) and EIN_PATTERN.fullmatch(raw.strip()):
+        ein = int(raw.strip().replace('-', ''))
+        return ein or None
+    return None
+
+
+@app.route('/api/foundations/batch', methods=['POST'])
+def get_foundations_batch():
+    """Aggregate stats and contact info for many EINs at once (CRM sync)"""
+    body = request.get_json(silent=True) or {}
+    raw_eins = body.get('eins')
+    
+    if not isinstance(raw_eins, list) or not raw_eins:
+        return jsonify({'error': 'Provide a JSON body like {"eins": [123456789, ...]}'}), 400
+    if len(raw_eins) > MAX_BATCH_EINS:
+        return jsonify({'error': f'At most {MAX_BATCH_EINS} EINs per request'}), 400
+    
+    eins = [_parse_ein(raw) for raw in raw_eins]
+    invalid = [raw for raw, ein in zip(raw_eins, eins) if ein is None]
+    if invalid:
+        return jsonify({'error': 'EINs must be integers or strings like "12-3456789"', 'invalid': invalid[:20]}), 400
+    
+    foundations, not_found = supabase_api.get_foundations_batch(eins)
+    
+    return jsonify({
+        'foundations': foundations,
+        'not_found': not_found,
+        'count': len(foundations)
+    })
+
+
+def _foundation_filters() -> dict:
+    """/api/foundations_aggregated filter parameters, as supabase_api keyword arguments"""
+    return {
+        'foundation_name': request.args.get('foundation', '').strip() or None,
+        'state': request.args.get('state', '').strip().upper() or None,
+        'min_total': request.args.get('min_total', type=int),
+        'max_total': request.args.get('max_total', type=int),
+        'min_grants': request.args.get('min_grants', type=int),
+        'min_median': request.args.get('min_median', type=int),
+        'max_median': request.args.get('max_median', type=int),
+        'text_query': request.args.get('q', '').strip() or None
+    }
+
+
+def _format_foundation_row(row: dict) -> dict:
+    """Aggregated foundation row in the /api/foundations_aggregated response format"""
+    return {
+        'foundation_name': row['filer_organization_name'],
+        'foundation_ein': row['filer_ein'],
+        'grant_count': row['grant_count'],
+        'total_amount': row['total_amount'],
+        'median_grant': row['median_grant'],
+        'avg_grant': row['avg_grant'],
+        'min_grant': row['min_grant'],
+        'max_grant': row['max_grant'],
+        'states_served': row['states_served'],
+        'cities_served': row['cities_served'],
+        'top_purposes': row['top_purposes'],
+        'state_count': row['state_count'],
+        'city_count': row['city_count'],
+        'purpose_count': row['purpose_count'],
+        'latest_period': row['latest_period'],
+        'primary_state': row['primary_state'],
+        'filing_count': row['filing_count'],
+        'relevance': row['relevance']
+    }
+
+
 @app.route('/api/foundations_aggregated')
+@cached_response
 def get_foundations_aggregated():
     """Get aggregated foundation data with filters"""
     # Get query parameters
-    foundation_name = request.args.get('foundation', '').strip()
-    state = request.args.get('state', '').strip().upper()
-    min_total = request.args.get('min_total', type=int)
-    max_total = request.args.get('max_total', type=int)
-    min_grants = request.args.get('min_grants', type=int)
-    min_median = request.args.get('min_median', type=int)
-    max_median = request.args.get('max_median', type=int)
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
+    page, per_page = _pagination()
     
     # Get aggregated foundations
     results, total_results = supabase_api.get_all_foundations_aggregated(
-        foundation_name=foundation_name if foundation_name else None,
-        state=state if state else None,
-        min_total=min_total,
-        max_total=max_total,
-        min_grants=min_grants,
-        min_median=min_median,
-        max_median=max_median,
-        page=page,
-        per_page=per_page
+        page=page, per_page=per_page, **_foundation_filters()
     )
     
-    # Format results to match original response
-    formatted_results = []
-    for row in results:
-        formatted_results.append({
-            'foundation_name': row['filer_organization_name'],
-            'foundation_ein': row['filer_ein'],
-            'grant_count': row['grant_count'],
-            'total_amount': row['total_amount'],
-            'median_grant': row['median_grant'],
-            'avg_grant': row['avg_grant'],
-            'min_grant': row['min_grant'],
-            'max_grant': row['max_grant'],
-            'states_served': row['states_served'],
-            'cities_served': row['cities_served'],
-            'top_purposes': row['top_purposes'],
-            'latest_period': row['latest_period'],
-            'primary_state': row['primary_state']
-        })
-    
     return jsonify({
-        'results': formatted_results,
+        'results': [_format_foundation_row(row) for row in results],
         'total': total_results,
         'page': page,
         'per_page': per_page,
@@ -119,9 +258,66 @@ def get_foundations_aggregated():
     })
 
 
+GRANT_EXPORT_COLUMNS = [
+    ('foundation_name', 'str'), ('foundation_ein', 'int'), ('recipient_name', 'str'),
+    ('recipient_city', 'str'), ('recipient_state', 'str'), ('recipient_relationship', 'str'),
+    ('recipient_foundation_status', 'str'), ('grant_amount', 'int'), ('cash_amount', 'int'),
+    ('non_cash_amount', 'int'), ('grant_purpose', 'str'), ('tax_period', 'str')
+]
+FOUNDATION_EXPORT_COLUMNS = [
+    ('foundation_name', 'str'), ('foundation_ein', 'int'), ('filing_count', 'int'),
+    ('grant_count', 'int'), ('total_amount', 'int'), ('median_grant', 'int'), ('avg_grant', 'int'),
+    ('min_grant', 'int'), ('max_grant', 'int'), ('primary_state', 'str'), ('states_served', 'list'),
+    ('cities_served', 'list'), ('top_purposes', 'list'), ('state_count', 'int'), ('city_count', 'int'),
+    ('purpose_count', 'int'), ('latest_period', 'str'), ('relevance', 'float')
+]
+
+
+def _export_response(name: str, columns, chunks):
+    """Stream row chunks in the requested ?format= (csv, ndjson or parquet)"""
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in export_formats.EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(export_formats.EXPORT_FORMATS)}"}), 400
+    if export_format == 'parquet' and not export_formats.parquet_available():
+        return jsonify({'error': 'Parquet export requires pyarrow on the server'}), 501
+    
+    def generate():
+        try:
+            yield from export_formats.encode_stream(export_format, columns, chunks)
+        except Exception as e:
+            # Headers are already sent; log and cut the stream so the client sees it incomplete
+            print(f"Error exporting {name}: {e}")
+            raise
+    
+    mimetype, extension = export_formats.EXPORT_FORMATS[export_format]
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{name}.{extension}"'
+    return response
+
+
+@app.route('/api/export/grants')
+def export_grants():
+    """Every grant matching the /api/search filters, streamed as CSV, NDJSON or Parquet"""
+    chunks = supabase_api.iter_grants_export(limit=request.args.get('limit', type=int), **_grant_filters())
+    return _export_response('grants', GRANT_EXPORT_COLUMNS, chunks)
+
+
+@app.route('/api/export/foundations')
+def export_foundations():
+    """Every foundation matching the /api/foundations_aggregated filters, streamed"""
+    chunks = supabase_api.iter_foundations_export(limit=request.args.get('limit', type=int), **_foundation_filters())
+    formatted = ([_format_foundation_row(row) for row in chunk] for chunk in chunks)
+    return _export_response('foundations', FOUNDATION_EXPORT_COLUMNS, formatted)
+
+
 @app.route('/api/foundation/<int:ein>')
+@cached_response
 def get_foundation_detail(ein):
     """Get detailed information for a specific foundation including all grants"""
+    row_format = _row_format()
+    if row_format is None:
+        return _row_format_error()
+    
     # Get foundation aggregated stats
     foundation_data = supabase_api.get_foundation_aggregated_stats(ein)
     
@@ -150,6 +346,9 @@ def get_foundation_detail(ein):
         'states_served': foundation_data['states_served'],
         'cities_served': foundation_data['cities_served'],
         'top_purposes': foundation_data['top_purposes'],
+        'state_count': foundation_data['state_count'],
+        'city_count': foundation_data['city_count'],
+        'purpose_count': foundation_data['purpose_count'],
         'latest_period': safe_get(foundation_data, 'latest_period'),
         'primary_state': safe_get(foundation_data, 'primary_state'),
         # Foundation contact info
@@ -157,7 +356,7 @@ def get_foundation_detail(ein):
         'foundation_phone': safe_get(foundation_data, 'foundation_phone'),
         'foundation_city': safe_get(foundation_data, 'foundation_city'),
         'foundation_state': safe_get(foundation_data, 'foundation_state'),
-        'grants': grants
+        'grants': _grant_list(grants, supabase_api.FoundationGrant, row_format)
     })
 
 
@@ -168,111 +367,129 @@ def foundation_profile(ein):
 
 
 @app.route('/api/foundation/<int:ein>/stats')
+@cached_response
 def get_foundation_stats(ein):
     """Get detailed statistics for a foundation including state-by-state breakdown"""
-    # Get foundation aggregated data
-    foundation_data = supabase_api.get_foundation_aggregated_stats(ein)
+    # Serve the pre-rendered profile when build_profiles.py made one
+    artifact = foundation_profiles.read_artifact(ein)
+    if artifact is not None:
+        data, etag = artifact
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            response = Response(data, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = Response(gzip.decompress(data), mimetype='application/json')
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = 'public, max-age=300, s-maxage=86400'
+        response.set_etag(etag)
+        return response.make_conditional(request)
     
-    if not foundation_data:
+    profile = foundation_profiles.build_profile(ein)
+    
+    if not profile:
         return jsonify({'error': 'Foundation not found'}), 404
     
-    # Get all grants for state breakdown and top/recent grants
-    all_grants = supabase_api.get_foundation_grants(ein)
-    
-    # Calculate state-by-state statistics
-    states_data = supabase_api.get_foundation_state_breakdown(ein)
-    
-    # Get top 10 grants (already sorted by amount descending)
-    top_grants_list = []
-    for grant in all_grants[:10]:
-        top_grants_list.append({
-            'recipient_name': grant['recipient_name'],
-            'recipient_city': grant['recipient_city'],
-            'recipient_state': grant['recipient_state'],
-            'grant_amount': grant['grant_amount'],
-            'grant_purpose': grant['grant_purpose'],
-            'tax_period': grant['tax_period']
-        })
-    
-    # Get most recent 10 grants (sort by tax period)
-    recent_grants_sorted = sorted(all_grants, key=lambda x: x['tax_period'], reverse=True)
-    recent_grants_list = []
-    for grant in recent_grants_sorted[:10]:
-        recent_grants_list.append({
-            'recipient_name': grant['recipient_name'],
-            'recipient_city': grant['recipient_city'],
-            'recipient_state': grant['recipient_state'],
-            'grant_amount': grant['grant_amount'],
-            'grant_purpose': grant['grant_purpose'],
-            'tax_period': grant['tax_period']
-        })
-    
-    # Get officers
-    officers = supabase_api.get_foundation_officers(ein)
-    
-    # Helper functions to safely get values
-    def safe_get(key, default=''):
-        val = foundation_data.get(key, default)
-        if val is None:
-            return default
-        return val
+    return jsonify(profile)
+
+
+@app.route('/api/foundation/<int:ein>/history')
+@cached_response
+def get_foundation_history(ein):
+    """Get the per-tax-year giving series for a foundation (all filings)"""
+    history = supabase_api.get_foundation_history(ein)
     
-    def safe_int(key, default=0):
-        val = foundation_data.get(key, default)
-        if val is None or val == '':
-            return default
-        try:
-            return int(val)
-        except (ValueError, TypeError):
-            return default
+    if not history:
+        return jsonify({'error': 'Foundation not found'}), 404
     
-    def safe_bool(key):
-        val = foundation_data.get(key, False)
-        if isinstance(val, bool):
-            return val
-        if isinstance(val, str):
-            return val.lower() in ['true', '1', 'x', 't']
-        return bool(val)
+    return jsonify(history)
+
+
+def _parse_percentiles():
+    """Parse ?percentiles=10,50,90 (defaults when absent or invalid)."""
+    raw = request.args.get('percentiles', '').strip()
+    if not raw:
+        return None
+    try:
+        values = [float(p) for p in raw.split(',') if p.strip()]
+    except ValueError:
+        return None
+    return [p for p in values if 0 <= p <= 100] or None
+
+
+@app.route('/api/foundation/<int:ein>/distribution')
+def get_foundation_distribution(ein):
+    """Get grant amount percentiles and histogram for a foundation"""
+    distribution = supabase_api.get_foundation_distribution(ein, _parse_percentiles())
     
-    return jsonify({
-        'foundation_name': foundation_data['foundation_name'],
-        'foundation_ein': foundation_data['foundation_ein'],
-        'grant_count': foundation_data['grant_count'],
-        'total_amount': foundation_data['total_amount'],
-        'median_grant': foundation_data['median_grant'],
-        'avg_grant': foundation_data['avg_grant'],
-        'min_grant': foundation_data['min_grant'],
-        'max_grant': foundation_data['max_grant'],
-        'states_served': foundation_data['states_served'],
-        'cities_served': foundation_data['cities_served'],
-        'top_purposes': foundation_data['top_purposes'],
-        'latest_period': safe_get('latest_period'),
-        'primary_state': safe_get('primary_state'),
-        'states_data': states_data,
-        'top_grants': top_grants_list,
-        'recent_grants': recent_grants_list,
-        # Foundation-level information
-        'formation_year': safe_get('formation_year'),
-        'foundation_address': safe_get('foundation_address_line1'),
-        'foundation_address2': safe_get('foundation_address_line2'),
-        'foundation_city': safe_get('foundation_city'),
-        'foundation_state': safe_get('foundation_state'),
-        'foundation_zip': safe_get('foundation_zip'),
-        'foundation_phone': safe_get('foundation_phone'),
-        'foundation_website': safe_get('foundation_website'),
-        'legal_domicile_state': safe_get('legal_domicile_state'),
-        'total_assets': safe_int('total_assets_eoy'),
-        'fair_market_value': safe_int('fair_market_value_eoy'),
-        'total_revenue': safe_int('total_revenue'),
-        'total_expenses': safe_int('total_expenses'),
-        'total_distributions_paid': safe_int('total_distributions'),
-        'investment_income': safe_int('investment_income'),
-        'is_private_operating_foundation': safe_bool('is_private_operating_foundation'),
-        'is_501c3': safe_bool('is_501c3'),
-        'mission': safe_get('mission_description'),
-        # Officers/Directors
-        'officers': officers
-    })
+    if not distribution:
+        return jsonify({'error': 'Foundation not found'}), 404
+    
+    return jsonify(distribution)
+
+
+@app.route('/api/states')
+def get_states():
+    """Get giving by recipient state across all funders (national map)"""
+    year = request.args.get('year', type=int)
+    min_amount = request.args.get('min_amount', type=int)
+    max_amount = request.args.get('max_amount', type=int)
+    
+    breakdown = supabase_api.get_national_state_breakdown(
+        year=year,
+        min_amount=min_amount,
+        max_amount=max_amount
+    )
+    breakdown.update({'year': year, 'min_amount': min_amount, 'max_amount': max_amount})
+    
+    return jsonify(breakdown)
+
+
+@app.route('/api/foundation/<int:ein>/states')
+def get_foundation_states(ein):
+    """Get a foundation's giving by recipient state (profile map), filterable like /api/states"""
+    states_data = supabase_api.get_foundation_state_breakdown(
+        ein,
+        year=request.args.get('year', type=int),
+        min_amount=request.args.get('min_amount', type=int),
+        max_amount=request.args.get('max_amount', type=int)
+    )
+    
+    return jsonify(states_data)
+
+
+@app.route('/api/foundation/<int:ein>/connections')
+def get_foundation_connections(ein):
+    """Get a foundation's board members and the foundations linked to it through them"""
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    connections = supabase_api.get_foundation_connections(ein, limit)
+    
+    if not connections:
+        return jsonify({'error': 'No board members found for this foundation'}), 404
+    
+    return jsonify(connections)
+
+
+@app.route('/api/foundation/<int:ein>/similar')
+def get_similar_foundations(ein):
+    """Get the foundations most similar to this one (precomputed neighbours)"""
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+    similar = supabase_api.get_similar_foundations(ein, limit)
+    
+    if similar is None:
+        return jsonify({'error': 'No similar foundations for this EIN'}), 404
+    
+    return jsonify({'foundation_ein': ein, 'similar': similar})
+
+
+@app.route('/api/states/<state>/distribution')
+def get_state_distribution(state):
+    """Get grant amount percentiles and histogram for grants to a state"""
+    distribution = supabase_api.get_state_distribution(state, _parse_percentiles())
+    
+    if not distribution:
+        return jsonify({'error': 'State not found'}), 404
+    
+    return jsonify(distribution)
 
 
 @app.route('/api/foundation/<int:ein>')
@@ -292,6 +509,92 @@ def get_foundation_basic(ein):
     })
 
 
+@app.route('/api/recipients')
+def search_recipients():
+    """Search recipients by name and/or EIN"""
+    name = request.args.get('q', '').strip()
+    ein = request.args.get('ein', '').strip()
+    state = request.args.get('state', '').strip().upper()
+    page, per_page = _pagination()
+
+    if not name and not ein:
+        return jsonify({'error': 'Provide q (name) or ein'}), 400
+
+    results, total_results = supabase_api.search_recipients(
+        name=name if name else None,
+        ein=ein if ein else None,
+        state=state if state else None,
+        page=page,
+        per_page=per_page
+    )
+
+    return jsonify({
+        'results': results,
+        'total': total_results,
+        'page': page,
+        'per_page': per_page,
+        'total_pages': (total_results + per_page - 1) // per_page if total_results > 0 else 0
+    })
+
+
+@app.route('/api/recipient/<recipient_id>')
+def get_recipient_detail(recipient_id):
+    """Get a recipient with the foundations that funded it and its grant history"""
+    recipient = supabase_api.get_recipient(recipient_id)
+
+    if not recipient:
+        return jsonify({'error': 'Recipient not found'}), 404
+
+    return jsonify(recipient)
+
+
+@app.route('/api/match')
+def match_foundations():
+    """Rank foundations for a nonprofit profile (state, grant ask, mission keywords)"""
+    state = request.args.get('state', '').strip().upper()
+    ask = request.args.get('ask', type=float)
+    keywords = request.args.get('q', '').strip()
+    limit = min(max(request.args.get('limit', 25, type=int), 1), 500)
+
+    if not state and ask is None and not keywords:
+        return jsonify({'error': 'Provide state, ask or q (mission keywords)'}), 400
+    # Rejects NaN too
+    if ask is not None and not 0 < ask < float('inf'):
+        return jsonify({'error': 'ask must be a positive amount'}), 400
+
+    results = supabase_api.match_foundations(
+        state=state if state else None,
+        ask=ask,
+        keywords=keywords if keywords else None,
+        limit=limit
+    )
+    if results is None:
+        return jsonify({'error': f'Unknown state: {state}'}), 400
+
+    return jsonify({
+        'profile': {'state': state or None, 'ask': ask, 'q': keywords or None},
+        'results': results
+    })
+
+
+@app.route('/api/person')
+def get_person():
+    """Find people by name with every foundation board they sit on"""
+    name = request.args.get('name', '').strip()
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+
+    if not name:
+        return jsonify({'error': 'Provide name'}), 400
+
+    people, total_results = supabase_api.get_person_boards(name, limit)
+
+    return jsonify({
+        'query': name,
+        'people': people,
+        'total': total_results
+    })
+
+
 if __name__ == '__main__':
     print("Starting Zeffy Grant Finder webapp...")
     print("Connected to Supabase database")
@@ -0,0 +1,526 @@
+"""
+Micro-benchmark suite for grant_finder.
+Times every public supabase_api function and every app.py route against the
+backend configured by SUPABASE_URL / SUPABASE_ANON_KEY (use a disposable
+local backend, never the hosted project), optionally loading a dataset made
+by generate_synthetic_data.py first. Results are written as JSON under
+benchmarks/results/ so runs can be compared across commits.
+
+Usage:
+    python generate_synthetic_data.py --scale 0.01
+    SUPABASE_URL=http://localhost:3000 python benchmark.py --data data/synthetic_0.01 --load
+    python benchmark.py --data data/synthetic_0.01 --local     # no network needed
+    python benchmark.py --compare benchmarks/results/OLD.json benchmarks/results/NEW.json
+    python benchmark.py --encode                               # JSON encoding of a 20k-grant foundation
+"""
+import argparse
+import inspect
+import json
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from utils.local_postgrest import DATASET_FILES as TABLE_FILES
+
+RESULTS_DIR = os.path.join('benchmarks', 'results')
+
+# A result is flagged by --compare when its warm median grows by more than this
+REGRESSION_THRESHOLD = 1.25
+
+# Cold-start budgets (median of fresh processes): importing app.py, and each first request
+IMPORT_BUDGET_MS = 400
+FIRST_REQUEST_BUDGET_MS = 1000
+COLD_START_PATHS = ['/', '/api/foundations?q=FOUND', '/api/stats', '/api/foundations_aggregated',
+                    '/api/search', '/api/foundation/{ein}']
+
+# --encode: grants in the synthetic /api/foundation/<ein> payload
+ENCODE_GRANTS = 20000
+
+# Runs in a fresh interpreter: time `import app`, then the first request to each path
+COLD_START_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+result = {'import_ms': (time.perf_counter() - start) * 1000.0, 'requests': {},
+          'heavy_modules': [m for m in ('numpy', 'pandas', 'supabase', 'httpx') if m in sys.modules]}
+client = app.app.test_client()
+for path in sys.argv[1:]:
+    start = time.perf_counter()
+    status = client.get(path).status_code
+    result['requests'][path] = {'ms': (time.perf_counter() - start) * 1000.0, 'status': status}
+print(json.dumps(result))
+"""
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def load_fixtures(data_dir: str) -> dict:
+    """Pick realistic arguments from the dataset: a giant funder, a typical one, a busy recipient."""
+    foundations = pd.read_csv(os.path.join(data_dir, 'foundations_normalized.csv'),
+                              usecols=['foundation_id', 'ein', 'organization_name'])
+    grants = pd.read_csv(os.path.join(data_dir, 'grants_normalized.csv'),
+                         usecols=['foundation_id', 'recipient_id', 'recipient_state', 'recipient_city'])
+
+    grants = grants.merge(foundations[['foundation_id', 'ein']], on='foundation_id')
+    per_ein = grants.groupby('ein').size().sort_values(ascending=False)
+    large_ein = int(per_ein.index[0])
+    typical_ein = int(per_ein.index[len(per_ein) // 2])
+    name = foundations.loc[foundations['ein'] == large_ein, 'organization_name'].iloc[0]
+    recipient_id = grants['recipient_id'].value_counts().index[0]
+    leaders = pd.read_csv(os.path.join(data_dir, 'leaders_normalized.csv'), usecols=['person_name'])
+    person_name = leaders['person_name'].value_counts().index[0]
+    state = grants['recipient_state'].value_counts().index[0]
+    city = grants.loc[grants['recipient_state'] == state, 'recipient_city'].value_counts().index[0]
+
+    return {
+        'large_ein': large_ein,
+        'typical_ein': typical_ein,
+        'foundation_name': name.split()[0],
+        'batch_eins': [int(ein) for ein in per_ein.index[:1000]],
+        'recipient_id': recipient_id,
+        'recipient_name': 'FOOD BANK',
+        'person_name': person_name,
+        'state': state,
+        'city': city,
+        'text_query': 'education scholarship',
+        'rows': {table: sum(1 for _ in open(os.path.join(data_dir, f))) - 1 for table, f in TABLE_FILES},
+    }
+
+
+def load_dataset(data_dir: str) -> None:
+    """Insert the dataset into the configured backend (tables should be empty)."""
+    from upload_clean_data import upload_table
+    for table, filename in TABLE_FILES:
+        upload_table(table, os.path.join(data_dir, filename), batch_size=1000)
+
+
+def api_cases(f: dict) -> list:
+    """(name, function name, kwargs) for every public supabase_api function."""
+    return [
+        ('get_foundation_by_ein', 'get_foundation_by_ein', {'ein': f['large_ein']}),
+        ('get_foundation_filings', 'get_foundation_filings', {'ein': f['large_ein']}),
+        ('get_all_foundation_eins', 'get_all_foundation_eins', {}),
+        ('search_foundation_names', 'search_foundation_names', {'query': f['foundation_name'][:3]}),
+        ('search_grants:all', 'search_grants', {}),
+        ('search_grants:state', 'search_grants', {'state': f['state'], 'min_amount': 5000}),
+        ('search_grants:city', 'search_grants', {'state': f['state'], 'city': f['city']}),
+        ('search_grants:foundation', 'search_grants', {'foundation_name': f['foundation_name']}),
+        ('search_grants:text', 'search_grants', {'text_query': f['text_query']}),
+        ('get_search_facets', 'get_search_facets', {'state': f['state']}),
+        ('get_stats', 'get_stats', {}),
+        ('get_foundation_officers', 'get_foundation_officers', {'ein': f['large_ein']}),
+        ('get_foundation_aggregated_stats:large', 'get_foundation_aggregated_stats', {'ein': f['large_ein']}),
+        ('get_foundation_aggregated_stats:typical', 'get_foundation_aggregated_stats', {'ein': f['typical_ein']}),
+        ('get_foundations_batch', 'get_foundations_batch', {'eins': f['batch_eins']}),
+        ('iter_grants_export', 'iter_grants_export', {'state': f['state']}),
+        ('iter_foundations_export', 'iter_foundations_export', {}),
+        ('get_all_foundations_aggregated', 'get_all_foundations_aggregated', {}),
+        ('get_all_foundations_aggregated:filtered', 'get_all_foundations_aggregated',
+         {'state': f['state'], 'min_grants': 5}),
+        ('get_all_foundations_aggregated:text', 'get_all_foundations_aggregated', {'text_query': f['text_query']}),
+        ('get_foundation_history', 'get_foundation_history', {'ein': f['large_ein']}),
+        ('get_foundation_distribution', 'get_foundation_distribution', {'ein': f['large_ein']}),
+        ('get_state_distribution', 'get_state_distribution', {'state': f['state']}),
+        ('get_foundation_grants:large', 'get_foundation_grants', {'ein': f['large_ein']}),
+        ('get_foundation_grants:typical', 'get_foundation_grants', {'ein': f['typical_ein']}),
+        ('get_foundation_state_breakdown', 'get_foundation_state_breakdown', {'ein': f['large_ein']}),
+        ('get_national_state_breakdown', 'get_national_state_breakdown', {}),
+        ('get_recipient', 'get_recipient', {'recipient_id': f['recipient_id']}),
+        ('search_recipients', 'search_recipients', {'name': f['recipient_name']}),
+        ('get_person_boards', 'get_person_boards', {'name': f['person_name']}),
+        ('get_foundation_connections', 'get_foundation_connections', {'ein': f['large_ein']}),
+        ('get_similar_foundations', 'get_similar_foundations', {'ein': f['large_ein']}),
+        ('match_foundations', 'match_foundations',
+         {'state': f['state'], 'ask': 25000, 'keywords': f['text_query']}),
+    ]
+
+
+def route_cases(f: dict) -> list:
+    """(name, rule, url[, JSON body to POST]) for every app.py route."""
+    ein = f['large_ein']
+    return [
+        ('GET /', '/', '/'),
+        ('GET /debug/metrics', '/debug/metrics', '/debug/metrics'),
+        ('GET /api/stats', '/api/stats', '/api/stats'),
+        ('GET /api/search', '/api/search', f"/api/search?state={f['state']}&facets=1"),
+        ('GET /api/search?q', '/api/search', f"/api/search?q={f['text_query']}"),
+        ('GET /api/foundations', '/api/foundations', f"/api/foundations?q={f['foundation_name'][:3]}"),
+        ('POST /api/foundations/batch', '/api/foundations/batch', '/api/foundations/batch',
+         {'eins': f['batch_eins']}),
+        ('GET /api/foundations_aggregated', '/api/foundations_aggregated', '/api/foundations_aggregated'),
+        ('GET /api/export/grants', '/api/export/grants', f"/api/export/grants?state={f['state']}&format=csv"),
+        ('GET /api/export/foundations', '/api/export/foundations', '/api/export/foundations?format=ndjson'),
+        ('GET /api/foundation/<ein>', '/api/foundation/<int:ein>', f'/api/foundation/{ein}'),
+        ('GET /api/foundation/<ein>?format=columnar', '/api/foundation/<int:ein>',
+         f'/api/foundation/{ein}?format=columnar'),
+        ('GET /foundation/<ein>', '/foundation/<int:ein>', f'/foundation/{ein}'),
+        ('GET /api/foundation/<ein>/stats', '/api/foundation/<int:ein>/stats', f'/api/foundation/{ein}/stats'),
+        ('GET /api/foundation/<ein>/history', '/api/foundation/<int:ein>/history', f'/api/foundation/{ein}/history'),
+        ('GET /api/foundation/<ein>/distribution', '/api/foundation/<int:ein>/distribution',
+         f'/api/foundation/{ein}/distribution'),
+        ('GET /api/foundation/<ein>/states', '/api/foundation/<int:ein>/states', f'/api/foundation/{ein}/states'),
+        ('GET /api/foundation/<ein>/connections', '/api/foundation/<int:ein>/connections',
+         f'/api/foundation/{ein}/connections'),
+        ('GET /api/foundation/<ein>/similar', '/api/foundation/<int:ein>/similar', f'/api/foundation/{ein}/similar'),
+        ('GET /api/states', '/api/states', '/api/states'),
+        ('GET /api/states/<state>/distribution', '/api/states/<state>/distribution',
+         f"/api/states/{f['state']}/distribution"),
+        ('GET /api/match', '/api/match',
+         f"/api/match?state={f['state']}&ask=25000&q={f['text_query']}"),
+        ('GET /api/recipients', '/api/recipients', f"/api/recipients?q={f['recipient_name']}"),
+        ('GET /api/recipient/<id>', '/api/recipient/<recipient_id>', f"/api/recipient/{f['recipient_id']}"),
+        ('GET /api/person', '/api/person', f"/api/person?name={f['person_name']}"),
+        # Last: it drops every index the cases above built
+        ('POST /debug/warm', '/debug/warm', '/debug/warm', {}),
+    ]
+
+
+def check_coverage(api_module, flask_app, apis: list, routes: list) -> list:
+    """Names of public functions and routes that have no benchmark case."""
+    covered = set(function for _, function, _ in apis)
+    missing = [
+        name for name, member in inspect.getmembers(api_module, inspect.isfunction)
+        if member.__module__ == api_module.__name__ and not name.startswith('_') and name not in covered
+    ]
+    rules = set(route[1] for route in routes)
+    missing += [
+        rule.rule for rule in flask_app.url_map.iter_rules()
+        if rule.endpoint != 'static' and rule.rule not in rules
+    ]
+    return missing
+
+
+def time_call(call, repeat: int) -> dict:
+    """Cold (first) call, then `repeat` warm calls; latencies in ms plus backend queries per call."""
+    from utils.request_metrics import query_budget
+
+    timings, queries = [], []
+    for _ in range(repeat + 1):
+        with query_budget(sys.maxsize) as trace:
+            start = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - start) * 1000.0)
+        queries.append(len(trace.calls))
+
+    warm = sorted(timings[1:]) or timings
+    return {
+        'cold_ms': round(timings[0], 2),
+        'median_ms': round(statistics.median(warm), 2),
+        'min_ms': round(warm[0], 2),
+        'p95_ms': round(warm[min(len(warm) - 1, int(0.95 * len(warm)))], 2),
+        'cold_queries': queries[0],
+        'warm_queries': max(queries[1:]) if len(queries) > 1 else queries[0],
+    }
+
+
+def reset_indexes() -> None:
+    """Drop process-wide indexes and cached responses so cold timings include their build."""
+    from api.board_index import reset_board_index
+    from api.foundation_aggregates import reset_foundation_aggregates
+    from api.prospect_match import reset_prospect_matrix
+    from api.recipient_index import reset_recipient_index
+    from api.search_index import reset_search_indexes
+    from api.similar_foundations import reset_similar_foundations
+    from utils.response_cache import cache
+    cache.clear()
+    reset_board_index()
+    reset_foundation_aggregates()
+    reset_prospect_matrix()
+    reset_recipient_index()
+    reset_search_indexes()
+    reset_similar_foundations()
+
+
+def run_benchmarks(fixtures: dict, repeat: int) -> dict:
+    from api import supabase_api
+    from app import app
+
+    apis = api_cases(fixtures)
+    routes = route_cases(fixtures)
+    missing = check_coverage(supabase_api, app, apis, routes)
+    if missing:
+        print(f"Warning: no benchmark case for {', '.join(missing)}")
+
+    results = {}
+    reset_indexes()
+    for name, function, kwargs in apis:
+        def call():
+            result = getattr(supabase_api, function)(**kwargs)
+            # Streaming functions do their work as they are consumed
+            if inspect.isgenerator(result):
+                for _ in result:
+                    pass
+        results[f'api:{name}'] = time_call(call, repeat)
+        print(f"  {name:45s} {results[f'api:{name}']['median_ms']:9.2f} ms")
+
+    client = app.test_client()
+    client.environ_base['HTTP_X_DEBUG_TOKEN'] = os.environ.get('GRANT_FINDER_DEBUG_TOKEN', '')
+    for name, _, url, *body in routes:
+        def call():
+            response = client.post(url, json=body[0]) if body else client.get(url)
+            response.get_data()  # consume streamed bodies
+            if response.status_code >= 500:
+                raise RuntimeError(f"{url} returned {response.status_code}")
+        results[f'route:{name}'] = time_call(call, repeat)
+        print(f"  {name:45s} {results[f'route:{name}']['median_ms']:9.2f} ms")
+
+    return results
+
+
+def cold_start_paths(paths: list) -> list:
+    """Paths with {ein} filled in with a foundation from the configured backend."""
+    from utils.supabase_client import supabase
+    rows = supabase.table('foundation').select('ein').order('foundation_id').limit(1).execute().data
+    ein = rows[0]['ein'] if rows else 0
+    return [path.format(ein=ein) for path in paths]
+
+
+def cold_start(repeat: int, import_budget_ms: float, request_budget_ms: float, paths: list) -> int:
+    """Time app import and first requests in fresh processes; non-zero exit when over budget."""
+    from utils.snapshot import snapshot_path
+    if not snapshot_path() or not os.path.exists(snapshot_path()):
+        print("  warning: no snapshot (python build_snapshot.py), first requests scan the tables")
+
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', COLD_START_PROBE] + paths, text=True)
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    failures = 0
+    import_ms = statistics.median(run['import_ms'] for run in runs)
+    flag = '' if import_ms <= import_budget_ms else '  OVER BUDGET'
+    failures += bool(flag)
+    print(f"  {'import app':45s} {import_ms:9.2f} ms (budget {import_budget_ms:g}){flag}")
+    heavy = sorted(set(m for run in runs for m in run['heavy_modules']))
+    if heavy:
+        print(f"  warning: importing app loads {', '.join(heavy)}")
+
+    for path in paths:
+        ms = statistics.median(run['requests'][path]['ms'] for run in runs)
+        statuses = set(run['requests'][path]['status'] for run in runs)
+        flag = ''
+        if max(statuses) >= 500:
+            flag = f"  HTTP {max(statuses)}"
+        elif ms > request_budget_ms:
+            flag = '  OVER BUDGET'
+        failures += bool(flag)
+        print(f"  first GET {path:35s} {ms:9.2f} ms (budget {request_budget_ms:g}){flag}")
+
+    print(f"{failures} cold-start budget failure(s) over {repeat} fresh processes")
+    return 1 if failures else 0
+
+
+def foundation_payload(grants: int):
+    """(summary fields, grant rows) of a /api/foundation/<ein> response with `grants` grants."""
+    import random
+    from api.supabase_api import FoundationGrant
+
+    rng = random.Random(0)
+    states = ['CA', 'NY', 'TX', 'FL', 'IL', 'WA', 'MA', 'PA']
+    statuses = ['PC', 'PF', 'GOV', 'NONE']
+    purposes = ['GENERAL OPERATING SUPPORT', 'SCHOLARSHIPS FOR STUDENTS', 'YOUTH ARTS EDUCATION PROGRAM',
+                'COMMUNITY HEALTH CLINIC EXPANSION', 'FOOD SECURITY AND NUTRITION', 'No purpose specified']
+    rows = []
+    for i in range(grants):
+        amount = int(10 ** rng.uniform(2.5, 6.5))
+        rows.append(FoundationGrant(
+            f'RECIPIENT ORGANIZATION {i}', f'{rng.randint(10 ** 8, 10 ** 9 - 1)}', f'CITY {i % 500}',
+            rng.choice(states), 'NONE', rng.choice(statuses), amount, amount, 0, rng.choice(purposes),
+            f'{rng.randint(2018, 2023)}-12-31'
+        ))
+    rows.sort(key=lambda row: row.grant_amount, reverse=True)
+    total = sum(row.grant_amount for row in rows)
+    summary = {
+        'foundation_name': 'THE EXAMPLE FAMILY FOUNDATION', 'foundation_ein': 123456789,
+        'grant_count': grants, 'total_amount': total, 'median_grant': 25000, 'avg_grant': total / grants,
+        'min_grant': rows[-1].grant_amount, 'max_grant': rows[0].grant_amount,
+        'states_served': states, 'cities_served': [f'CITY {i}' for i in range(50)],
+        'top_purposes': purposes[:5], 'state_count': len(states), 'city_count': 500, 'purpose_count': len(purposes),
+        'latest_period': '2023-12-31', 'primary_state': 'CA', 'foundation_website': '', 'foundation_phone': '',
+        'foundation_city': 'SAN FRANCISCO', 'foundation_state': 'CA'
+    }
+    return summary, rows
+
+
+def encode_benchmark(grants: int, repeat: int) -> int:
+    """Time and peak memory of encoding a large foundation response, per provider and row format."""
+    import tracemalloc
+
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+    from api.supabase_api import FoundationGrant
+    from utils.columnar import encode_columnar, to_dicts
+    from utils.json_provider import FastJSONProvider, orjson_available
+    from utils.response_cache import ResponseCache
+
+    summary, rows = foundation_payload(grants)
+    print(f"Encoding a {grants:,}-grant /api/foundation/<ein> response ({repeat} runs each)...")
+    if not orjson_available():
+        print("  warning: orjson is not installed, the fast provider falls back to the stdlib encoder")
+
+    # Each case builds the grants part as the route does, then encodes the whole response
+    cases = [
+        ('stdlib jsonify rows', DefaultJSONProvider, lambda: to_dicts(rows)),
+        ('orjson jsonify rows', FastJSONProvider, lambda: to_dicts(rows)),
+        ('stdlib jsonify columnar', DefaultJSONProvider, lambda: encode_columnar(rows, FoundationGrant)),
+        ('orjson jsonify columnar', FastJSONProvider, lambda: encode_columnar(rows, FoundationGrant)),
+    ]
+    body = b''
+    for name, provider_class, grant_list in cases:
+        app = Flask(__name__)
+        app.json = provider_class(app)
+        with app.app_context():
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                body = app.json.response(dict(summary, grants=grant_list())).get_data()
+                timings.append((time.perf_counter() - start) * 1000.0)
+            tracemalloc.start()
+            app.json.response(dict(summary, grants=grant_list()))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        print(f"  {name:25s} {statistics.median(timings):9.2f} ms  peak {peak / 2 ** 20:7.1f} MiB  "
+              f"body {len(body) / 2 ** 20:5.2f} MiB")
+
+    # A response cache hit: the stored bytes become the response as they are
+    cache = ResponseCache()
+    cache.put('/api/foundation/123456789', body, 'etag')
+    app = Flask(__name__)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cached, _ = cache.get('/api/foundation/123456789')
+        app.response_class(cached, mimetype='application/json')
+        timings.append((time.perf_counter() - start) * 1000.0)
+    print(f"  {'pre-encoded hit':25s} {statistics.median(timings):9.2f} ms")
+    return 0
+
+
+def compare(old_path: str, new_path: str) -> int:
+    """Print warm-median changes between two result files; non-zero exit on regressions."""
+    with open(old_path) as fh:
+        old = json.load(fh)
+    with open(new_path) as fh:
+        new = json.load(fh)
+
+    print(f"{old['commit']} ({old['label']}) -> {new['commit']} ({new['label']})")
+    regressions = 0
+    for name, result in sorted(new['results'].items()):
+        before = old['results'].get(name)
+        if not before:
+            continue
+        ratio = result['median_ms'] / before['median_ms'] if before['median_ms'] else 1.0
+        flag = ''
+        if ratio > REGRESSION_THRESHOLD and result['median_ms'] - before['median_ms'] > 1.0:
+            flag = '  REGRESSION'
+            regressions += 1
+        if result['warm_queries'] > before['warm_queries']:
+            flag += f"  queries {before['warm_queries']} -> {result['warm_queries']}"
+            regressions += 1
+        print(f"  {name:55s} {before['median_ms']:9.2f} -> {result['median_ms']:9.2f} ms ({ratio:5.2f}x){flag}")
+    print(f"{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark supabase_api functions and app routes.')
+    parser.add_argument('--data', help='dataset directory from generate_synthetic_data.py')
+    parser.add_argument('--load', action='store_true', help='insert the dataset into the backend first')
+    parser.add_argument('--repeat', type=int, default=5, help='warm calls per case')
+    parser.add_argument('--label', default=None, help='run label (default: dataset directory name)')
+    parser.add_argument('--local', action='store_true',
+                        help='serve the dataset from a temporary local PostgREST stand-in (implies --load)')
+    parser.add_argument('--cold-start', action='store_true',
+                        help='time app import and first requests in fresh processes against the budgets')
+    parser.add_argument('--import-budget-ms', type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument('--request-budget-ms', type=float, default=FIRST_REQUEST_BUDGET_MS)
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two result files')
+    parser.add_argument('--encode', action='store_true',
+                        help='time JSON encoding of a large foundation response (stdlib vs orjson, rows vs columnar, cached)')
+    parser.add_argument('--encode-grants', type=int, default=ENCODE_GRANTS)
+    args = parser.parse_args()
+
+    # Benchmarks measure cold caches and must not feed production traffic stats
+    os.environ.setdefault('GRANT_FINDER_WARM', '0')
+    # Repeats would otherwise be response cache hits (--encode times those separately)
+    os.environ.setdefault('GRANT_FINDER_RESPONSE_CACHE', '0')
+    os.environ.setdefault('GRANT_FINDER_ACCESS_STATS', '')
+    # The debug routes are benchmarked too: authorize them with a throwaway token
+    os.environ.setdefault('GRANT_FINDER_DEBUG_TOKEN', secrets.token_hex(16))
+
+    if args.compare:
+        return compare(*args.compare)
+    if args.encode:
+        return encode_benchmark(args.encode_grants, args.repeat)
+    if args.cold_start:
+        print(f"Cold start ({args.repeat} fresh processes)...")
+        return cold_start(args.repeat, args.import_budget_ms, args.request_budget_ms,
+                          cold_start_paths(COLD_START_PATHS))
+    if not args.data:
+        parser.error('--data is required')
+
+    if args.local:
+        # Must happen before anything imports utils.supabase_client
+        from utils.local_postgrest import LocalPostgrest, serve_in_background
+        # A snapshot (or neighbour file) in the repository describes another dataset
+        os.environ.setdefault('GRANT_FINDER_SNAPSHOT', '')
+        os.environ.setdefault('GRANT_FINDER_REPLICA', '')
+        db_dir = tempfile.mkdtemp(prefix='grant_finder_bench_')
+        build_similar = 'GRANT_FINDER_SIMILAR' not in os.environ
+        if build_similar:
+            os.environ['GRANT_FINDER_SIMILAR'] = os.path.join(db_dir, 'similar.snap')
+        engine = LocalPostgrest(os.path.join(db_dir, 'backend.db'))
+        print(f"Loading {args.data} into a local backend...")
+        engine.load_dataset(args.data)
+        _, url = serve_in_background(engine)
+        os.environ['SUPABASE_URL'] = url
+        if build_similar:
+            # Neighbours are only ever built offline; do it here so the similar case has a file to read
+            from api.similar_foundations import similar_path, write_similar_foundations
+            write_similar_foundations(similar_path())
+
+    from utils.supabase_client import SUPABASE_URL
+    if args.load and 'supabase.co' in SUPABASE_URL:
+        parser.error('refusing to --load into the hosted project; set SUPABASE_URL to a local backend')
+
+    label = args.label or os.path.basename(os.path.normpath(args.data))
+    fixtures = load_fixtures(args.data)
+    if args.load and not args.local:
+        load_dataset(args.data)
+
+    print(f"Benchmarking {label} against {SUPABASE_URL} ({args.repeat} warm calls per case)...")
+    results = run_benchmarks(fixtures, args.repeat)
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'label': label,
+        'backend': SUPABASE_URL,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'repeat': args.repeat,
+        'rows': fixtures['rows'],
+        'results': results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f'{commit}_{label}.json')
+    with open(path, 'w') as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+    print(f"Results written to {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Pre-render foundation profiles for grant_finder.
+Writes the /api/foundation/<ein>/stats payload of every foundation (or the
+top N by traffic) as gzip-compressed JSON under public/profiles/, where the
+stats route, the static route (/profiles/<ein>.json.gz) or a CDN can serve
+it without touching the database. Rebuilds are incremental: a manifest
+keeps a fingerprint of each EIN's filing, grant and leader rows, and only
+EINs whose fingerprint changed are re-rendered, in parallel.
+
+Usage:
+    python build_profiles.py                      # every foundation, incremental
+    python build_profiles.py --top 5000 --traffic views.json
+    python build_profiles.py --full --workers 16
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+# Render from the database, never from a possibly stale snapshot
+os.environ['GRANT_FINDER_SNAPSHOT'] = ''
+
+from api.foundation_aggregates import get_foundation_aggregates
+from api.foundation_profiles import (
+    MANIFEST_NAME, PROFILE_VERSION, artifact_path, build_profile, encode_profile,
+    load_manifest, profile_dir, profile_fingerprints
+)
+
+
+def select_eins(fingerprints: Dict[int, str], top: Optional[int], traffic_path: Optional[str]) -> List[int]:
+    """EINs to pre-render: all of them, or the top N by traffic (by total giving without traffic data)."""
+    eins = list(fingerprints)
+    if not top:
+        return eins
+    if traffic_path:
+        with open(traffic_path) as fh:
+            traffic = json.load(fh)
+        # Either {ein: views} or the app's access stats file (utils/cache_warmer.py)
+        views = {int(ein): count for ein, count in traffic.get('eins', traffic).items() if str(ein).isdigit()}
+        ranked = sorted(eins, key=lambda ein: views.get(ein, 0), reverse=True)
+    else:
+        aggregates = get_foundation_aggregates()
+        totals = {ein: summary['total_amount'] for ein, _, summary in aggregates.summaries() if summary}
+        ranked = sorted(eins, key=lambda ein: totals.get(ein, 0), reverse=True)
+    return ranked[:top]
+
+
+def write_artifact(directory: str, ein: int) -> int:
+    """Render one profile and write it atomically; returns its size (0 when it has no grants)."""
+    path = artifact_path(directory, ein)
+    profile = build_profile(ein)
+    if not profile:
+        if os.path.exists(path):
+            os.remove(path)
+        return 0
+    data = encode_profile(profile)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'wb') as fh:
+        fh.write(data)
+    os.replace(temporary, path)
+    return len(data)
+
+
+def build_profiles(directory: str, workers: int, top: Optional[int], traffic_path: Optional[str], full: bool) -> Dict:
+    os.makedirs(directory, exist_ok=True)
+    manifest = {'version': PROFILE_VERSION, 'profiles': {}} if full else load_manifest(directory)
+    previous: Dict[str, str] = manifest['profiles']
+    empty = set(manifest.get('empty', []))
+
+    start = time.time()
+    fingerprints = profile_fingerprints()
+    selected = select_eins(fingerprints, top, traffic_path)
+    print(f"  fingerprinted {len(fingerprints):,} EINs in {time.time() - start:.1f}s")
+
+    changed = [
+        ein for ein in selected
+        if previous.get(str(ein)) != fingerprints[ein]
+        or (str(ein) not in empty and not os.path.exists(artifact_path(directory, ein)))
+    ]
+    selected_keys = set(str(ein) for ein in selected)
+    removed = [ein for ein in previous if ein not in selected_keys]
+    for ein in removed:
+        path = artifact_path(directory, int(ein))
+        if os.path.exists(path):
+            os.remove(path)
+
+    # Build the shared in-memory indexes once, before the workers need them
+    get_foundation_aggregates()
+
+    start = time.time()
+    sizes = []
+    profiles = {ein: fingerprint for ein, fingerprint in previous.items() if ein in selected_keys}
+    empty &= selected_keys
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for ein, size in zip(changed, pool.map(lambda ein: write_artifact(directory, ein), changed)):
+            profiles[str(ein)] = fingerprints[ein]
+            # Foundations without grants have no artifact; remember them so they are not retried
+            if size:
+                empty.discard(str(ein))
+            else:
+                empty.add(str(ein))
+            sizes.append(size)
+    elapsed = time.time() - start
+
+    manifest = {
+        'version': PROFILE_VERSION,
+        'built_at': int(time.time()),
+        'profiles': profiles,
+        'empty': sorted(empty)
+    }
+    temporary = os.path.join(directory, f'{MANIFEST_NAME}.tmp')
+    with open(temporary, 'w') as fh:
+        json.dump(manifest, fh, sort_keys=True)
+    os.replace(temporary, os.path.join(directory, MANIFEST_NAME))
+
+    return {
+        'selected': len(selected),
+        'rendered': sum(1 for size in sizes if size),
+        'empty': len(empty),
+        'unchanged': len(selected) - len(changed),
+        'removed': len(removed),
+        'bytes': sum(sizes),
+        'render_seconds': round(elapsed, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-render foundation profile JSON (incremental).')
+    parser.add_argument('--out', default=profile_dir(), help='artifact directory (default public/profiles)')
+    parser.add_argument('--workers', type=int, default=8, help='profiles rendered in parallel')
+    parser.add_argument('--top', type=int, help='only the N most viewed foundations')
+    parser.add_argument('--traffic', help='JSON {ein: views} or snapshot/access_stats.json, used to rank --top (default: total giving)')
+    parser.add_argument('--full', action='store_true', help='ignore the manifest and re-render everything')
+    args = parser.parse_args()
+    if not args.out:
+        parser.error('--out is required when GRANT_FINDER_PROFILES is empty')
+
+    print(f"Building profiles in {args.out}...")
+    result = build_profiles(args.out, args.workers, args.top, args.traffic, args.full)
+    print(f"{result['rendered']:,} rendered ({result['bytes'] / 1e6:.1f} MB, {result['render_seconds']}s), "
+          f"{result['unchanged']:,} unchanged, {result['removed']:,} removed, {result['empty']:,} without grants")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Build the similar-foundation neighbour lists for grant_finder.
+Scans the foundation and grants tables once, builds a TF-IDF purpose,
+recipient state and grant amount feature vector per EIN, and stores each
+EIN's top-k cosine neighbours in snapshot/similar.snap (see
+api/similar_foundations.py), which /api/foundation/<ein>/similar reads.
+Rebuild it whenever the data is reloaded, next to build_snapshot.py.
+
+Usage:
+    python build_similar.py
+    python build_similar.py --neighbours 50 --workers 16 --out /tmp/similar.snap
+"""
+import argparse
+import os
+import sys
+import time
+
+from api.similar_foundations import NEIGHBOURS, similar_path, write_similar_foundations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute similar-foundation neighbours.')
+    parser.add_argument('--out', default=similar_path(), help='neighbour file to write (default snapshot/similar.snap)')
+    parser.add_argument('--neighbours', type=int, default=NEIGHBOURS, help='neighbours kept per foundation')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='blocks scored in parallel')
+    args = parser.parse_args()
+    if not args.out:
+        parser.error('--out is required when GRANT_FINDER_SIMILAR is empty')
+
+    print(f"Building similar foundations in {args.out}...")
+    start = time.time()
+    similar = write_similar_foundations(args.out, args.neighbours, args.workers)
+    print(f"  {len(similar.neighbours):,} foundations ({time.time() - start:.1f}s)")
+    print(f"Wrote {os.path.getsize(args.out) / 1e6:.1f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
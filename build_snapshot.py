@@ -0,0 +1,82 @@
+"""
+Build the cold-start snapshot for grant_finder.
+Reads the foundation and grants tables and writes the foundation name
+index, global stats, EIN aggregates and the grant and mission search
+indexes to snapshot/grant_finder.snap (see utils/snapshot.py), which the app
+maps on startup instead of rebuilding them from the database. Rebuild it
+whenever the data is reloaded and commit it: deployments ship the file
+(see VERCEL_DEPLOYMENT.md).
+
+Usage:
+    python build_snapshot.py
+    python build_snapshot.py --out /tmp/grant_finder.snap
+"""
+import argparse
+import os
+import sys
+import time
+
+# Build from the database, never from a previous snapshot
+os.environ['GRANT_FINDER_SNAPSHOT'] = ''
+
+from api import supabase_api
+from api.foundation_aggregates import FILING_COLUMNS, GRANT_COLUMNS, FoundationAggregates
+from api.search_index import FOUNDATION_INDEX_COLUMNS, GRANT_INDEX_COLUMNS, FoundationTextIndex, GrantIndex
+from utils.snapshot import DEFAULT_SNAPSHOT_PATH, Snapshot, SnapshotWriter
+from utils.table_scan import progress_printer, scan_table
+
+
+def build_snapshot(path: str) -> int:
+    """Build every snapshot section from the configured backend; returns the file size."""
+    writer = SnapshotWriter()
+
+    start = time.time()
+    filings = list(scan_table('foundation', FILING_COLUMNS, key='foundation_id',
+                              progress=progress_printer('foundation')))
+    names = sorted(set(f['organization_name'] for f in filings if f.get('organization_name')))
+    writer.add_name_index('foundation_names', names)
+    print(f"  foundation names: {len(names):,} ({time.time() - start:.1f}s)")
+
+    start = time.time()
+    aggregates = FoundationAggregates.build(
+        filings,
+        scan_table('grants', GRANT_COLUMNS, key='grant_id', progress=progress_printer('grants'))
+    )
+    aggregates.write_snapshot(writer)
+    print(f"  aggregates: {len(aggregates.by_ein):,} EINs ({time.time() - start:.1f}s)")
+
+    start = time.time()
+    grant_index = GrantIndex.build(
+        scan_table('grants', GRANT_INDEX_COLUMNS, key='grant_id', progress=progress_printer('grants'))
+    )
+    grant_index.write_snapshot(writer)
+    text_index = FoundationTextIndex.build(scan_table('foundation', FOUNDATION_INDEX_COLUMNS, key='foundation_id'))
+    text_index.write_snapshot(writer)
+    print(f"  search indexes: {len(grant_index):,} grants ({time.time() - start:.1f}s)")
+
+    start = time.time()
+    writer.add_json('stats', supabase_api.get_stats())
+    print(f"  global stats ({time.time() - start:.1f}s)")
+
+    return writer.write(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the cold-start data snapshot.')
+    parser.add_argument('--out', default=DEFAULT_SNAPSHOT_PATH, help='snapshot file to write')
+    args = parser.parse_args()
+
+    print(f"Building snapshot {args.out}...")
+    size = build_snapshot(args.out)
+
+    start = time.perf_counter()
+    snapshot = Snapshot(args.out)
+    # Array sections of an index are named '<index>.<field>'; list the indexes only
+    sections = [name for name in snapshot.sections if '.' not in name]
+    print(f"Wrote {size / 1e6:.1f} MB with sections {', '.join(sections)}; "
+          f"opens in {(time.perf_counter() - start) * 1000:.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+Generate a synthetic, production-shaped grant_finder dataset.
+Writes the four normalized CSVs (foundations, recipients, grants, leaders)
+with realistic skew: a few giant funders, heavy-tailed grant amounts,
+multiple filings per EIN and people who sit on several boards.
+Seeded, so the same arguments always produce the same files.
+
+Usage:
+    python generate_synthetic_data.py --scale 0.01 --out data/synthetic_1pct
+"""
+import argparse
+import json
+import os
+import sys
+import uuid
+
+import numpy as np
+import pandas as pd
+
+# Production sizes documented for the hosted database
+PRODUCTION_ROWS = {
+    'foundations': 270_000,
+    'recipients': 843_000,
+    'grants': 1_100_000,
+    'leaders': 1_600_000,
+}
+
+STATES = [
+    'CA', 'NY', 'TX', 'FL', 'IL', 'PA', 'OH', 'MA', 'GA', 'NC', 'MI', 'NJ', 'VA', 'WA',
+    'MN', 'CO', 'MD', 'AZ', 'TN', 'IN', 'MO', 'WI', 'CT', 'OR', 'SC', 'AL', 'LA', 'KY',
+    'OK', 'IA', 'UT', 'KS', 'NV', 'AR', 'MS', 'NE', 'NM', 'ID', 'WV', 'HI', 'NH', 'ME',
+    'RI', 'MT', 'DE', 'SD', 'ND', 'AK', 'VT', 'WY', 'DC', 'PR',
+]
+CITY_ROOTS = [
+    'SPRINGFIELD', 'RIVERSIDE', 'FRANKLIN', 'GREENVILLE', 'BRISTOL', 'CLINTON', 'FAIRVIEW',
+    'SALEM', 'MADISON', 'GEORGETOWN', 'ARLINGTON', 'ASHLAND', 'BURLINGTON', 'MANCHESTER',
+    'OXFORD', 'CLAYTON', 'JACKSON', 'MILTON', 'AUBURN', 'DAYTON', 'LEXINGTON', 'MILFORD',
+]
+PURPOSES = [
+    'GENERAL SUPPORT', 'GENERAL OPERATING SUPPORT', 'SCHOLARSHIP FUND', 'CAPITAL CAMPAIGN',
+    'EDUCATION PROGRAMS', 'YOUTH DEVELOPMENT', 'MEDICAL RESEARCH', 'COMMUNITY HEALTH CLINIC',
+    'FOOD BANK OPERATIONS', 'AFFORDABLE HOUSING', 'ARTS AND CULTURE', 'MUSEUM EXHIBITIONS',
+    'ENVIRONMENTAL CONSERVATION', 'ANIMAL WELFARE', 'DISASTER RELIEF', 'RELIGIOUS ACTIVITIES',
+    'HOMELESS SHELTER SERVICES', 'MENTAL HEALTH SERVICES', 'LITERACY PROGRAMS', 'STEM EDUCATION',
+    'SUPPORT OF CHARITABLE PURPOSES', 'UNRESTRICTED', 'ENDOWMENT', 'SENIOR SERVICES',
+    'VETERANS SUPPORT', 'WATER AND SANITATION', 'CLIMATE RESEARCH', 'JOB TRAINING',
+]
+MISSION_PHRASES = [
+    'support education and youth development', 'advance medical research and public health',
+    'promote arts culture and humanities', 'protect the environment and wildlife',
+    'relieve poverty and hunger in local communities', 'support religious and charitable organizations',
+    'provide scholarships to deserving students', 'strengthen community health and human services',
+    'support housing and homelessness services', 'foster economic opportunity and job training',
+]
+NAME_WORDS = [
+    'SMITH', 'JOHNSON', 'WILLIAMS', 'BROWN', 'JONES', 'MILLER', 'DAVIS', 'WILSON', 'ANDERSON',
+    'TAYLOR', 'THOMAS', 'MOORE', 'MARTIN', 'JACKSON', 'THOMPSON', 'WHITE', 'HARRIS', 'CLARK',
+    'LEWIS', 'ROBINSON', 'WALKER', 'YOUNG', 'ALLEN', 'KING', 'WRIGHT', 'SCOTT', 'HILL', 'GREEN',
+]
+FIRST_NAMES = [
+    'JAMES', 'MARY', 'ROBERT', 'PATRICIA', 'JOHN', 'JENNIFER', 'MICHAEL', 'LINDA', 'DAVID',
+    'ELIZABETH', 'WILLIAM', 'BARBARA', 'RICHARD', 'SUSAN', 'JOSEPH', 'JESSICA', 'THOMAS', 'SARAH',
+]
+ORG_SUFFIXES = ['FOUNDATION', 'FAMILY FOUNDATION', 'CHARITABLE TRUST', 'FUND', 'FDN']
+RECIPIENT_KINDS = [
+    'UNIVERSITY', 'HOSPITAL', 'SCHOOL', 'FOOD BANK', 'MUSEUM', 'CHURCH', 'YMCA', 'LIBRARY',
+    'SYMPHONY', 'HUMANE SOCIETY', 'COMMUNITY FOUNDATION', 'BOYS AND GIRLS CLUB',
+]
+TITLES = ['PRESIDENT', 'TREASURER', 'SECRETARY', 'DIRECTOR', 'TRUSTEE', 'VICE PRESIDENT', 'CHAIR']
+RECIPIENT_STATUSES = ['PC', 'PC', 'PC', 'PC', 'POF', 'SO', 'GOV', 'NC']
+TAX_YEARS = [2019, 2020, 2021, 2022, 2023]
+
+
+def make_uuids(rng: np.random.Generator, n: int) -> np.ndarray:
+    """Seeded UUID4 strings."""
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    return np.array([str(uuid.UUID(bytes=bytes(row), version=4)) for row in raw], dtype=object)
+
+
+def zipf_weights(n: int, exponent: float) -> np.ndarray:
+    """Normalized 1/rank^exponent weights."""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def pick(rng: np.random.Generator, options, n: int) -> np.ndarray:
+    return np.array(options, dtype=object)[rng.integers(0, len(options), n)]
+
+
+def generate(scale: float, seed: int, out_dir: str) -> dict:
+    """Generate all four tables at the given fraction of production size."""
+    rng = np.random.default_rng(seed)
+    n_foundations = max(10, int(PRODUCTION_ROWS['foundations'] * scale))
+    n_recipients = max(20, int(PRODUCTION_ROWS['recipients'] * scale))
+    n_grants = max(50, int(PRODUCTION_ROWS['grants'] * scale))
+    n_leaders = max(20, int(PRODUCTION_ROWS['leaders'] * scale))
+
+    state_weights = zipf_weights(len(STATES), 0.9)
+
+    # ----- foundations: one row per filing, EINs with 1-3 filings -----
+    n_eins = max(5, int(n_foundations / 1.6))
+    filings_per_ein = rng.choice([1, 2, 3], size=n_eins, p=[0.55, 0.3, 0.15])
+    ein_values = np.unique(rng.integers(10_000_000, 999_999_999, size=n_eins * 2))[:n_eins]
+    ein_values = rng.permutation(ein_values)
+    filing_eins = np.repeat(ein_values, filings_per_ein)[:n_foundations]
+    if len(filing_eins) < n_foundations:
+        filing_eins = np.concatenate([filing_eins, rng.choice(ein_values, n_foundations - len(filing_eins))])
+    filing_index = np.concatenate([np.arange(c) for c in filings_per_ein])[:len(filing_eins)]
+    filing_index = np.pad(filing_index, (0, n_foundations - len(filing_index)))
+    filing_years = np.array(TAX_YEARS)[len(TAX_YEARS) - 1 - np.minimum(filing_index, len(TAX_YEARS) - 1)]
+
+    ein_names = {}
+    for ein in ein_values:
+        ein_names[ein] = f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {rng.choice(ORG_SUFFIXES)}"
+
+    foundation_ids = make_uuids(rng, n_foundations)
+    foundation_states = rng.choice(STATES, size=n_foundations, p=state_weights)
+    assets = np.round(rng.lognormal(14, 2.0, n_foundations))
+    foundations = pd.DataFrame({
+        'foundation_id': foundation_ids,
+        'ein': filing_eins,
+        'organization_name': [ein_names[e] for e in filing_eins],
+        'tax_period_begin': [f'{y}-01-01' for y in filing_years],
+        'tax_period_end': [f'{y}-12-31' for y in filing_years],
+        'address_line1': [f'{n} MAIN ST' for n in rng.integers(1, 9999, n_foundations)],
+        'address_line2': None,
+        'city': pick(rng, CITY_ROOTS, n_foundations),
+        'state': foundation_states,
+        'zip': rng.integers(10000, 99999, n_foundations),
+        'phone': [f'{n}' for n in rng.integers(2_000_000_000, 9_999_999_999, n_foundations)],
+        'website': [f'WWW.{name.split()[0]}FDN.ORG' for name in (ein_names[e] for e in filing_eins)],
+        'formation_year': rng.integers(1920, 2020, n_foundations).astype(str),
+        'legal_domicile_state': foundation_states,
+        'total_assets_boy': (assets * rng.uniform(0.85, 1.1, n_foundations)).round().astype(np.int64),
+        'total_assets_eoy': assets.astype(np.int64),
+        'total_liabilities_eoy': (assets * rng.uniform(0, 0.05, n_foundations)).round().astype(np.int64),
+        'net_assets_eoy': (assets * 0.97).round().astype(np.int64),
+        'fair_market_value_eoy': (assets * rng.uniform(0.95, 1.3, n_foundations)).round().astype(np.int64),
+        'total_revenue': (assets * rng.uniform(0.02, 0.12, n_foundations)).round().astype(np.int64),
+        'total_expenses': (assets * rng.uniform(0.04, 0.09, n_foundations)).round().astype(np.int64),
+        'investment_income': (assets * rng.uniform(0.01, 0.08, n_foundations)).round().astype(np.int64),
+        'distributable_amount': (assets * 0.05).round().astype(np.int64),
+        'total_distributions': (assets * rng.uniform(0.04, 0.08, n_foundations)).round().astype(np.int64),
+        'undistributed_income': 0,
+        'is_private_operating_foundation': np.where(rng.random(n_foundations) < 0.05, 'true', 'false'),
+        'is_501c3': 'true',
+        'mission_description': [
+            f'THE FOUNDATION WAS ESTABLISHED TO {a.upper()} AND {b.upper()}'
+            for a, b in zip(pick(rng, MISSION_PHRASES, n_foundations), pick(rng, MISSION_PHRASES, n_foundations))
+        ],
+        'source_file': [f'{e}_{y}_990PF.xml' for e, y in zip(filing_eins, filing_years)],
+    })
+
+    # ----- recipients: popularity is heavy-tailed -----
+    recipient_ids = make_uuids(rng, n_recipients)
+    recipient_states = rng.choice(STATES, size=n_recipients, p=state_weights)
+    recipient_cities = pick(rng, CITY_ROOTS, n_recipients)
+    recipient_names = [
+        f'{rng.choice(NAME_WORDS)} {kind}' if rng.random() < 0.5 else f'{city} {kind}'
+        for kind, city in zip(pick(rng, RECIPIENT_KINDS, n_recipients), recipient_cities)
+    ]
+    has_ein = rng.random(n_recipients) < 0.7
+    recipient_eins = np.where(has_ein, rng.integers(10_000_000, 999_999_999, n_recipients).astype(str), None)
+
+    # ----- grants: a few giant funders, lognormal/pareto amounts -----
+    funder_weights = rng.pareto(1.1, n_foundations) + 1
+    funder_weights /= funder_weights.sum()
+    grant_foundation = rng.choice(n_foundations, size=n_grants, p=funder_weights)
+    recipient_weights = zipf_weights(n_recipients, 0.8)
+    grant_recipient = rng.choice(rng.permutation(n_recipients), size=n_grants, p=recipient_weights)
+
+    amounts = np.round(rng.lognormal(8.5, 1.6, n_grants), -2)
+    giants = rng.random(n_grants) < 0.002
+    amounts[giants] = np.round(amounts[giants] * rng.pareto(1.2, giants.sum()) * 50, -3)
+    amounts = np.maximum(amounts, 100).astype(np.int64)
+    non_cash = np.where(rng.random(n_grants) < 0.03, (amounts * 0.5).astype(np.int64), 0)
+
+    grant_ids = make_uuids(rng, n_grants)
+    grants = pd.DataFrame({
+        'grant_id': grant_ids,
+        'foundation_id': foundation_ids[grant_foundation],
+        'recipient_id': recipient_ids[grant_recipient],
+        'grant_amount': amounts,
+        'cash_grant_amount': amounts - non_cash,
+        'non_cash_grant_amount': non_cash,
+        'grant_purpose': np.array(PURPOSES, dtype=object)[
+            rng.choice(len(PURPOSES), size=n_grants, p=zipf_weights(len(PURPOSES), 1.0))],
+        'recipient_relationship': 'NONE',
+        'recipient_foundation_status': pick(rng, RECIPIENT_STATUSES, n_grants),
+        'recipient_irc_section': '501(C)(3)',
+        'non_cash_description': None,
+        'valuation_method': None,
+        'recipient_name': np.array(recipient_names, dtype=object)[grant_recipient],
+        'recipient_ein': recipient_eins[grant_recipient],
+        'recipient_city': recipient_cities[grant_recipient],
+        'recipient_state': recipient_states[grant_recipient],
+        'tax_period_end': foundations['tax_period_end'].to_numpy()[grant_foundation],
+        'source_file': foundations['source_file'].to_numpy()[grant_foundation],
+    })
+
+    grant_lists = [[] for _ in range(n_recipients)]
+    for recipient, grant_id in zip(grant_recipient, grant_ids):
+        grant_lists[recipient].append(grant_id)
+    recipients = pd.DataFrame({
+        'recipient_id': recipient_ids,
+        'recipient_name': recipient_names,
+        'recipient_ein': recipient_eins,
+        'address_line1': [f'{n} OAK AVE' for n in rng.integers(1, 9999, n_recipients)],
+        'address_line2': None,
+        'city': recipient_cities,
+        'state': recipient_states,
+        'zip': rng.integers(10000, 99999, n_recipients),
+        'country': 'US',
+        'grant_ids': [json.dumps(g) for g in grant_lists],
+    })
+
+    # ----- leaders: board members drawn from a shared pool so boards interlock -----
+    n_people = max(10, int(n_leaders * 0.6))
+    people = [f'{rng.choice(FIRST_NAMES)} {chr(65 + rng.integers(26))} {rng.choice(NAME_WORDS)}' for _ in range(n_people)]
+    leader_person = rng.choice(n_people, size=n_leaders, p=zipf_weights(n_people, 0.3))
+    leader_foundation = rng.integers(0, n_foundations, n_leaders)
+    paid = rng.random(n_leaders) < 0.2
+    leaders = pd.DataFrame({
+        'leader_id': make_uuids(rng, n_leaders),
+        'foundation_id': foundation_ids[leader_foundation],
+        'person_name': np.array(people, dtype=object)[leader_person],
+        'title': pick(rng, TITLES, n_leaders),
+        'compensation': np.where(paid, rng.integers(10_000, 400_000, n_leaders), 0),
+        'benefits': np.where(paid, rng.integers(0, 40_000, n_leaders), 0),
+        'other_compensation': 0,
+        'hours_per_week': rng.choice([1, 2, 5, 10, 40], n_leaders),
+        'is_officer': np.where(rng.random(n_leaders) < 0.5, 'true', 'false'),
+        'is_director': np.where(rng.random(n_leaders) < 0.6, 'true', 'false'),
+        'is_trustee': np.where(rng.random(n_leaders) < 0.3, 'true', 'false'),
+        'is_key_employee': 'false',
+        'tax_period_end': foundations['tax_period_end'].to_numpy()[leader_foundation],
+        'source_file': foundations['source_file'].to_numpy()[leader_foundation],
+    })
+    leader_lists = [[] for _ in range(n_foundations)]
+    for f, leader_id in zip(leader_foundation, leaders['leader_id']):
+        leader_lists[f].append(leader_id)
+    foundations['leader_ids'] = [json.dumps(l) for l in leader_lists]
+
+    os.makedirs(out_dir, exist_ok=True)
+    files = {
+        'foundation': ('foundations_normalized.csv', foundations),
+        'Recipients': ('recipients_normalized.csv', recipients),
+        'grants': ('grants_normalized.csv', grants),
+        'Leaders': ('leaders_normalized.csv', leaders),
+    }
+    counts = {}
+    for table, (filename, df) in files.items():
+        df.to_csv(os.path.join(out_dir, filename), index=False)
+        counts[table] = len(df)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic grant_finder dataset.')
+    parser.add_argument('--scale', type=float, default=0.01, help='fraction of production size (1.0 = full)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default=None, help='output directory (default data/synthetic_<scale>)')
+    args = parser.parse_args()
+
+    out_dir = args.out or os.path.join('data', f'synthetic_{args.scale:g}')
+    print(f"Generating synthetic dataset at scale {args.scale:g} (seed {args.seed}) into {out_dir}...")
+    counts = generate(args.scale, args.seed, out_dir)
+    for table, count in counts.items():
+        print(f"  {table}: {count:,} rows")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
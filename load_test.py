@@ -0,0 +1,341 @@
+"""
+Traffic-replay load test for grant_finder.
+Replays realistic user sessions against the web app with open-loop arrivals
+(sessions start at a Poisson rate whether or not earlier ones finished) and
+a bounded pool of concurrent users, then reports latency percentiles,
+throughput and error rates per route. Use it to size workers before a launch.
+
+Sessions:
+    autocomplete  typing a foundation name (300 ms debounce, as in script.js)
+    search        paging through /api/search results with filters
+    browse        paging through /api/foundations_aggregated
+    profile       opening a foundation profile page and its stats
+
+By default the app is started in-process (threaded server) against the
+backend in SUPABASE_URL; --local serves a dataset directory from a local
+PostgREST stand-in instead, and --url targets an already running deployment.
+
+Usage:
+    SUPABASE_URL=http://localhost:3000 python load_test.py --rate 5 --concurrency 32 --duration 60
+    python load_test.py --local data/synthetic_0.01 --rate 5 --duration 60
+    python load_test.py --url http://localhost:8000 --mix autocomplete=50,search=30,profile=20
+"""
+import argparse
+import http.client
+import json
+import queue
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import quote, urlsplit
+
+DEFAULT_MIX = 'autocomplete=35,search=30,browse=20,profile=15'
+
+# Client-side debounce of the autocomplete inputs (public/script.js)
+DEBOUNCE_SECONDS = 0.3
+
+
+class Client:
+    """One keep-alive HTTP connection per simulated user."""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.https = parts.scheme == 'https'
+        self.timeout = timeout
+        self.connection = None
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        self.connection = cls(self.host, self.port, timeout=self.timeout)
+
+    def get(self, path: str):
+        """(status, body bytes); status 0 on connection errors."""
+        for attempt in range(2):
+            if self.connection is None:
+                self._connect()
+            try:
+                self.connection.request('GET', path)
+                response = self.connection.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+        return 0, b''
+
+
+class Recorder:
+    """Thread-safe per-route latency samples and error counts."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.queue_delays: List[float] = []
+        self.sessions = defaultdict(int)
+
+    def request(self, client: Client, route: str, path: str) -> Optional[bytes]:
+        start = time.perf_counter()
+        try:
+            status, body = client.get(path)
+        except (http.client.HTTPException, OSError):
+            status, body = 0, None
+        elapsed = (time.perf_counter() - start) * 1000.0
+        with self.lock:
+            self.latencies[route].append(elapsed)
+            if status == 0 or status >= 500:
+                self.errors[route] += 1
+        return body if 200 <= status < 300 else None
+
+
+def _json(body: Optional[bytes]):
+    try:
+        return json.loads(body) if body else None
+    except ValueError:
+        return None
+
+
+class Scenario:
+    """Session generators; `think` scales the pauses between user actions."""
+
+    def __init__(self, fixtures: Dict, think: float, debounce: bool):
+        self.fixtures = fixtures
+        self.think = think
+        self.debounce = debounce
+
+    def pause(self, rng: random.Random, low: float, high: float) -> None:
+        if self.think > 0:
+            time.sleep(rng.uniform(low, high) * self.think)
+
+    def autocomplete(self, client: Client, recorder: Recorder, rng: random.Random) -> None:
+        name = rng.choice(self.fixtures['names'])[:rng.randint(4, 14)]
+        typed = ''
+        for i, char in enumerate(name):
+            typed += char
+            # Typing gaps are mostly short bursts with occasional hesitation
+            gap = rng.lognormvariate(-1.8, 0.6) if rng.random() > 0.15 else rng.uniform(0.4, 1.2)
+            last = i == len(name) - 1
+            if len(typed) >= 2 and (not self.debounce or gap > DEBOUNCE_SECONDS or last):
+                recorder.request(client, '/api/foundations', f'/api/foundations?q={quote(typed)}')
+            if not last and self.think > 0:
+                time.sleep(gap * self.think)
+
+    def search(self, client: Client, recorder: Recorder, rng: random.Random) -> None:
+        params = {'per_page': 20}
+        if rng.random() < 0.7:
+            params['state'] = rng.choice(self.fixtures['states'])
+        if rng.random() < 0.3:
+            params['min_amount'] = rng.choice([1000, 5000, 10000, 50000])
+        if rng.random() < 0.2:
+            params['q'] = rng.choice(['education', 'scholarship', 'general support', 'health', 'arts'])
+        for page in range(1, rng.choice([1, 1, 2, 3, 5]) + 1):
+            params['page'] = page
+            query = '&'.join(f'{k}={quote(str(v))}' for k, v in params.items())
+            if recorder.request(client, '/api/search', f'/api/search?{query}') is None:
+                break
+            self.pause(rng, 1.0, 4.0)
+
+    def browse(self, client: Client, recorder: Recorder, rng: random.Random) -> None:
+        params = {'per_page': 20}
+        if rng.random() < 0.5:
+            params['state'] = rng.choice(self.fixtures['states'])
+        if rng.random() < 0.3:
+            params['min_grants'] = rng.choice([5, 10, 25])
+        for page in range(1, rng.choice([1, 2, 2, 4]) + 1):
+            params['page'] = page
+            query = '&'.join(f'{k}={quote(str(v))}' for k, v in params.items())
+            data = _json(recorder.request(client, '/api/foundations_aggregated', f'/api/foundations_aggregated?{query}'))
+            if not data:
+                break
+            self.pause(rng, 2.0, 6.0)
+        if data and data.get('results') and rng.random() < 0.5:
+            self.open_profile(client, recorder, rng, rng.choice(data['results'])['foundation_ein'])
+
+    def profile(self, client: Client, recorder: Recorder, rng: random.Random) -> None:
+        self.open_profile(client, recorder, rng, rng.choice(self.fixtures['eins']))
+
+    def open_profile(self, client: Client, recorder: Recorder, rng: random.Random, ein: int) -> None:
+        recorder.request(client, '/foundation/<ein>', f'/foundation/{ein}')
+        recorder.request(client, '/api/foundation/<ein>/stats', f'/api/foundation/{ein}/stats')
+        self.pause(rng, 3.0, 10.0)
+
+
+def load_fixtures(base_url: str, timeout: float) -> Dict:
+    """Real foundation names, EINs and states, read through the app itself."""
+    client = Client(base_url, timeout)
+    status, body = client.get('/api/foundations_aggregated?per_page=200')
+    foundations = (_json(body) or {}).get('results', []) if status == 200 else []
+    status, body = client.get('/api/states')
+    states = [s['state'] for s in (_json(body) or {}).get('states', [])][:20] if status == 200 else []
+    if not foundations:
+        raise SystemExit(f"Could not read foundations from {base_url} (status {status})")
+    return {
+        'names': [f['foundation_name'] for f in foundations if f.get('foundation_name')],
+        'eins': [f['foundation_ein'] for f in foundations],
+        'states': states or ['CA', 'NY', 'TX'],
+    }
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - {'autocomplete', 'search', 'browse', 'profile'}
+    if unknown:
+        raise SystemExit(f"Unknown session type(s): {', '.join(sorted(unknown))}")
+    return mix
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(p / 100.0 * len(ordered)))]
+
+
+def run(base_url: str, mix: Dict[str, float], rate: float, concurrency: int, duration: float,
+        think: float, debounce: bool, seed: int, timeout: float) -> Dict:
+    fixtures = load_fixtures(base_url, timeout)
+    scenario = Scenario(fixtures, think, debounce)
+    recorder = Recorder()
+    arrivals: queue.Queue = queue.Queue()
+    stop = object()
+
+    def worker(worker_id: int):
+        client = Client(base_url, timeout)
+        rng = random.Random(seed * 1000 + worker_id)
+        while True:
+            item = arrivals.get()
+            if item is stop:
+                return
+            kind, scheduled = item
+            with recorder.lock:
+                recorder.queue_delays.append((time.perf_counter() - scheduled) * 1000.0)
+                recorder.sessions[kind] += 1
+            getattr(scenario, kind)(client, recorder, rng)
+
+    workers = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in workers:
+        thread.start()
+
+    # Open-loop Poisson arrivals: the schedule does not wait for the app
+    rng = random.Random(seed)
+    kinds, weights = list(mix), list(mix.values())
+    started = time.perf_counter()
+    next_arrival = started
+    scheduled = 0
+    while next_arrival - started < duration:
+        now = time.perf_counter()
+        if next_arrival > now:
+            time.sleep(next_arrival - now)
+        arrivals.put((rng.choices(kinds, weights)[0], next_arrival))
+        scheduled += 1
+        next_arrival += rng.expovariate(rate)
+    backlog = arrivals.qsize()
+    for _ in workers:
+        arrivals.put(stop)
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    routes = {}
+    for route, samples in sorted(recorder.latencies.items()):
+        ordered = sorted(samples)
+        routes[route] = {
+            'requests': len(ordered),
+            'errors': recorder.errors[route],
+            'error_rate': round(recorder.errors[route] / len(ordered), 4),
+            'throughput_rps': round(len(ordered) / elapsed, 2),
+            'p50_ms': round(percentile(ordered, 50), 1),
+            'p95_ms': round(percentile(ordered, 95), 1),
+            'p99_ms': round(percentile(ordered, 99), 1),
+            'max_ms': round(ordered[-1], 1),
+        }
+    delays = sorted(recorder.queue_delays)
+    total = sum(r['requests'] for r in routes.values())
+    return {
+        'target': base_url,
+        'rate': rate,
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 1),
+        'sessions': dict(recorder.sessions),
+        'sessions_scheduled': scheduled,
+        'backlog_at_end': backlog,
+        'session_queue_p95_ms': round(percentile(delays, 95), 1),
+        'requests': total,
+        'throughput_rps': round(total / elapsed, 2),
+        'error_rate': round(sum(r['errors'] for r in routes.values()) / total, 4) if total else 0.0,
+        'routes': routes,
+    }
+
+
+def start_local_app() -> str:
+    """Serve app.py in-process on a free port (threaded, like a single dev worker)."""
+    import logging
+    from werkzeug.serving import make_server
+    from app import app
+
+    # Per-request access logs would drown the report
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}'
+
+
+def print_report(report: Dict) -> None:
+    print(f"\n{report['requests']:,} requests in {report['duration_s']}s "
+          f"({report['throughput_rps']} req/s, error rate {report['error_rate']:.2%})")
+    print(f"Sessions: {report['sessions']} — queue p95 {report['session_queue_p95_ms']} ms, "
+          f"backlog at end {report['backlog_at_end']}")
+    print(f"\n{'route':34s} {'reqs':>7s} {'err%':>6s} {'rps':>7s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s}")
+    for route, r in report['routes'].items():
+        print(f"{route:34s} {r['requests']:7d} {r['error_rate']:6.2%} {r['throughput_rps']:7.2f} "
+              f"{r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['p99_ms']:8.1f} {r['max_ms']:8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay realistic user sessions against grant_finder.')
+    parser.add_argument('--url', help='running app to target (default: start app.py in-process)')
+    parser.add_argument('--local', metavar='DATA_DIR', help='serve this dataset from a local PostgREST stand-in')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'session weights (default {DEFAULT_MIX})')
+    parser.add_argument('--rate', type=float, default=2.0, help='new sessions per second (Poisson)')
+    parser.add_argument('--concurrency', type=int, default=16, help='max simultaneous users')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds of arrivals')
+    parser.add_argument('--think', type=float, default=1.0, help='think-time multiplier (0 = none)')
+    parser.add_argument('--no-debounce', action='store_true', help='send a request on every keystroke')
+    parser.add_argument('--timeout', type=float, default=30.0, help='per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--out', help='also write the report as JSON')
+    args = parser.parse_args()
+
+    if args.local and not args.url:
+        # Must happen before start_local_app imports the Supabase client
+        import os
+        import tempfile
+        from utils.local_postgrest import LocalPostgrest, serve_in_background
+        engine = LocalPostgrest(os.path.join(tempfile.mkdtemp(prefix='grant_finder_load_'), 'backend.db'))
+        engine.load_dataset(args.local)
+        _, backend_url = serve_in_background(engine)
+        os.environ['SUPABASE_URL'] = backend_url
+
+    base_url = args.url.rstrip('/') if args.url else start_local_app()
+    print(f"Load testing {base_url}: {args.rate} sessions/s, up to {args.concurrency} users, {args.duration:g}s")
+    report = run(base_url, parse_mix(args.mix), args.rate, args.concurrency, args.duration,
+                 args.think, not args.no_debounce, args.seed, args.timeout)
+    print_report(report)
+
+    if args.out:
+        with open(args.out, 'w') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nReport written to {args.out}")
+    return 1 if report['error_rate'] > 0.01 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Run a local PostgREST-compatible backend for grant_finder.
+Serves the foundation, grants, Recipients and Leaders tables from a SQLite
+file with the PostgREST subset the app uses, so the real supabase client
+(and therefore the app, benchmarks and load tests) works with no network.
+
+Usage:
+    python generate_synthetic_data.py --scale 0.01
+    python local_backend.py --load data/synthetic_0.01 --port 54321
+    SUPABASE_URL=http://127.0.0.1:54321 python app.py
+"""
+import argparse
+import sys
+import time
+
+from utils.local_postgrest import LocalPostgrest, make_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local PostgREST stand-in over SQLite.')
+    parser.add_argument('--db', default='local_backend.db', help='SQLite database file')
+    parser.add_argument('--load', help='dataset directory to load (normalized CSVs)')
+    parser.add_argument('--reset', action='store_true', help='delete existing rows before loading')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=54321)
+    args = parser.parse_args()
+
+    engine = LocalPostgrest(args.db)
+    if args.reset:
+        engine.clear()
+    if args.load:
+        print(f"Loading {args.load} into {args.db}...")
+        start = time.time()
+        for table, count in engine.load_dataset(args.load).items():
+            print(f"  {table}: {count:,} rows")
+        print(f"Loaded in {time.time() - start:.1f}s")
+
+    server = make_server(engine, args.host, args.port)
+    print(f"Local backend listening on http://{args.host}:{args.port}")
+    print(f"  export SUPABASE_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Sync the local read replica for grant_finder.
+Copies the foundation, grants, Recipients and Leaders tables from Supabase
+into replica/ (see utils/replica.py), which the app reads instead of the
+network. The first run (or --full) writes and publishes a new snapshot;
+later runs apply only the rows whose primary key or content hash changed.
+Run it once per app host, e.g. from cron, or keep it running with --watch.
+Apps reading the replica notice syncs that changed rows by themselves and
+drop and re-warm their indexes and caches (see app.data_changed).
+
+Usage:
+    python sync_replica.py                  # incremental (snapshot on first run)
+    python sync_replica.py --full
+    python sync_replica.py --watch 300      # background worker: sync every 5 minutes
+"""
+import argparse
+import sys
+import time
+
+from utils.replica import replica_dir, sync_replica
+from utils.supabase_client import SUPABASE_ANON_KEY, SUPABASE_URL
+from utils.table_scan import progress_printer
+
+
+def run_sync(client, directory: str, full: bool) -> None:
+    """Sync once and print per-table counts."""
+    start = time.time()
+    results = sync_replica(client, directory, full=full, progress=progress_printer)
+    for table, counts in results.items():
+        print(f"  {table}: {counts['inserted']:,} inserted, {counts['updated']:,} updated, "
+              f"{counts['deleted']:,} deleted, {counts['unchanged']:,} unchanged")
+    print(f"Synced in {time.time() - start:.1f}s", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Snapshot and incrementally sync the local read replica.')
+    parser.add_argument('--dir', default=replica_dir(), help='replica directory (default replica/)')
+    parser.add_argument('--full', action='store_true', help='write and publish a fresh snapshot')
+    parser.add_argument('--watch', type=float, metavar='SECONDS', help='keep running, syncing every SECONDS')
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error('--dir is required when GRANT_FINDER_REPLICA is empty')
+
+    # Always read from the hosted project, never from the replica being written
+    from supabase import create_client
+    client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+
+    print(f"Syncing {SUPABASE_URL} into {args.dir}...")
+    run_sync(client, args.dir, args.full)
+    while args.watch:
+        time.sleep(args.watch)
+        try:
+            run_sync(client, args.dir, False)
+        except Exception as e:
+            print(f"Error syncing replica: {e}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""
+Shared fixtures: a small synthetic dataset served by the local PostgREST
+stand-in (utils/local_postgrest.py) and a Flask test client pointed at it.
+The app is imported only once the backend is up, because the Supabase
+client reads SUPABASE_URL at import time.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DATASET_SCALE = 0.001
+DATASET_SEED = 7
+
+
+@pytest.fixture(scope='session')
+def backend(tmp_path_factory):
+    """LocalPostgrest engine loaded with the synthetic dataset and served over HTTP."""
+    from generate_synthetic_data import generate
+    from utils.local_postgrest import LocalPostgrest, serve_in_background
+
+    root = tmp_path_factory.mktemp('backend')
+    generate(DATASET_SCALE, DATASET_SEED, str(root / 'data'))
+    engine = LocalPostgrest(str(root / 'backend.db'))
+    engine.load_dataset(str(root / 'data'))
+    server, url = serve_in_background(engine)
+
+    os.environ['SUPABASE_URL'] = url
+    # No prebuilt artifacts, background warming or persisted stats: every test sees the live tables
+    for name in ('GRANT_FINDER_SNAPSHOT', 'GRANT_FINDER_SIMILAR', 'GRANT_FINDER_REPLICA',
+                 'GRANT_FINDER_PROFILES', 'GRANT_FINDER_ACCESS_STATS'):
+        os.environ[name] = ''
+    os.environ['GRANT_FINDER_WARM'] = '0'
+    yield engine
+    server.shutdown()
+
+
+@pytest.fixture(scope='session')
+def app(backend):
+    import app as app_module
+    app_module.app.testing = True
+    return app_module
+
+
+@pytest.fixture
+def client(app):
+    return app.app.test_client()
+
+
+@pytest.fixture
+def sample_ein(backend):
+    """EIN of the foundation with the most grants."""
+    row = backend.connection().execute(
+        'SELECT f.ein FROM grants g JOIN foundation f ON f.foundation_id = g.foundation_id '
+        'GROUP BY f.ein ORDER BY COUNT(*) DESC LIMIT 1'
+    ).fetchone()
+    return int(row[0])
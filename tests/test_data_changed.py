@@ -0,0 +1,57 @@
+"""The data-changed hook makes the app serve changed rows instead of stale indexes and cached responses."""
+from utils.local_postgrest import TABLE_SCHEMAS
+
+
+def _top_grant(client):
+    response = client.get('/api/search?per_page=1')
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    return results[0] if results else None
+
+
+def _grant_row(backend, grant_id):
+    names = [column for column, _ in TABLE_SCHEMAS['grants']['columns']]
+    values = backend.connection().execute(f'SELECT {", ".join(names)} FROM grants WHERE grant_id = ?', [grant_id]).fetchone()
+    return dict(zip(names, values))
+
+
+def test_changed_row_shows_up_after_hook(app, backend, client):
+    before = _top_grant(client)
+    conn = backend.connection()
+    grant_id = conn.execute(
+        'SELECT grant_id FROM grants WHERE grant_amount > 0 ORDER BY grant_amount LIMIT 1'
+    ).fetchone()[0]
+    original = _grant_row(backend, grant_id)
+
+    try:
+        # The smallest grant becomes the largest: the indexes and cached page still rank the old data
+        backend.load_rows('grants', [dict(original, grant_amount=10 ** 12)])
+        assert _top_grant(client) == before
+
+        app.data_changed()
+        top = _top_grant(client)
+        assert top['grant_amount'] == 10 ** 12
+        assert top['recipient_name'] == original['recipient_name']
+    finally:
+        backend.load_rows('grants', [original])
+        app.data_changed()
+
+
+def test_deleted_row_disappears_after_hook(app, backend, client):
+    before = _top_grant(client)
+    conn = backend.connection()
+    grant_id = conn.execute('SELECT grant_id FROM grants ORDER BY grant_amount DESC LIMIT 1').fetchone()[0]
+    original = _grant_row(backend, grant_id)
+
+    try:
+        conn.execute('DELETE FROM grants WHERE grant_id = ?', [grant_id])
+        conn.commit()
+        app.data_changed()
+        top = _top_grant(client)
+        assert top != before
+        assert top['grant_amount'] <= original['grant_amount']
+        total = client.get('/api/search?per_page=1').get_json()['total']
+        assert total == conn.execute('SELECT COUNT(*) FROM grants').fetchone()[0]
+    finally:
+        backend.load_rows('grants', [original])
+        app.data_changed()
@@ -0,0 +1,18 @@
+"""Debug actions that change state need the shared debug token."""
+
+
+def test_debug_actions_refused_without_configured_token(client, monkeypatch):
+    monkeypatch.delenv('GRANT_FINDER_DEBUG_TOKEN', raising=False)
+    assert client.post('/debug/warm').status_code == 403
+    assert client.post('/debug/warm', headers={'X-Debug-Token': ''}).status_code == 403
+    assert client.get('/debug/metrics?reset=1').status_code == 403
+    assert client.get('/debug/metrics').status_code == 200
+
+
+def test_debug_actions_need_matching_token(client, monkeypatch):
+    monkeypatch.setenv('GRANT_FINDER_DEBUG_TOKEN', 'secret')
+    assert client.post('/debug/warm', headers={'X-Debug-Token': 'wrong'}).status_code == 403
+    assert client.get('/debug/metrics?reset=1', headers={'X-Debug-Token': 'wrong'}).status_code == 403
+
+    assert client.post('/debug/warm', headers={'X-Debug-Token': 'secret'}).status_code in (200, 202)
+    assert client.get('/debug/metrics?reset=1', headers={'X-Debug-Token': 'secret'}).status_code == 200
@@ -0,0 +1,17 @@
+"""/api/foundations/batch only accepts well-formed EINs."""
+import pytest
+
+
+@pytest.mark.parametrize('raw', [12.5, 1e9, True, '12-34x', '1.5', '123-456789', '1234567890', '', 0, -5, None, [1]])
+def test_malformed_ein_is_rejected(client, raw):
+    response = client.post('/api/foundations/batch', json={'eins': [raw]})
+    assert response.status_code == 400
+    assert response.get_json()['invalid'] == [raw]
+
+
+def test_int_and_string_forms_match(client, sample_ein):
+    text = f'{sample_ein:09d}'
+    forms = [sample_ein, text, f'{text[:2]}-{text[2:]}']
+    bodies = [client.post('/api/foundations/batch', json={'eins': [form]}).get_json() for form in forms]
+    assert all(body['count'] == 1 and body['not_found'] == [] for body in bodies)
+    assert bodies[0] == bodies[1] == bodies[2]
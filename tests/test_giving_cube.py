@@ -0,0 +1,40 @@
+"""National funder counts come from the per-bucket counts finalize() precomputes."""
+import random
+
+import pytest
+
+from api.giving_cube import GivingCube
+
+EDGES = [0, 1000, 10000, 100000]
+
+
+@pytest.fixture(scope='module')
+def grants():
+    rng = random.Random(3)
+    return [
+        (rng.randrange(1, 40), rng.choice(['CA', 'NY', 'TX']), rng.choice([2021, 2022]), rng.choice([500, 5000, 50000, 500000]))
+        for _ in range(400)
+    ]
+
+
+@pytest.fixture(scope='module')
+def cube(grants):
+    cube = GivingCube(EDGES)
+    for grant in grants:
+        cube.add(*grant)
+    cube.finalize()
+    return cube
+
+
+@pytest.mark.parametrize('year', [None, 2021, 2022])
+@pytest.mark.parametrize('min_amount,max_amount', [(None, None), (1000, None), (None, 9999), (1000, 99999), (100000, None)])
+def test_funder_counts_match_grants(cube, grants, year, min_amount, max_amount):
+    rows = {row['state']: row for row in cube.national_states(year, min_amount, max_amount)}
+    for state, row in rows.items():
+        expected = {
+            ein for ein, grant_state, grant_year, amount in grants
+            if grant_state == state and year in (None, grant_year)
+            and amount >= (min_amount or 0) and (max_amount is None or amount <= max_amount)
+        }
+        assert row['foundation_count'] == len(expected)
+
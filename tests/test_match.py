@@ -0,0 +1,18 @@
+"""/api/match validates its profile and only returns funders of the requested state."""
+import pytest
+
+
+@pytest.mark.parametrize('query', ['state=ZZ', 'state=ZZ&ask=25000', 'ask=0', 'ask=-100', 'ask=nan', 'state=CA&ask=0'])
+def test_invalid_profile_is_rejected(client, query):
+    response = client.get(f'/api/match?{query}')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+@pytest.mark.parametrize('query', ['state=CA', 'state=CA&ask=25000', 'state=NY&ask=5000&q=education'])
+def test_state_profile_only_returns_funders_there(client, query):
+    response = client.get(f'/api/match?{query}&limit=500')
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert results
+    assert all(row['breakdown']['geography'] > 0 for row in results)
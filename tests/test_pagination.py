@@ -0,0 +1,39 @@
+"""Out-of-range page and per_page values are clamped instead of wrapping around or failing."""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(monkeypatch):
+    monkeypatch.setenv('GRANT_FINDER_RESPONSE_CACHE', '0')
+
+
+@pytest.mark.parametrize('path', ['/api/search', '/api/search?q=education', '/api/foundations_aggregated'])
+def test_page_below_one_is_first_page(client, path):
+    separator = '&' if '?' in path else '?'
+    first = client.get(f'{path}{separator}page=1&per_page=5').get_json()
+    assert first['results']
+    for page in (0, -1):
+        response = client.get(f'{path}{separator}page={page}&per_page=5')
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body['page'] == 1
+        assert body['results'] == first['results']
+
+
+@pytest.mark.parametrize('path', ['/api/search', '/api/search?q=education', '/api/foundations_aggregated'])
+def test_per_page_below_one_is_one(client, path):
+    separator = '&' if '?' in path else '?'
+    for per_page in (0, -3):
+        response = client.get(f'{path}{separator}per_page={per_page}')
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body['per_page'] == 1
+        assert len(body['results']) == 1
+        assert body['total_pages'] == body['total']
+
+
+def test_search_grants_clamps_page(app):
+    from api import supabase_api
+    first, total = supabase_api.search_grants(page=1, per_page=3)
+    assert supabase_api.search_grants(page=-1, per_page=3) == (first, total)
+    assert supabase_api.search_grants(page=1, per_page=0)[0] == first[:1]
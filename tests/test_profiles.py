@@ -0,0 +1,32 @@
+"""Pre-rendered profiles are served until the data changes after the build that wrote them."""
+import json
+import time
+
+import pytest
+
+
+@pytest.fixture
+def profiles(app, tmp_path, monkeypatch, sample_ein):
+    from api import foundation_profiles
+    directory = tmp_path / 'profiles'
+    directory.mkdir()
+    # A recognisable payload instead of the real profile, to tell the artifact from a live build
+    artifact = foundation_profiles.encode_profile({'foundation_ein': sample_ein, 'artifact': True})
+    (directory / f'{sample_ein}.json.gz').write_bytes(artifact)
+    manifest = {'version': foundation_profiles.PROFILE_VERSION, 'built_at': int(time.time()), 'profiles': {}}
+    (directory / foundation_profiles.MANIFEST_NAME).write_text(json.dumps(manifest))
+    monkeypatch.setenv('GRANT_FINDER_PROFILES', str(directory))
+    monkeypatch.setenv('GRANT_FINDER_RESPONSE_CACHE', '0')
+    return manifest
+
+
+def test_artifact_served_until_data_changes(profiles, client, sample_ein, monkeypatch):
+    from utils import snapshot
+    body = client.get(f'/api/foundation/{sample_ein}/stats').get_json()
+    assert body.get('artifact') is True
+
+    monkeypatch.setattr(snapshot, '_stale_before', profiles['built_at'] + 1)
+    body = client.get(f'/api/foundation/{sample_ein}/stats').get_json()
+    assert 'artifact' not in body
+    assert body['foundation_ein'] == sample_ein
+    assert body['grant_count'] > 0
@@ -0,0 +1,69 @@
+"""Backend query budgets for the main routes, so N+1 regressions fail here instead of in production."""
+import pytest
+
+from utils.request_metrics import query_budget
+
+# (path, most backend queries once the process-wide indexes are built; None: see
+# stats_budget). Importing api.supabase_api here would create the client before
+# the backend fixture sets SUPABASE_URL.
+ROUTE_BUDGETS = [
+    ('/api/stats', None),
+    ('/api/search', 2),
+    ('/api/search?state=CA&min_amount=1000', 2),
+    ('/api/search?q=education', 2),
+    ('/api/search?foundation=FOUNDATION', 2),
+    ('/api/foundations?q=FOUND', 1),
+    ('/api/foundations_aggregated', 0),
+    ('/api/foundation/{ein}', 3),
+    ('/api/foundation/{ein}/stats', 5),
+    ('/api/foundation/{ein}/history', 0),
+    ('/api/foundation/{ein}/states', 0),
+    ('/api/foundation/{ein}/connections', 0),
+    ('/api/states', 0),
+    ('/api/match?state=CA&ask=25000&q=education', 0),
+    ('/api/recipients?q=A', 0),
+    ('/api/recipient/{recipient_id}', 2),
+]
+
+
+@pytest.fixture
+def recipient_id(backend):
+    """The recipient with the most grants."""
+    return backend.connection().execute(
+        'SELECT recipient_id FROM grants GROUP BY recipient_id ORDER BY COUNT(*) DESC LIMIT 1'
+    ).fetchone()[0]
+
+
+def stats_budget(backend) -> int:
+    """
+    Queries of an uncached /api/stats: the grants table read as STATS_SCAN_PARTITIONS
+    key ranges plus one foundation scan, each MAX_ROWS rows per page and one
+    short (possibly empty) last page.
+    """
+    from api.supabase_api import STATS_SCAN_PARTITIONS
+    from utils.table_scan import MAX_ROWS, hex_boundaries
+
+    conn = backend.connection()
+    splits = hex_boundaries(STATS_SCAN_PARTITIONS)
+    budget = 0
+    for low, high in zip([None] + splits, splits + [None]):
+        count = conn.execute(
+            'SELECT COUNT(*) FROM grants WHERE (? IS NULL OR grant_id >= ?) AND (? IS NULL OR grant_id < ?)',
+            [low, low, high, high]
+        ).fetchone()[0]
+        budget += count // MAX_ROWS + 1
+    filings = conn.execute('SELECT COUNT(*) FROM foundation').fetchone()[0]
+    return budget + filings // MAX_ROWS + 1
+
+
+@pytest.mark.parametrize('path,budget', ROUTE_BUDGETS)
+def test_route_query_budget(client, backend, monkeypatch, sample_ein, recipient_id, path, budget):
+    # Count the route's own queries, not response cache hits
+    monkeypatch.setenv('GRANT_FINDER_RESPONSE_CACHE', '0')
+    if budget is None:
+        budget = stats_budget(backend)
+    path = path.format(ein=sample_ein, recipient_id=recipient_id)
+    assert client.get(path).status_code == 200  # builds the indexes the route uses
+
+    with query_budget(budget):
+        assert client.get(path).status_code == 200
@@ -0,0 +1,16 @@
+"""Recipient grant history is fetched in parallel IN-list chunks and comes back whole."""
+
+
+def test_chunked_fetch_returns_every_grant(app, backend, monkeypatch):
+    from api import supabase_api
+    recipient_id, grant_count = backend.connection().execute(
+        'SELECT recipient_id, COUNT(*) FROM grants GROUP BY recipient_id ORDER BY COUNT(*) DESC LIMIT 1'
+    ).fetchone()
+    assert grant_count > 2
+
+    whole = supabase_api.get_recipient.__wrapped__(recipient_id)
+    monkeypatch.setattr(supabase_api, 'RECIPIENT_CHUNK_SIZE', 1)
+    chunked = supabase_api.get_recipient.__wrapped__(recipient_id)
+    assert chunked['grant_count'] == whole['grant_count'] == grant_count
+    assert sorted(map(str, chunked['funders'])) == sorted(map(str, whole['funders']))
+    assert sorted(map(str, chunked['grants'])) == sorted(map(str, whole['grants']))
@@ -0,0 +1,50 @@
+"""Readers of the local replica are told about syncs that changed rows, and only those."""
+import os
+import threading
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def replica(backend):
+    # Imported once the backend is up: utils.replica loads the Supabase client configuration
+    from utils import replica
+    return replica
+
+
+@pytest.fixture
+def remote(backend):
+    from supabase import create_client
+    from utils.supabase_client import SUPABASE_ANON_KEY
+    return create_client(os.environ['SUPABASE_URL'], SUPABASE_ANON_KEY)
+
+
+def test_sync_that_changes_rows_calls_on_change(backend, replica, remote, tmp_path, monkeypatch):
+    monkeypatch.setattr(replica, 'REPLICA_CHECK_SECONDS', 0.0)
+    directory = str(tmp_path / 'replica')
+    replica.sync_replica(remote, directory)
+
+    changed = threading.Event()
+    transport = replica.ReplicaTransport(directory, httpx.HTTPTransport(), on_change=changed.set)
+    engine, tables = transport._current()
+    assert engine is not None and 'grants' in tables
+
+    # Nothing changed remotely: no notification
+    replica.sync_replica(remote, directory)
+    transport._current()
+    assert not changed.wait(0.2)
+
+    conn = backend.connection()
+    grant_id, purpose = conn.execute('SELECT grant_id, grant_purpose FROM grants LIMIT 1').fetchone()
+    try:
+        conn.execute('UPDATE grants SET grant_purpose = ? WHERE grant_id = ?', ['REPLICA TEST', grant_id])
+        conn.commit()
+        results = replica.sync_replica(remote, directory)
+        assert results['grants']['updated'] == 1
+
+        transport._current()
+        assert changed.wait(5)
+    finally:
+        conn.execute('UPDATE grants SET grant_purpose = ? WHERE grant_id = ?', [purpose, grant_id])
+        conn.commit()
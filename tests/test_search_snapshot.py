@@ -0,0 +1,47 @@
+"""Search indexes written to a snapshot map back as array sections and answer queries like the built ones."""
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope='module')
+def indexes(app, tmp_path_factory):
+    from api import search_index
+    from utils.snapshot import Snapshot, SnapshotWriter
+
+    built = search_index.get_grant_index(), search_index.get_foundation_text_index()
+    writer = SnapshotWriter()
+    for index in built:
+        index.write_snapshot(writer)
+    path = str(tmp_path_factory.mktemp('snapshot') / 'indexes.snap')
+    writer.write(path)
+
+    snapshot = Snapshot(path)
+    loaded = search_index.GrantIndex.from_snapshot(snapshot), search_index.FoundationTextIndex.from_snapshot(snapshot)
+    return snapshot, built, loaded
+
+
+def test_sections_are_raw_arrays(indexes):
+    snapshot, _, (grant_index, _) = indexes
+    assert {section['kind'] for section in snapshot.sections.values()} <= {'array', 'json'}
+    # Mapped, not decoded: the columns share memory with the file
+    assert not grant_index.amounts.flags.owndata and not grant_index.amounts.flags.writeable
+    assert not grant_index.purpose_index.doc_ids.flags.owndata
+
+
+@pytest.mark.parametrize('filters', [{}, {'state': 'CA'}, {'min_amount': 1000, 'max_amount': 50000}, {'year': 2022}])
+def test_grant_index_matches_built(indexes, filters):
+    _, (built, _), (loaded, _) = indexes
+    rows, total = built.top_by_amount(0, 50, **filters)
+    loaded_rows, loaded_total = loaded.top_by_amount(0, 50, **filters)
+    assert total == loaded_total
+    assert np.array_equal(rows, loaded_rows)
+    assert built.facet_counts(built.filter_rows(**filters)) == loaded.facet_counts(loaded.filter_rows(**filters))
+
+
+def test_text_indexes_match_built(indexes):
+    _, (built_grants, built_text), (loaded_grants, loaded_text) = indexes
+    for query in ('education', 'scholarship program', 'health'):
+        assert np.array_equal(built_grants.ranked_search(query), loaded_grants.ranked_search(query))
+        assert np.array_equal(built_text.mission_index.score(query), loaded_text.mission_index.score(query))
+    assert loaded_text.ein_by_foundation_id == built_text.ein_by_foundation_id
+    assert loaded_text.match_foundation_ids('FOUND') == built_text.match_foundation_ids('FOUND')
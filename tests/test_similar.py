@@ -0,0 +1,55 @@
+"""Similar foundations come only from the file build_similar.py writes, never from an in-process build."""
+import pytest
+
+
+@pytest.fixture(scope='module')
+def similar_file(app, tmp_path_factory):
+    """Neighbour file for the test dataset, written the way build_similar.py does."""
+    from api.similar_foundations import write_similar_foundations
+    path = str(tmp_path_factory.mktemp('similar') / 'similar.snap')
+    write_similar_foundations(path)
+    return path
+
+
+@pytest.fixture
+def similar(app, monkeypatch):
+    from api import similar_foundations
+
+    builds = []
+    monkeypatch.setattr(similar_foundations, 'build_similar_foundations', lambda *args, **kwargs: builds.append(args))
+    monkeypatch.setenv('GRANT_FINDER_RESPONSE_CACHE', '0')
+    similar_foundations.reset_similar_foundations()
+    yield similar_foundations
+    similar_foundations.reset_similar_foundations()
+    assert not builds, 'neighbours built inside a request'
+
+
+def test_without_file_route_is_404(similar, client, sample_ein, monkeypatch, tmp_path):
+    for path in ('', str(tmp_path / 'missing.snap')):
+        monkeypatch.setenv('GRANT_FINDER_SIMILAR', path)
+        similar.reset_similar_foundations()
+        assert client.get(f'/api/foundation/{sample_ein}/similar').status_code == 404
+
+
+def test_built_file_is_served(similar_file, similar, client, sample_ein, monkeypatch):
+    monkeypatch.setenv('GRANT_FINDER_SIMILAR', similar_file)
+    similar.reset_similar_foundations()
+
+    response = client.get(f'/api/foundation/{sample_ein}/similar?limit=3')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['foundation_ein'] == sample_ein
+    assert 0 < len(body['similar']) <= 3
+
+
+def test_file_built_before_data_change_is_ignored(similar_file, similar, client, sample_ein, monkeypatch):
+    from utils import snapshot
+    monkeypatch.setenv('GRANT_FINDER_SIMILAR', similar_file)
+    built_at = snapshot.Snapshot(similar_file).built_at
+    monkeypatch.setattr(snapshot, '_stale_before', built_at + 1)
+    similar.reset_similar_foundations()
+    assert client.get(f'/api/foundation/{sample_ein}/similar').status_code == 404
+
+    monkeypatch.setattr(snapshot, '_stale_before', built_at)
+    similar.reset_similar_foundations()
+    assert client.get(f'/api/foundation/{sample_ein}/similar').status_code == 200
@@ -0,0 +1,172 @@
+"""
+Roaring-style compressed bitmaps over numpy.
+Row numbers are split into 65536-wide chunks by their high 16 bits. Each
+chunk is stored as a sorted uint16 array while sparse (<= 4096 values) and
+as a 1024-word uint64 bitset once dense, so intersections and unions stay
+cheap whether a filter matches a handful of grants or most of the table.
+Reference: Chambi, Lemire et al., "Better bitmap performance with Roaring bitmaps".
+"""
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+ARRAY_LIMIT = 4096
+_WORDS = 1024
+# Bit counts of every 16-bit value, for popcount by table lookup
+_POPCOUNT16 = np.array([bin(i).count('1') for i in range(1 << 16)], dtype=np.uint8)
+
+
+def _popcount(words: np.ndarray) -> int:
+    return int(_POPCOUNT16[words.view(np.uint16)].sum(dtype=np.int64))
+
+
+def _to_bitset(values: np.ndarray) -> np.ndarray:
+    words = np.zeros(_WORDS, dtype=np.uint64)
+    np.bitwise_or.at(words, values >> 6, np.left_shift(np.uint64(1), (values & 63).astype(np.uint64)))
+    return words
+
+
+def _to_array(words: np.ndarray) -> np.ndarray:
+    bits = np.unpackbits(words.view(np.uint8), bitorder='little')
+    return np.flatnonzero(bits).astype(np.uint16)
+
+
+def _shrink(words: np.ndarray):
+    """Keep a bitset only while it is dense enough to pay for itself."""
+    count = _popcount(words)
+    if count == 0:
+        return None
+    return _to_array(words) if count <= ARRAY_LIMIT else words
+
+
+def _is_bitset(container: np.ndarray) -> bool:
+    return container.dtype == np.uint64
+
+
+def _contains(words: np.ndarray, values: np.ndarray) -> np.ndarray:
+    return ((words[values >> 6] >> (values & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+
+def _and(a: np.ndarray, b: np.ndarray):
+    if _is_bitset(a) and _is_bitset(b):
+        return _shrink(a & b)
+    if _is_bitset(a):
+        a, b = b, a
+    if _is_bitset(b):
+        result = a[_contains(b, a)]
+    else:
+        result = np.intersect1d(a, b, assume_unique=True)
+    return result if len(result) else None
+
+
+def _or(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if not _is_bitset(a) and not _is_bitset(b):
+        result = np.union1d(a, b).astype(np.uint16)
+        return result if len(result) <= ARRAY_LIMIT else _to_bitset(result)
+    words = (a if _is_bitset(a) else _to_bitset(a)).copy()
+    if _is_bitset(b):
+        words |= b
+    else:
+        words |= _to_bitset(b)
+    return words
+
+
+class RoaringBitmap:
+    """Immutable compressed set of non-negative row numbers (< 2**32)."""
+
+    __slots__ = ('containers',)
+
+    def __init__(self, containers: Optional[Dict[int, np.ndarray]] = None):
+        self.containers: Dict[int, np.ndarray] = containers or {}
+
+    @classmethod
+    def from_sorted(cls, rows: np.ndarray) -> 'RoaringBitmap':
+        """Build from sorted, unique row numbers."""
+        rows = np.asarray(rows, dtype=np.uint32)
+        containers = {}
+        if len(rows):
+            highs = rows >> 16
+            bounds = np.flatnonzero(np.diff(highs)) + 1
+            for chunk in np.split(rows, bounds):
+                low = (chunk & 0xFFFF).astype(np.uint16)
+                containers[int(chunk[0] >> 16)] = low if len(low) <= ARRAY_LIMIT else _to_bitset(low)
+        return cls(containers)
+
+    def __len__(self) -> int:
+        return sum(
+            _popcount(c) if _is_bitset(c) else len(c)
+            for c in self.containers.values()
+        )
+
+    def __and__(self, other: 'RoaringBitmap') -> 'RoaringBitmap':
+        containers = {}
+        for key in self.containers.keys() & other.containers.keys():
+            result = _and(self.containers[key], other.containers[key])
+            if result is not None:
+                containers[key] = result
+        return RoaringBitmap(containers)
+
+    def intersection_count(self, other: 'RoaringBitmap') -> int:
+        """len(self & other) without materializing the intersection."""
+        total = 0
+        for key in self.containers.keys() & other.containers.keys():
+            a, b = self.containers[key], other.containers[key]
+            if _is_bitset(a) and _is_bitset(b):
+                total += _popcount(a & b)
+            elif _is_bitset(a) or _is_bitset(b):
+                array, words = (b, a) if _is_bitset(a) else (a, b)
+                total += int(_contains(words, array).sum())
+            else:
+                total += len(np.intersect1d(a, b, assume_unique=True))
+        return total
+
+    def __or__(self, other: 'RoaringBitmap') -> 'RoaringBitmap':
+        containers = dict(self.containers)
+        for key, container in other.containers.items():
+            containers[key] = _or(containers[key], container) if key in containers else container
+        return RoaringBitmap(containers)
+
+    @classmethod
+    def union(cls, bitmaps: Iterable['RoaringBitmap']) -> 'RoaringBitmap':
+        result = cls()
+        for bitmap in bitmaps:
+            result = result | bitmap
+        return result
+
+    @classmethod
+    def intersection(cls, bitmaps: List['RoaringBitmap']) -> 'RoaringBitmap':
+        """Intersect smallest-first so later steps touch as few containers as possible."""
+        bitmaps = sorted(bitmaps, key=lambda b: len(b.containers))
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            if not result.containers:
+                break
+            result = result & bitmap
+        return result
+
+    def contains(self, rows: np.ndarray) -> np.ndarray:
+        """Vectorized membership test for an array of row numbers."""
+        rows = np.asarray(rows, dtype=np.int64)
+        result = np.zeros(len(rows), dtype=bool)
+        highs = rows >> 16
+        for key in np.unique(highs).tolist():
+            container = self.containers.get(key)
+            if container is None:
+                continue
+            selected = highs == key
+            low = (rows[selected] & 0xFFFF).astype(np.uint16)
+            if _is_bitset(container):
+                result[selected] = _contains(container, low)
+            else:
+                positions = np.minimum(np.searchsorted(container, low), len(container) - 1)
+                result[selected] = container[positions] == low
+        return result
+
+    def to_array(self) -> np.ndarray:
+        """Sorted row numbers as int64."""
+        parts = []
+        for key in sorted(self.containers):
+            container = self.containers[key]
+            low = _to_array(container) if _is_bitset(container) else container
+            parts.append(low.astype(np.int64) + (key << 16))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
@@ -0,0 +1,142 @@
+"""
+Compact BM25 inverted index.
+Postings for the whole vocabulary live in two flat numpy arrays (uint32 doc
+ids, uint16 term frequencies) sliced by per-term offsets, so a query is a few
+array slices plus a vectorized score accumulation.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into', 'is',
+    'it', 'its', 'of', 'on', 'or', 'our', 'that', 'the', 'their', 'this', 'to', 'was',
+    'were', 'which', 'with',
+])
+
+
+def stem(token: str) -> str:
+    """Very light plural stripping so 'scholarships' matches 'scholarship'."""
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords, stem."""
+    if not text:
+        return []
+    return [stem(t) for t in TOKEN_RE.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed set of documents numbered 0..n_docs-1."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocabulary: Dict[str, int] = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.uint32)
+        self.term_freqs = np.zeros(0, dtype=np.uint16)
+        self.doc_lengths = np.zeros(0, dtype=np.uint16)
+        self.avg_doc_length = 0.0
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.doc_lengths)
+
+    @classmethod
+    def build(cls, texts: Iterable[Optional[str]], k1: float = 1.2, b: float = 0.75) -> 'BM25Index':
+        """Index texts; document i is the i-th text."""
+        index = cls(k1, b)
+        postings: Dict[str, List[int]] = {}
+        doc_lengths = []
+
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(min(len(tokens), 65535))
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                # Pack doc id and tf into one int to keep the build loop light
+                postings.setdefault(token, []).append((doc_id << 16) | min(tf, 65535))
+
+        terms = sorted(postings)
+        sizes = np.array([len(postings[t]) for t in terms], dtype=np.int64)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+
+        packed = np.empty(int(offsets[-1]), dtype=np.int64)
+        for i, term in enumerate(terms):
+            packed[offsets[i]:offsets[i + 1]] = postings[term]
+
+        index.vocabulary = {term: i for i, term in enumerate(terms)}
+        index.offsets = offsets
+        index.doc_ids = (packed >> 16).astype(np.uint32)
+        index.term_freqs = (packed & 0xFFFF).astype(np.uint16)
+        index.doc_lengths = np.array(doc_lengths, dtype=np.uint16)
+        index.avg_doc_length = float(index.doc_lengths.mean()) if doc_lengths else 0.0
+        return index
+
+    def write_snapshot(self, writer, name: str) -> None:
+        """Store the postings as array sections under name (see from_snapshot)."""
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        writer.add_json(name, {'k1': self.k1, 'b': self.b, 'avg_doc_length': self.avg_doc_length, 'terms': terms})
+        for field in ('offsets', 'doc_ids', 'term_freqs', 'doc_lengths'):
+            writer.add_array(f'{name}.{field}', getattr(self, field))
+
+    @classmethod
+    def from_snapshot(cls, snapshot, name: str) -> 'BM25Index':
+        """The index write_snapshot stored under name, its arrays mapped from the snapshot."""
+        meta = snapshot.json(name)
+        index = cls(meta['k1'], meta['b'])
+        index.vocabulary = {term: i for i, term in enumerate(meta['terms'])}
+        for field in ('offsets', 'doc_ids', 'term_freqs', 'doc_lengths'):
+            setattr(index, field, snapshot.array(f'{name}.{field}'))
+        index.avg_doc_length = meta['avg_doc_length']
+        return index
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(doc ids, term frequencies) for one already-tokenized term."""
+        i = self.vocabulary.get(term)
+        if i is None:
+            return self.doc_ids[:0], self.term_freqs[:0]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.doc_ids[start:end], self.term_freqs[start:end]
+
+    def score(self, query: str) -> np.ndarray:
+        """Dense BM25 score for every document (0 for non-matching docs)."""
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        if not self.n_docs:
+            return scores
+
+        length_norm = None
+        for term in set(tokenize(query)):
+            docs, tfs = self.postings(term)
+            if not len(docs):
+                continue
+            if length_norm is None:
+                length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / max(self.avg_doc_length, 1e-9))
+            df = len(docs)
+            idf = np.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+            tf = tfs.astype(np.float32)
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + length_norm[docs])
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Matching doc ids ordered by descending score, with their scores."""
+        scores = self.score(query)
+        matched = np.flatnonzero(scores)
+        if limit is not None and len(matched) > limit:
+            top = np.argpartition(-scores[matched], limit - 1)[:limit]
+            matched = matched[top]
+        order = np.argsort(-scores[matched], kind='stable')
+        matched = matched[order]
+        return matched, scores[matched]
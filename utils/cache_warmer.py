@@ -0,0 +1,312 @@
+"""
+Access statistics and cache warming for grant_finder.
+Every successful request bumps a counter for the foundation EIN it shows,
+the search filter combination it ran or the autocomplete prefix it looked
+up. Counters are merged into a small JSON file (snapshot/access_stats.json,
+or GRANT_FINDER_ACCESS_STATS; empty disables it) with an exponential decay,
+so it always describes recent traffic across processes and restarts.
+
+CacheWarmer replays the most requested paths through the app itself, which
+builds the process-wide indexes and fills the response cache, the per-EIN
+aggregate cache and the snapshot, replica and backend page caches exactly
+as live requests would.
+It runs in one background thread at process start and whenever it is
+scheduled again (POST /debug/warm, e.g. after an ingestion or replica sync),
+with at most WARM_WORKERS requests in flight, at most WARM_RATE per second,
+and only while no live request is being served.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+DEFAULT_ACCESS_STATS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                         'snapshot', 'access_stats.json')
+
+# Counts halve every day, so last week's traffic fades out
+ACCESS_HALF_LIFE_SECONDS = 24 * 3600.0
+
+# How often a process merges its counts into the stats file
+ACCESS_FLUSH_SECONDS = 60.0
+
+# Keys kept per kind in the stats file (the rest are the long tail)
+MAX_TRACKED = 5000
+MAX_PREFIX_LENGTH = 64
+
+ACCESS_KINDS = ('eins', 'searches', 'prefixes')
+
+# Routes whose filter combinations are tracked; these arguments do not change the work done
+SEARCH_ROUTES = ('/api/search', '/api/foundations_aggregated')
+SEARCH_IGNORED_ARGS = ('page',)
+
+# What one warm run replays
+WARM_EINS = 200
+WARM_SEARCHES = 50
+WARM_PREFIXES = 100
+WARM_EIN_PATH = '/api/foundation/{}/stats'
+
+# Warm requests in flight, and the most started per second
+WARM_WORKERS = 2
+WARM_RATE = 10.0
+
+# Pause between checks while live requests are being served
+IDLE_POLL_SECONDS = 0.05
+
+# WSGI environ flag marking the warmer's own requests (not counted as traffic)
+WARM_ENVIRON = 'grant_finder.warm'
+
+
+def warming_enabled() -> bool:
+    """False when GRANT_FINDER_WARM is 0 (e.g. benchmarks, which want cold caches)."""
+    return os.environ.get('GRANT_FINDER_WARM', '1') != '0'
+
+
+def access_stats_path() -> str:
+    """GRANT_FINDER_ACCESS_STATS, or snapshot/access_stats.json in the repository (empty disables it)."""
+    return os.environ.get('GRANT_FINDER_ACCESS_STATS', DEFAULT_ACCESS_STATS_PATH)
+
+
+class AccessStats:
+    """Decayed request counts per EIN, search and prefix, persisted to a shared file."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path or None
+        self.lock = threading.Lock()
+        self.totals: Dict[str, Dict[str, float]] = {kind: {} for kind in ACCESS_KINDS}
+        self.pending: Dict[str, Dict[str, float]] = {kind: defaultdict(float) for kind in ACCESS_KINDS}
+        self.active = 0
+        self._next_flush = time.monotonic() + ACCESS_FLUSH_SECONDS
+        self._flushing = False
+        if self.path:
+            self.totals = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, float]]:
+        """The file's counts, decayed to now (empty when there is no file)."""
+        try:
+            with open(self.path) as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return {kind: {} for kind in ACCESS_KINDS}
+        except (OSError, ValueError) as e:
+            print(f"Error reading access stats {self.path}: {e}")
+            return {kind: {} for kind in ACCESS_KINDS}
+        decay = 0.5 ** (max(0.0, time.time() - data.get('updated', 0)) / ACCESS_HALF_LIFE_SECONDS)
+        return {kind: {key: count * decay for key, count in data.get(kind, {}).items()} for kind in ACCESS_KINDS}
+
+    def record(self, kind: str, key: str) -> None:
+        with self.lock:
+            counts = self.pending[kind]
+            counts[key] += 1
+            if len(counts) > 2 * MAX_TRACKED:
+                # Not flushed (no file): keep memory bounded by dropping the long tail
+                kept = sorted(counts.items(), key=lambda x: -x[1])[:MAX_TRACKED]
+                self.pending[kind] = defaultdict(float, kept)
+            due = self.path and not self._flushing and time.monotonic() >= self._next_flush
+            if due:
+                self._flushing = True
+        if due:
+            threading.Thread(target=self.flush, name='access-stats-flush', daemon=True).start()
+
+    def begin_request(self) -> None:
+        with self.lock:
+            self.active += 1
+
+    def end_request(self) -> None:
+        with self.lock:
+            self.active -= 1
+
+    def idle(self) -> bool:
+        """True when no live request is being served."""
+        return self.active <= 0
+
+    def flush(self) -> None:
+        """Merge this process's new counts into the file (other processes' counts are kept)."""
+        with self.lock:
+            pending = self.pending
+            self.pending = {kind: defaultdict(float) for kind in ACCESS_KINDS}
+        try:
+            if not self.path or not any(pending.values()):
+                return
+            totals = self._load()
+            for kind in ACCESS_KINDS:
+                counts = totals[kind]
+                for key, count in pending[kind].items():
+                    counts[key] = counts.get(key, 0.0) + count
+                if len(counts) > MAX_TRACKED:
+                    kept = sorted(counts.items(), key=lambda x: -x[1])[:MAX_TRACKED]
+                    totals[kind] = dict(kept)
+            data = dict({kind: {k: round(v, 3) for k, v in totals[kind].items()} for kind in ACCESS_KINDS},
+                        updated=time.time())
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temporary = f'{self.path}.{os.getpid()}.tmp'
+            with open(temporary, 'w') as fh:
+                json.dump(data, fh, separators=(',', ':'))
+            os.replace(temporary, self.path)
+            with self.lock:
+                self.totals = totals
+        except OSError as e:
+            # e.g. a read-only deployment: stop trying, keep counting in memory
+            print(f"Error writing access stats {self.path}: {e}")
+            self.path = None
+        finally:
+            with self.lock:
+                self._flushing = False
+                self._next_flush = time.monotonic() + ACCESS_FLUSH_SECONDS
+
+    def top(self, kind: str, n: int) -> List[Tuple[str, float]]:
+        """The n most requested keys of a kind with their counts, most requested first."""
+        with self.lock:
+            counts = dict(self.totals[kind])
+            for key, count in self.pending[kind].items():
+                counts[key] = counts.get(key, 0.0) + count
+        return sorted(counts.items(), key=lambda x: (-x[1], x[0]))[:n]
+
+
+_stats: Optional[AccessStats] = None
+_stats_lock = threading.Lock()
+
+
+def get_access_stats() -> AccessStats:
+    """Return the process-wide access statistics, loading the file on first use."""
+    global _stats
+    if _stats is None:
+        with _stats_lock:
+            if _stats is None:
+                _stats = AccessStats(access_stats_path())
+                atexit.register(_stats.flush)
+    return _stats
+
+
+def warm_targets(stats: AccessStats) -> List[str]:
+    """Paths to replay, most requested first across EINs, searches and prefixes."""
+    targets = [(count, WARM_EIN_PATH.format(ein)) for ein, count in stats.top('eins', WARM_EINS)]
+    targets += [(count, path) for path, count in stats.top('searches', WARM_SEARCHES)]
+    targets += [(count, f'/api/foundations?q={quote(prefix)}') for prefix, count in stats.top('prefixes', WARM_PREFIXES)]
+    targets.sort(key=lambda x: -x[0])
+    return [path for _, path in targets]
+
+
+class CacheWarmer:
+    """Replays hot paths through a Flask app, rate-limited and yielding to live traffic."""
+
+    def __init__(self, app, stats: AccessStats, workers: int = WARM_WORKERS, rate: float = WARM_RATE):
+        self.app = app
+        self.stats = stats
+        self.workers = max(1, workers)
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._slot_lock = threading.Lock()
+
+    def _wait_turn(self) -> None:
+        """Sleep until this request's rate-limit slot, then until no live request is running."""
+        with self._slot_lock:
+            slot = max(time.monotonic(), self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        while not self.stats.idle():
+            time.sleep(IDLE_POLL_SECONDS)
+
+    def run(self, targets: Optional[List[str]] = None) -> Dict:
+        """Request every target once; returns request/error counts and the elapsed time."""
+        targets = warm_targets(self.stats) if targets is None else targets
+        client = self.app.test_client()
+        counts = {'requests': 0, 'errors': 0}
+        counts_lock = threading.Lock()
+        start = time.time()
+
+        def warm(path: str) -> None:
+            self._wait_turn()
+            try:
+                status = client.get(path, environ_base={WARM_ENVIRON: True}).status_code
+                failed = status >= 500
+            except Exception as e:
+                print(f"Error warming {path}: {e}")
+                failed = True
+            with counts_lock:
+                counts['requests'] += 1
+                counts['errors'] += int(failed)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(warm, targets))
+        counts['seconds'] = round(time.time() - start, 2)
+        return counts
+
+
+_warm_lock = threading.Lock()
+_warm_thread: Optional[threading.Thread] = None
+_warm_again = False
+
+
+def _warm_loop(app) -> None:
+    global _warm_thread, _warm_again
+    while True:
+        try:
+            result = CacheWarmer(app, get_access_stats()).run()
+            if result['requests']:
+                print(f"Warmed {result['requests']} paths in {result['seconds']}s ({result['errors']} errors)")
+        except Exception as e:
+            print(f"Error warming caches: {e}")
+        with _warm_lock:
+            if not _warm_again:
+                _warm_thread = None
+                return
+            _warm_again = False
+
+
+def schedule_warm(app) -> bool:
+    """Start a background warm run; if one is running, queue one more after it. True if started."""
+    global _warm_thread, _warm_again
+    if not warming_enabled():
+        return False
+    with _warm_lock:
+        if _warm_thread is not None:
+            _warm_again = True
+            return False
+        _warm_thread = threading.Thread(target=_warm_loop, args=(app,), name='cache-warmer', daemon=True)
+        _warm_thread.start()
+        return True
+
+
+def init_app(app) -> None:
+    """Count each request's EIN, search or prefix, and warm the hottest ones at process start."""
+    from flask import g, request
+
+    stats = get_access_stats()
+
+    @app.before_request
+    def _begin_access():
+        if not request.environ.get(WARM_ENVIRON):
+            g.access_live = True
+            stats.begin_request()
+
+    @app.after_request
+    def _record_access(response):
+        if request.environ.get(WARM_ENVIRON) or request.url_rule is None or response.status_code >= 400:
+            return response
+        rule = request.url_rule.rule
+        ein = (request.view_args or {}).get('ein')
+        if ein is not None:
+            stats.record('eins', str(ein))
+        elif rule in SEARCH_ROUTES:
+            args = sorted((k, v) for k, v in request.args.items(multi=True) if v and k not in SEARCH_IGNORED_ARGS)
+            stats.record('searches', f'{rule}?{urlencode(args)}' if args else rule)
+        elif rule == '/api/foundations':
+            prefix = request.args.get('q', '').strip().upper()[:MAX_PREFIX_LENGTH]
+            if prefix:
+                stats.record('prefixes', prefix)
+        return response
+
+    @app.teardown_request
+    def _end_access(exc=None):
+        if g.pop('access_live', False):
+            stats.end_request()
+
+    if warming_enabled() and warm_targets(stats):
+        schedule_warm(app)
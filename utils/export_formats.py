@@ -0,0 +1,133 @@
+"""
+Streaming export encoders for grant_finder.
+Turn an iterator of row chunks into an iterator of CSV, NDJSON or Parquet
+bytes, one piece per chunk, so a Flask generator response can send any
+number of rows with flat memory. Parquet needs the optional pyarrow
+package; each chunk becomes one row group.
+"""
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+# Column kinds: 'str', 'int', 'float' or 'list' (of strings)
+Columns = List[Tuple[str, str]]
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _cell(value, kind: str):
+    """Coerce a value to its column kind (None when empty)."""
+    if value is None or value == '':
+        return None
+    if kind == 'list':
+        return [str(v) for v in value]
+    if kind == 'int':
+        try:
+            return int(value)
+        except (ValueError, TypeError):
+            return None
+    if kind == 'float':
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return None
+    return str(value)
+
+
+def _csv_stream(columns: Columns, chunks: Iterable[List[Dict]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for chunk in chunks:
+        for row in chunk:
+            values = []
+            for name, kind in columns:
+                value = _cell(row.get(name), kind)
+                values.append('; '.join(value) if kind == 'list' and value else value)
+            writer.writerow(values)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _ndjson_stream(columns: Columns, chunks: Iterable[List[Dict]]) -> Iterator[bytes]:
+    for chunk in chunks:
+        lines = [
+            json.dumps({name: _cell(row.get(name), kind) for name, kind in columns})
+            for row in chunk
+        ]
+        if lines:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class _PendingBytes(io.RawIOBase):
+    """Write-only sink whose contents are drained after each Parquet row group."""
+
+    def __init__(self):
+        self.pieces: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.pieces.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b''.join(self.pieces)
+        self.pieces = []
+        return data
+
+
+def _parquet_stream(columns: Columns, chunks: Iterable[List[Dict]]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {'str': pa.string(), 'int': pa.int64(), 'float': pa.float64(), 'list': pa.list_(pa.string())}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    sink = _PendingBytes()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            arrays = [pa.array([_cell(row.get(name), kind) for row in chunk], type=types[kind])
+                      for name, kind in columns]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def encode_stream(format: str, columns: Columns, chunks: Iterable[List[Dict]]) -> Iterator[bytes]:
+    """Bytes of the export, produced chunk by chunk."""
+    if format == 'csv':
+        return _csv_stream(columns, chunks)
+    if format == 'ndjson':
+        return _ndjson_stream(columns, chunks)
+    if format == 'parquet':
+        return _parquet_stream(columns, chunks)
+    raise ValueError(f"Unknown export format: {format}")
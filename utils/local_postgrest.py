@@ -0,0 +1,511 @@
+"""
+Local PostgREST stand-in for grant_finder.
+Implements the subset of PostgREST semantics the app uses (select with column
+lists, eq/neq/gt/gte/lt/lte/like/ilike/in/is filters, order, limit/offset,
+count=exact, insert, update and delete) over an embedded SQLite database, so
+the real supabase client can be pointed at it for offline tests and benchmarks.
+"""
+
+import csv
+import json
+import os
+import re
+import socket
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+# Column types mirror SUPABASE_DB_STRUCRTURE.md
+TABLE_SCHEMAS = {
+    'foundation': {
+        'primary_key': 'foundation_id',
+        'columns': [
+            ('foundation_id', 'text'), ('ein', 'bigint'), ('organization_name', 'text'),
+            ('tax_period_begin', 'text'), ('tax_period_end', 'text'),
+            ('address_line1', 'text'), ('address_line2', 'text'), ('city', 'text'),
+            ('state', 'text'), ('zip', 'bigint'), ('phone', 'text'), ('website', 'text'),
+            ('formation_year', 'text'), ('legal_domicile_state', 'text'),
+            ('total_assets_boy', 'text'), ('total_assets_eoy', 'text'),
+            ('total_liabilities_eoy', 'text'), ('net_assets_eoy', 'text'),
+            ('fair_market_value_eoy', 'text'), ('total_revenue', 'text'),
+            ('total_expenses', 'text'), ('investment_income', 'text'),
+            ('distributable_amount', 'text'), ('total_distributions', 'text'),
+            ('undistributed_income', 'text'), ('is_private_operating_foundation', 'text'),
+            ('is_501c3', 'text'), ('mission_description', 'text'),
+            ('leader_ids', 'jsonb'), ('source_file', 'text'),
+        ],
+        'indexes': ['ein', 'organization_name'],
+    },
+    'grants': {
+        'primary_key': 'grant_id',
+        'columns': [
+            ('grant_id', 'text'), ('foundation_id', 'text'), ('recipient_id', 'text'),
+            ('grant_amount', 'bigint'), ('cash_grant_amount', 'bigint'),
+            ('non_cash_grant_amount', 'text'), ('grant_purpose', 'text'),
+            ('recipient_relationship', 'text'), ('recipient_foundation_status', 'text'),
+            ('recipient_irc_section', 'text'), ('non_cash_description', 'text'),
+            ('valuation_method', 'text'), ('recipient_name', 'text'),
+            ('recipient_ein', 'text'), ('recipient_city', 'text'),
+            ('recipient_state', 'text'), ('tax_period_end', 'text'), ('source_file', 'text'),
+        ],
+        'indexes': ['foundation_id', 'recipient_id', 'grant_amount', 'recipient_state'],
+    },
+    'Recipients': {
+        'primary_key': 'recipient_id',
+        'columns': [
+            ('recipient_id', 'text'), ('recipient_name', 'text'), ('recipient_ein', 'text'),
+            ('address_line1', 'text'), ('address_line2', 'text'), ('city', 'text'),
+            ('state', 'text'), ('zip', 'bigint'), ('country', 'text'), ('grant_ids', 'jsonb'),
+        ],
+        'indexes': ['recipient_name', 'recipient_ein'],
+    },
+    'Leaders': {
+        'primary_key': 'leader_id',
+        'columns': [
+            ('leader_id', 'text'), ('foundation_id', 'text'), ('person_name', 'text'),
+            ('title', 'text'), ('compensation', 'text'), ('benefits', 'text'),
+            ('other_compensation', 'text'), ('hours_per_week', 'text'),
+            ('is_officer', 'text'), ('is_director', 'text'), ('is_trustee', 'text'),
+            ('is_key_employee', 'text'), ('tax_period_end', 'text'), ('source_file', 'text'),
+        ],
+        'indexes': ['foundation_id', 'person_name'],
+    },
+}
+
+# Table -> CSV written by generate_synthetic_data.py (and the original normalization scripts)
+DATASET_FILES = [
+    ('foundation', 'foundations_normalized.csv'),
+    ('Recipients', 'recipients_normalized.csv'),
+    ('grants', 'grants_normalized.csv'),
+    ('Leaders', 'leaders_normalized.csv'),
+]
+
+SQL_TYPES = {'text': 'TEXT', 'bigint': 'INTEGER', 'jsonb': 'TEXT'}
+COMPARISON_OPERATORS = {'eq': '=', 'neq': '<>', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+RESERVED_PARAMS = {'select', 'order', 'limit', 'offset', 'columns', 'on_conflict'}
+
+
+class PostgrestError(Exception):
+    """An error reported to the client in PostgREST's JSON error shape."""
+
+    def __init__(self, status: int, code: str, message: str, details: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+        self.details = details
+
+    def to_json(self) -> Dict:
+        return {'code': self.code, 'message': self.message, 'details': self.details, 'hint': None}
+
+
+def _split_list(value: str) -> List[str]:
+    """Split an in.(a,"b,c") list, honouring double quotes."""
+    value = value.strip()
+    if value.startswith('(') and value.endswith(')'):
+        value = value[1:-1]
+    if not value:
+        return []
+    return next(csv.reader([value], skipinitialspace=True))
+
+
+def _like_pattern(pattern: str) -> str:
+    """PostgREST accepts * as well as % as the wildcard."""
+    return pattern.replace('*', '%')
+
+
+class LocalPostgrest:
+    """PostgREST request semantics executed against a SQLite file."""
+
+    def __init__(self, db_path: str = 'local_backend.db'):
+        self.db_path = db_path
+        self._local = threading.local()
+        self.create_tables()
+
+    # ----- storage -----
+
+    def connection(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite connections are not thread-safe)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def create_tables(self) -> None:
+        conn = self.connection()
+        for table, schema in TABLE_SCHEMAS.items():
+            columns = ', '.join(
+                f'"{name}" {SQL_TYPES[kind]}' + (' PRIMARY KEY' if name == schema['primary_key'] else '')
+                for name, kind in schema['columns']
+            )
+            conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({columns})')
+            for column in schema['indexes']:
+                conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{table}_{column}" ON "{table}" ("{column}")')
+        conn.commit()
+
+    def _schema(self, table: str) -> Dict:
+        schema = TABLE_SCHEMAS.get(table)
+        if schema is None:
+            raise PostgrestError(404, 'PGRST205', f"Could not find the table 'public.{table}' in the schema cache")
+        return schema
+
+    def _column_types(self, table: str) -> Dict[str, str]:
+        return dict(self._schema(table)['columns'])
+
+    def _check_column(self, table: str, column: str) -> str:
+        if column not in self._column_types(table):
+            raise PostgrestError(400, '42703', f'column {table}.{column} does not exist')
+        return f'"{column}"'
+
+    def _encode_row(self, table: str, row: Dict) -> Dict:
+        """Convert a JSON row to SQLite values (jsonb is stored as text)."""
+        types = self._column_types(table)
+        encoded = {}
+        for key, value in row.items():
+            self._check_column(table, key)
+            if types[key] == 'jsonb' and value is not None and not isinstance(value, str):
+                value = json.dumps(value)
+            elif isinstance(value, bool):
+                value = str(value).lower()
+            encoded[key] = value
+        return encoded
+
+    def _decode_rows(self, table: str, columns: List[Tuple[str, str]], rows: List[tuple]) -> List[Dict]:
+        types = self._column_types(table)
+        jsonb = [i for i, (_, column) in enumerate(columns) if types[column] == 'jsonb']
+        result = []
+        for row in rows:
+            record = {alias: value for (alias, _), value in zip(columns, row)}
+            for i in jsonb:
+                alias = columns[i][0]
+                if isinstance(record[alias], str):
+                    try:
+                        record[alias] = json.loads(record[alias])
+                    except ValueError:
+                        pass
+            result.append(record)
+        return result
+
+    def load_rows(self, table: str, rows: List[Dict], replace: bool = True, commit: bool = True) -> int:
+        """Bulk-insert rows (used for seeding, bypasses HTTP); commit=False leaves the transaction open."""
+        if not rows:
+            return 0
+        columns = [c for c, _ in self._schema(table)['columns']]
+        placeholders = ', '.join('?' for _ in columns)
+        verb = 'INSERT OR REPLACE' if replace else 'INSERT'
+        sql = f'{verb} INTO "{table}" ({", ".join(chr(34) + c + chr(34) for c in columns)}) VALUES ({placeholders})'
+        conn = self.connection()
+        encoded = (self._encode_row(table, row) for row in rows)
+        conn.executemany(sql, ([r.get(c) for c in columns] for r in encoded))
+        if commit:
+            conn.commit()
+        return len(rows)
+
+    def load_csv(self, table: str, csv_path: str, batch_size: int = 50000) -> int:
+        """Bulk-load a normalized CSV file into a table."""
+        types = self._column_types(table)
+        total = 0
+        batch = []
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            for record in csv.DictReader(f):
+                row = {}
+                for key, value in record.items():
+                    if key not in types:
+                        continue
+                    if value == '':
+                        value = None
+                    elif types[key] == 'bigint':
+                        try:
+                            value = int(float(value))
+                        except ValueError:
+                            value = None
+                    row[key] = value
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    total += self.load_rows(table, batch)
+                    batch = []
+        total += self.load_rows(table, batch)
+        return total
+
+    def load_dataset(self, data_dir: str) -> Dict[str, int]:
+        """Load every normalized CSV found in a dataset directory."""
+        counts = {}
+        for table, filename in DATASET_FILES:
+            path = os.path.join(data_dir, filename)
+            if os.path.exists(path):
+                counts[table] = self.load_csv(table, path)
+        return counts
+
+    def clear(self) -> None:
+        """Delete every row of every table."""
+        conn = self.connection()
+        for table in TABLE_SCHEMAS:
+            conn.execute(f'DELETE FROM "{table}"')
+        conn.commit()
+
+    # ----- query translation -----
+
+    def _parse_filter(self, table: str, column: str, expression: str) -> Tuple[str, List]:
+        """Translate one col=op.value query parameter into SQL."""
+        negate = False
+        if expression.startswith('not.'):
+            negate = True
+            expression = expression[4:]
+        operator, _, value = expression.partition('.')
+        sql_column = self._check_column(table, column)
+
+        if operator in COMPARISON_OPERATORS:
+            clause, params = f'{sql_column} {COMPARISON_OPERATORS[operator]} ?', [value]
+        elif operator == 'ilike':
+            clause, params = f"{sql_column} LIKE ? ESCAPE '\\'", [_like_pattern(value)]
+        elif operator == 'like':
+            glob = _like_pattern(value).replace('%', '*').replace('_', '?')
+            clause, params = f'{sql_column} GLOB ?', [glob]
+        elif operator == 'in':
+            values = _split_list(value)
+            if not values:
+                clause, params = '0', []
+            else:
+                clause, params = f'{sql_column} IN ({", ".join("?" for _ in values)})', values
+        elif operator == 'is':
+            keyword = value.lower()
+            if keyword == 'null':
+                clause = f'{sql_column} IS NULL'
+            elif keyword in ('true', 'false'):
+                clause = f"LOWER({sql_column}) = '{keyword}'"
+            else:
+                raise PostgrestError(400, 'PGRST100', f'failed to parse filter (is.{value})')
+            params = []
+        else:
+            raise PostgrestError(400, 'PGRST100', f'failed to parse filter ({operator}.{value})')
+
+        if negate:
+            clause = f'NOT ({clause})'
+        return clause, params
+
+    def _where(self, table: str, params: List[Tuple[str, str]]) -> Tuple[str, List]:
+        clauses, values = [], []
+        for key, value in params:
+            if key in RESERVED_PARAMS:
+                continue
+            clause, clause_values = self._parse_filter(table, key, value)
+            clauses.append(clause)
+            values.extend(clause_values)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', values
+
+    def _select_columns(self, table: str, select: str) -> List[Tuple[str, str]]:
+        """Parse select=a,b,alias:c into (alias, column) pairs."""
+        columns = []
+        for item in select.split(','):
+            item = item.strip()
+            if not item:
+                continue
+            if item == '*':
+                columns.extend((c, c) for c, _ in self._schema(table)['columns'])
+                continue
+            item = item.split('::')[0]
+            alias, _, column = item.partition(':')
+            if not column:
+                alias, column = item, item
+            self._check_column(table, column)
+            columns.append((alias, column))
+        return columns
+
+    def _order(self, table: str, order: Optional[str]) -> str:
+        if not order:
+            return ''
+        terms = []
+        for item in order.split(','):
+            parts = item.strip().split('.')
+            column = self._check_column(table, parts[0])
+            desc = 'desc' in parts[1:]
+            # PostgREST defaults: ascending puts NULLs last, descending puts them first
+            nulls_first = desc
+            if 'nullsfirst' in parts[1:]:
+                nulls_first = True
+            elif 'nullslast' in parts[1:]:
+                nulls_first = False
+            terms.append(f'{column} IS NULL {"DESC" if nulls_first else "ASC"}')
+            terms.append(f'{column} {"DESC" if desc else "ASC"}')
+        return ' ORDER BY ' + ', '.join(terms)
+
+    def select(
+        self,
+        table: str,
+        params: List[Tuple[str, str]],
+        count: bool = False,
+        range_header: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[int], int]:
+        """Run a GET; returns (rows, exact_count or None, offset)."""
+        self._schema(table)
+        query = dict(params)
+        columns = self._select_columns(table, query.get('select', '*'))
+        where, values = self._where(table, params)
+
+        offset = int(query.get('offset', 0) or 0)
+        limit = int(query['limit']) if query.get('limit') else None
+        if range_header and 'offset' not in query:
+            match = re.match(r'(\d+)-(\d*)', range_header.strip())
+            if match:
+                offset = int(match.group(1))
+                if match.group(2):
+                    limit = int(match.group(2)) - offset + 1
+
+        sql = f'SELECT {", ".join(chr(34) + c + chr(34) for _, c in columns)} FROM "{table}"{where}'
+        sql += self._order(table, query.get('order'))
+        if limit is not None or offset:
+            sql += f' LIMIT {limit if limit is not None else -1} OFFSET {offset}'
+
+        conn = self.connection()
+        rows = self._decode_rows(table, columns, conn.execute(sql, values).fetchall())
+        total = None
+        if count:
+            total = conn.execute(f'SELECT COUNT(*) FROM "{table}"{where}', values).fetchone()[0]
+        return rows, total, offset
+
+    def insert(self, table: str, body, params: List[Tuple[str, str]], prefer: str) -> List[Dict]:
+        rows = body if isinstance(body, list) else [body]
+        if not rows:
+            return []
+        verb = 'INSERT'
+        if 'resolution=merge-duplicates' in prefer:
+            verb = 'INSERT OR REPLACE'
+        elif 'resolution=ignore-duplicates' in prefer:
+            verb = 'INSERT OR IGNORE'
+
+        conn = self.connection()
+        primary_key = self._schema(table)['primary_key']
+        try:
+            for row in rows:
+                encoded = self._encode_row(table, row)
+                names = ', '.join(f'"{c}"' for c in encoded)
+                placeholders = ', '.join('?' for _ in encoded)
+                conn.execute(f'{verb} INTO "{table}" ({names}) VALUES ({placeholders})', list(encoded.values()))
+            conn.commit()
+        except sqlite3.IntegrityError as e:
+            conn.rollback()
+            raise PostgrestError(409, '23505', 'duplicate key value violates unique constraint', str(e))
+
+        keys = [row.get(primary_key) for row in rows if row.get(primary_key) is not None]
+        if not keys:
+            return rows
+        returned, _, _ = self.select(table, [('select', '*'), (primary_key, f'in.({",".join(json.dumps(k) for k in keys)})')])
+        return returned
+
+    def update(self, table: str, body: Dict, params: List[Tuple[str, str]]) -> List[Dict]:
+        encoded = self._encode_row(table, body)
+        if not encoded:
+            return []
+        where, values = self._where(table, params)
+        conn = self.connection()
+        primary_key = self._schema(table)['primary_key']
+        keys = [r[0] for r in conn.execute(f'SELECT "{primary_key}" FROM "{table}"{where}', values).fetchall()]
+        assignments = ', '.join(f'"{c}" = ?' for c in encoded)
+        conn.execute(f'UPDATE "{table}" SET {assignments}{where}', list(encoded.values()) + values)
+        conn.commit()
+        if not keys:
+            return []
+        returned, _, _ = self.select(table, [('select', '*'), (primary_key, f'in.({",".join(json.dumps(k) for k in keys)})')])
+        return returned
+
+    def delete(self, table: str, params: List[Tuple[str, str]]) -> List[Dict]:
+        rows, _, _ = self.select(table, [('select', '*')] + [p for p in params if p[0] not in RESERVED_PARAMS])
+        where, values = self._where(table, params)
+        conn = self.connection()
+        conn.execute(f'DELETE FROM "{table}"{where}', values)
+        conn.commit()
+        return rows
+
+    # ----- HTTP -----
+
+    def handle(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        """Serve one HTTP request; returns (status, headers, body)."""
+        url = urlsplit(path)
+        prefix = '/rest/v1/'
+        if not url.path.startswith(prefix):
+            return 404, {'Content-Type': 'application/json'}, b'{"message": "Not found"}'
+
+        table = unquote(url.path[len(prefix):]).strip('/')
+        params = parse_qsl(url.query, keep_blank_values=True)
+        prefer = headers.get('prefer', '')
+        response_headers = {'Content-Type': 'application/json; charset=utf-8'}
+
+        try:
+            if method in ('GET', 'HEAD'):
+                count = 'count=' in prefer
+                rows, total, offset = self.select(table, params, count=count, range_header=headers.get('range'))
+                end = f'{offset}-{offset + len(rows) - 1}' if rows else '*'
+                response_headers['Content-Range'] = f'{end}/{total if total is not None else "*"}'
+                payload = b'' if method == 'HEAD' else json.dumps(rows).encode()
+                return 200, response_headers, payload
+
+            data = json.loads(body) if body else None
+            if method == 'POST':
+                rows = self.insert(table, data, params, prefer)
+                status = 201
+            elif method == 'PATCH':
+                rows = self.update(table, data or {}, params)
+                status = 200
+            elif method == 'DELETE':
+                rows = self.delete(table, params)
+                status = 200
+            else:
+                return 405, response_headers, b'{"message": "Method not allowed"}'
+
+            if 'return=representation' in prefer:
+                if 'count=' in prefer:
+                    response_headers['Content-Range'] = f'*/{len(rows)}'
+                return status, response_headers, json.dumps(rows).encode()
+            return (204 if status == 200 else status), response_headers, b''
+
+        except PostgrestError as e:
+            return e.status, response_headers, json.dumps(e.to_json()).encode()
+        except (ValueError, sqlite3.Error) as e:
+            error = PostgrestError(400, 'PGRST100', str(e))
+            return error.status, response_headers, json.dumps(error.to_json()).encode()
+
+
+def make_server(engine: LocalPostgrest, host: str = '127.0.0.1', port: int = 54321) -> ThreadingHTTPServer:
+    """Create (but do not start) an HTTP server bound to the engine."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def _serve(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+            headers = {k.lower(): v for k, v in self.headers.items()}
+            status, response_headers, payload = engine.handle(self.command, self.path, headers, body)
+            self.send_response(status)
+            for key, value in response_headers.items():
+                self.send_header(key, value)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            if payload and self.command != 'HEAD':
+                self.wfile.write(payload)
+
+        do_GET = do_HEAD = do_POST = do_PATCH = do_DELETE = _serve
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve_in_background(engine: LocalPostgrest, host: str = '127.0.0.1', port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start a server on a daemon thread; returns (server, base URL). Port 0 picks a free port."""
+    server = make_server(engine, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
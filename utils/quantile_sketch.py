@@ -0,0 +1,172 @@
+"""
+KLL quantile sketch.
+Keeps a small, mergeable summary of a stream of numbers from which
+quantiles, ranks and histograms can be read with bounded rank error
+(about 1% of n at the default k=200; exact while n <= k).
+Reference: Karnin, Lang & Liberty, "Optimal Quantile Approximation in Streams".
+"""
+import random
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seeded so sketches built from the same data in the same order are reproducible
+_coin = random.Random(0x5EED)
+
+
+class KLLSketch:
+    """Mergeable quantile summary. Level h items each stand for 2**h values."""
+
+    __slots__ = ('k', 'n', 'levels', 'min', 'max', '_sorted')
+
+    def __init__(self, k: int = 200):
+        self.k = k
+        self.n = 0
+        self.levels: List[List[float]] = [[]]
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._sorted: Optional[List[Tuple[float, int]]] = None
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(self.k * (2.0 / 3.0) ** depth) + 1)
+
+    def _compress(self) -> None:
+        """Compact every over-full level into the one above it."""
+        changed = True
+        while changed:
+            changed = False
+            for h in range(len(self.levels)):
+                if len(self.levels[h]) < self._capacity(h):
+                    continue
+                if h + 1 == len(self.levels):
+                    self.levels.append([])
+                items = sorted(self.levels[h])
+                keep = [items.pop()] if len(items) % 2 else []
+                self.levels[h + 1].extend(items[_coin.getrandbits(1)::2])
+                self.levels[h] = keep
+                changed = True
+                break
+
+    def update(self, value: float) -> None:
+        self.levels[0].append(value)
+        self.n += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self._sorted = None
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def update_many(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.update(value)
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """Fold another sketch into this one (in place) and return self."""
+        if not other.n:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.n += other.n
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._sorted = None
+        self._compress()
+        return self
+
+    @classmethod
+    def merged(cls, sketches: Iterable['KLLSketch'], k: int = 200) -> 'KLLSketch':
+        result = cls(k)
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+    def _weighted(self) -> List[Tuple[float, int]]:
+        """(value, weight) pairs sorted by value; cached until the next update."""
+        if self._sorted is None:
+            pairs = []
+            for h, items in enumerate(self.levels):
+                weight = 1 << h
+                pairs.extend((value, weight) for value in items)
+            pairs.sort()
+            self._sorted = pairs
+        return self._sorted
+
+    def quantile(self, q: float) -> float:
+        """Value at fraction q of the distribution (upper quantile; 0 if empty)."""
+        if not self.n:
+            return 0
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        target = q * self.n
+        cumulative = 0
+        for value, weight in self._weighted():
+            cumulative += weight
+            if cumulative > target:
+                return value
+        return self.max
+
+    def range_quantile(self, q: float, low: Optional[float] = None, high: Optional[float] = None) -> float:
+        """Quantile of only the values in [low, high] (0 if none fall there)."""
+        pairs = [
+            (v, weight) for v, weight in self._weighted()
+            if (low is None or v >= low) and (high is None or v <= high)
+        ]
+        target = q * sum(weight for _, weight in pairs)
+        cumulative = 0
+        for value, weight in pairs:
+            cumulative += weight
+            if cumulative > target:
+                return value
+        return pairs[-1][0] if pairs else 0
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        return [self.quantile(q) for q in qs]
+
+    def rank(self, value: float) -> int:
+        """Approximate number of values <= value."""
+        return sum(weight for v, weight in self._weighted() if v <= value)
+
+    def count_between(self, low: Optional[float] = None, high: Optional[float] = None) -> int:
+        """Approximate number of values in [low, high]."""
+        return sum(
+            weight for v, weight in self._weighted()
+            if (low is None or v >= low) and (high is None or v <= high)
+        )
+
+    def sum_between(self, low: Optional[float] = None, high: Optional[float] = None) -> float:
+        """Approximate total of the values in [low, high]."""
+        return sum(
+            v * weight for v, weight in self._weighted()
+            if (low is None or v >= low) and (high is None or v <= high)
+        )
+
+    def histogram(self, edges: Sequence[float]) -> List[int]:
+        """Approximate counts per [edges[i], edges[i+1]) bucket; last bucket is open-ended."""
+        counts = [0] * len(edges)
+        i = 0
+        for value, weight in self._weighted():
+            while i + 1 < len(edges) and value >= edges[i + 1]:
+                i += 1
+            if value >= edges[0]:
+                counts[i] += weight
+        return counts
+
+    def to_dict(self) -> Dict:
+        return {'k': self.k, 'n': self.n, 'min': self.min, 'max': self.max, 'levels': self.levels}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'KLLSketch':
+        sketch = cls(data.get('k', 200))
+        sketch.n = data['n']
+        sketch.min = data.get('min')
+        sketch.max = data.get('max')
+        sketch.levels = [list(level) for level in data['levels']] or [[]]
+        return sketch
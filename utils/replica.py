@@ -0,0 +1,276 @@
+"""
+Local read replica of the Supabase tables for grant_finder.
+sync_replica.py copies the four tables into an embedded SQLite database on
+each app host and keeps it current; the app then answers PostgREST reads
+from that file with the local_postgrest engine and only goes over the
+network for writes, tables the replica does not hold, or queries the
+engine cannot answer.
+
+Layout: a replica directory holding versioned database files and a CURRENT
+file naming the live one. A full snapshot is written to a new version and
+published by atomically replacing CURRENT; readers notice within
+REPLICA_CHECK_SECONDS and reopen. An incremental sync rescans the remote
+tables by primary key, compares a content hash per row with the hashes
+stored in the replica, and applies only inserted, changed and deleted rows
+to the live version in one transaction, which WAL-mode readers see all at
+once or not at all. Every sync that changes rows also bumps a generation
+number; a reader that sees the version or generation move calls its
+on_change hook, so the app rebuilds its indexes from the new data.
+"""
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional, Set
+
+import httpx
+
+from utils.local_postgrest import TABLE_SCHEMAS, DATASET_FILES, LocalPostgrest
+from utils.table_scan import MAX_ROWS, scan_table
+
+DEFAULT_REPLICA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'replica')
+CURRENT_NAME = 'CURRENT'
+
+# Tables in sync order
+REPLICA_TABLES = [table for table, _ in DATASET_FILES]
+
+# How often readers look for a newly published version
+REPLICA_CHECK_SECONDS = 5.0
+
+# Superseded versions kept around for readers that have not switched yet
+KEEP_VERSIONS = 2
+
+# Parallel key ranges per table scan during a sync
+SYNC_PARTITIONS = 4
+
+_BOOKKEEPING = [
+    'CREATE TABLE IF NOT EXISTS _replica_rows '
+    '(table_name TEXT NOT NULL, pk TEXT NOT NULL, hash TEXT NOT NULL, PRIMARY KEY (table_name, pk))',
+    'CREATE TABLE IF NOT EXISTS _replica_tables '
+    '(table_name TEXT PRIMARY KEY, row_count INTEGER, synced_at REAL)',
+    'CREATE TABLE IF NOT EXISTS _replica_state (name TEXT PRIMARY KEY, value INTEGER NOT NULL)',
+]
+
+
+def replica_dir() -> str:
+    """GRANT_FINDER_REPLICA, or replica/ in the repository (empty disables the replica)."""
+    return os.environ.get('GRANT_FINDER_REPLICA', DEFAULT_REPLICA_DIR)
+
+
+def current_version(directory: str) -> Optional[str]:
+    """Path of the live replica database, or None when none has been published."""
+    try:
+        with open(os.path.join(directory, CURRENT_NAME)) as fh:
+            name = fh.read().strip()
+    except OSError:
+        return None
+    path = os.path.join(directory, name)
+    return path if name and os.path.exists(path) else None
+
+
+def row_hash(row: Dict) -> str:
+    return hashlib.blake2b(json.dumps(row, sort_keys=True, default=str).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _open_engine(path: str) -> LocalPostgrest:
+    engine = LocalPostgrest(path)
+    conn = engine.connection()
+    for statement in _BOOKKEEPING:
+        conn.execute(statement)
+    conn.commit()
+    return engine
+
+
+def _sync_table(engine: LocalPostgrest, table: str, client, progress: Optional[Callable[[int], None]]) -> Dict:
+    """Apply one table's inserts, updates and deletes (inside the caller's transaction)."""
+    key = TABLE_SCHEMAS[table]['primary_key']
+    conn = engine.connection()
+    conn.execute('CREATE TEMP TABLE IF NOT EXISTS _seen (pk TEXT PRIMARY KEY)')
+    conn.execute('DELETE FROM _seen')
+    counts = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+    def apply(rows):
+        hashes = {row[key]: row_hash(row) for row in rows}
+        placeholders = ', '.join('?' for _ in hashes)
+        stored = dict(conn.execute(
+            f'SELECT pk, hash FROM _replica_rows WHERE table_name = ? AND pk IN ({placeholders})',
+            [table] + list(hashes)
+        ).fetchall())
+        changed = [row for row in rows if stored.get(row[key]) != hashes[row[key]]]
+        engine.load_rows(table, changed, commit=False)
+        conn.executemany('INSERT OR REPLACE INTO _replica_rows VALUES (?, ?, ?)',
+                         [(table, row[key], hashes[row[key]]) for row in changed])
+        conn.executemany('INSERT OR IGNORE INTO _seen VALUES (?)', [(pk,) for pk in hashes])
+        for row in changed:
+            counts['updated' if row[key] in stored else 'inserted'] += 1
+        counts['unchanged'] += len(rows) - len(changed)
+
+    batch = []
+    for row in scan_table(table, '*', key=key, partitions=SYNC_PARTITIONS, progress=progress, client=client):
+        batch.append(row)
+        if len(batch) >= MAX_ROWS:
+            apply(batch)
+            batch = []
+    if batch:
+        apply(batch)
+
+    # Rows the remote no longer has
+    deleted = [pk for (pk,) in conn.execute(
+        'SELECT pk FROM _replica_rows WHERE table_name = ? AND pk NOT IN (SELECT pk FROM _seen)', [table]
+    ).fetchall()]
+    for i in range(0, len(deleted), 500):
+        chunk = deleted[i:i + 500]
+        placeholders = ', '.join('?' for _ in chunk)
+        conn.execute(f'DELETE FROM "{table}" WHERE "{key}" IN ({placeholders})', chunk)
+        conn.execute(f'DELETE FROM _replica_rows WHERE table_name = ? AND pk IN ({placeholders})', [table] + chunk)
+    counts['deleted'] = len(deleted)
+
+    row_count = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+    conn.execute('INSERT OR REPLACE INTO _replica_tables VALUES (?, ?, ?)', (table, row_count, time.time()))
+    return counts
+
+
+def sync_replica(
+    client,
+    directory: Optional[str] = None,
+    full: bool = False,
+    progress: Optional[Callable[[str], Callable[[int], None]]] = None
+) -> Dict[str, Dict]:
+    """
+    Bring the replica up to date from client (a remote Supabase client).
+    Writes and publishes a new version when full is set or there is none yet;
+    otherwise applies the differences to the live version in one transaction.
+    progress(table) may return a scan_table progress callback.
+    Returns per-table inserted/updated/deleted/unchanged counts.
+    """
+    directory = directory or replica_dir()
+    os.makedirs(directory, exist_ok=True)
+    live = current_version(directory)
+    fresh = full or live is None
+    path = os.path.join(directory, f'replica-{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}.db') if fresh else live
+
+    engine = _open_engine(path)
+    conn = engine.connection()
+    # One write transaction for every table: readers see the old state until COMMIT
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        results = {}
+        for table in REPLICA_TABLES:
+            results[table] = _sync_table(engine, table, client, progress(table) if progress else None)
+        if any(counts['inserted'] or counts['updated'] or counts['deleted'] for counts in results.values()):
+            conn.execute("INSERT INTO _replica_state VALUES ('generation', 1) "
+                         "ON CONFLICT (name) DO UPDATE SET value = value + 1")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        if fresh:
+            conn.close()
+            _remove_version(path)
+        raise
+
+    if fresh:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.close()
+        temporary = os.path.join(directory, f'{CURRENT_NAME}.tmp')
+        with open(temporary, 'w') as fh:
+            fh.write(os.path.basename(path))
+        os.replace(temporary, os.path.join(directory, CURRENT_NAME))
+        _prune_versions(directory, path)
+    return results
+
+
+def _remove_version(path: str) -> None:
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _prune_versions(directory: str, live: str) -> None:
+    """Delete superseded versions beyond the newest KEEP_VERSIONS."""
+    versions = sorted(glob.glob(os.path.join(directory, 'replica-*.db')), key=os.path.getmtime, reverse=True)
+    for path in [v for v in versions if v != live][KEEP_VERSIONS:]:
+        _remove_version(path)
+
+
+class ReplicaTransport(httpx.BaseTransport):
+    """
+    httpx transport answering PostgREST reads from the local replica and
+    forwarding everything else (writes, unsynced tables, queries the local
+    engine rejects) to the remote transport.
+    """
+
+    def __init__(self, directory: str, remote: httpx.BaseTransport, on_change: Optional[Callable[[], None]] = None):
+        self.directory = directory
+        self.remote = remote
+        self.on_change = on_change
+        self.hits = 0
+        self.misses = 0
+        self._path: Optional[str] = None
+        self._engine: Optional[LocalPostgrest] = None
+        self._tables: Set[str] = set()
+        self._generation: Optional[tuple] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _current(self):
+        """(engine, synced tables) of the live version, reopened when a new one is published."""
+        now = time.monotonic()
+        changed = False
+        if now - self._checked >= REPLICA_CHECK_SECONDS:
+            with self._lock:
+                if now - self._checked >= REPLICA_CHECK_SECONDS:
+                    path = current_version(self.directory)
+                    if path != self._path:
+                        self._path = path
+                        self._engine = _open_engine(path) if path else None
+                    generation = (path, 0)
+                    if self._engine is not None:
+                        try:
+                            conn = self._engine.connection()
+                            rows = conn.execute('SELECT table_name FROM _replica_tables').fetchall()
+                            self._tables = set(name for (name,) in rows)
+                            row = conn.execute("SELECT value FROM _replica_state WHERE name = 'generation'").fetchone()
+                            generation = (path, row[0] if row else 0)
+                        except sqlite3.Error as e:
+                            print(f"Error reading replica {path}: {e}")
+                            self._tables = set()
+                    # The first check only records where we start
+                    changed = self._generation is not None and generation != self._generation
+                    self._generation = generation
+                    self._checked = now
+        if changed and self.on_change is not None:
+            # Own thread: the hook rebuilds indexes whose scans come back through this transport
+            threading.Thread(target=self.on_change, name='replica-data-changed', daemon=True).start()
+        return self._engine, self._tables
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method in ('GET', 'HEAD'):
+            engine, tables = self._current()
+            path = request.url.raw_path.decode('ascii')
+            table = request.url.path.split('/rest/v1/', 1)[-1].strip('/')
+            if engine is not None and table in tables:
+                headers = {k.lower(): v for k, v in request.headers.items()}
+                status, response_headers, body = engine.handle(request.method, path, headers, b'')
+                if status < 400:
+                    self.hits += 1
+                    return httpx.Response(status, headers=response_headers, content=body, request=request)
+        self.misses += 1
+        return self.remote.handle_request(request)
+
+    def close(self) -> None:
+        self.remote.close()
+
+
+def create_replica_client(url: str, key: str, directory: str, on_change: Optional[Callable[[], None]] = None):
+    """
+    A Supabase client whose PostgREST reads are served from the replica in
+    directory; on_change() runs (on its own thread) after syncs that change rows.
+    """
+    from supabase import ClientOptions, create_client
+
+    transport = ReplicaTransport(directory, httpx.HTTPTransport(http2=True), on_change)
+    session = httpx.Client(transport=transport, timeout=120, follow_redirects=True)
+    return create_client(url, key, options=ClientOptions(httpx_client=session))
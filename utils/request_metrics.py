@@ -0,0 +1,245 @@
+"""
+Request profiling for grant_finder.
+Times every Flask request per route and every Supabase (PostgREST) call made
+while serving it, adds a Server-Timing header to each response and keeps
+rolling p50/p95/p99 latencies for /debug/metrics. Backend calls are observed
+through httpx event hooks on the client's PostgREST session, so no query
+code has to change.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from utils.cache_warmer import WARM_ENVIRON
+
+# Samples kept per rolling window
+WINDOW_SIZE = 1000
+
+_current_trace: ContextVar[Optional['RequestTrace']] = ContextVar('request_trace', default=None)
+
+
+class RollingWindow:
+    """The last WINDOW_SIZE samples of a latency, with percentiles on demand."""
+
+    def __init__(self, size: int = WINDOW_SIZE):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float) -> None:
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def percentile(self, p: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p / 100.0 * len(ordered)))]
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 2) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50), 2),
+            'p95_ms': round(self.percentile(95), 2),
+            'p99_ms': round(self.percentile(99), 2)
+        }
+
+
+class RequestTrace:
+    """Backend calls made while serving one request (or one query_budget block)."""
+
+    def __init__(self, parent: Optional['RequestTrace'] = None):
+        self.calls: List[Dict] = []
+        self.lock = threading.Lock()
+        # An enclosing trace (e.g. a query_budget around a test request) sees the calls too
+        self.parent = parent
+
+    def record(self, call: Dict) -> None:
+        with self.lock:
+            self.calls.append(call)
+        if self.parent is not None:
+            self.parent.record(call)
+
+    @property
+    def backend_ms(self) -> float:
+        return sum(call['ms'] for call in self.calls)
+
+    @property
+    def rows(self) -> int:
+        return sum(call['rows'] for call in self.calls)
+
+
+class MetricsRegistry:
+    """Process-wide rolling latencies per route and per backend table."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.routes: Dict[str, Dict] = defaultdict(lambda: {
+            'wall': RollingWindow(),
+            'backend': RollingWindow(),
+            'queries': RollingWindow(),
+            'errors': 0
+        })
+        self.tables: Dict[str, Dict] = defaultdict(lambda: {'latency': RollingWindow(), 'rows': 0})
+
+    def record_request(self, route: str, wall_ms: float, trace: RequestTrace, status: int) -> None:
+        with self.lock:
+            stats = self.routes[route]
+            stats['wall'].add(wall_ms)
+            stats['backend'].add(trace.backend_ms)
+            stats['queries'].add(len(trace.calls))
+            if status >= 500:
+                stats['errors'] += 1
+
+    def record_call(self, call: Dict) -> None:
+        with self.lock:
+            stats = self.tables[call['table']]
+            stats['latency'].add(call['ms'])
+            stats['rows'] += call['rows']
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            routes = {}
+            for route, stats in sorted(self.routes.items()):
+                queries = stats['queries']
+                routes[route] = dict(
+                    stats['wall'].summary(),
+                    backend_p50_ms=round(stats['backend'].percentile(50), 2),
+                    backend_p95_ms=round(stats['backend'].percentile(95), 2),
+                    queries_mean=round(queries.total / queries.count, 2) if queries.count else 0.0,
+                    queries_max=max(queries.samples) if queries.samples else 0,
+                    errors=stats['errors']
+                )
+            tables = {
+                table: dict(stats['latency'].summary(), rows=stats['rows'])
+                for table, stats in sorted(self.tables.items())
+            }
+        return {'uptime_seconds': int(time.time() - self.started), 'routes': routes, 'backend': tables}
+
+    def reset(self) -> None:
+        with self.lock:
+            self.routes.clear()
+            self.tables.clear()
+            self.started = time.time()
+
+
+metrics = MetricsRegistry()
+
+
+def _row_count(response) -> int:
+    """Rows returned by a PostgREST response, read from Content-Range ('0-24/*')."""
+    content_range = response.headers.get('content-range', '')
+    span = content_range.split('/')[0]
+    if '-' in span:
+        start, end = span.split('-', 1)
+        if start.isdigit() and end.isdigit():
+            return int(end) - int(start) + 1
+    return 0
+
+
+def _on_request(request) -> None:
+    request.extensions['grant_finder_start'] = time.perf_counter()
+
+
+def _on_response(response) -> None:
+    request = response.request
+    start = request.extensions.get('grant_finder_start')
+    if start is None:
+        return
+    # Hooks run before the body is consumed; read it so transfer time is included
+    response.read()
+    call = {
+        'table': request.url.path.rstrip('/').rsplit('/', 1)[-1],
+        'method': request.method,
+        'status': response.status_code,
+        'rows': _row_count(response),
+        'ms': (time.perf_counter() - start) * 1000.0
+    }
+    metrics.record_call(call)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(call)
+
+
+def install_backend_hooks(client) -> None:
+    """Observe every PostgREST call made through a Supabase client (idempotent)."""
+    if hasattr(client, 'on_create'):
+        # Lazy client: hook the real one when it is first created
+        client.on_create(install_backend_hooks)
+        return
+    hooks = client.postgrest.session.event_hooks
+    if _on_request not in hooks['request']:
+        hooks['request'].append(_on_request)
+        hooks['response'].append(_on_response)
+
+
+def init_app(app, client) -> None:
+    """Time every request of a Flask app and add Server-Timing headers."""
+    from flask import g, request
+
+    install_backend_hooks(client)
+
+    @app.before_request
+    def _start_request_timer():
+        g.request_started = time.perf_counter()
+        g.request_trace = RequestTrace(parent=_current_trace.get())
+        g.request_trace_token = _current_trace.set(g.request_trace)
+
+    @app.after_request
+    def _finish_request_timer(response):
+        started = g.pop('request_started', None)
+        trace = g.pop('request_trace', None)
+        if started is None or trace is None:
+            return response
+
+        wall_ms = (time.perf_counter() - started) * 1000.0
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        # Cache warmer replays are not user traffic
+        if not route.startswith('/debug/') and not request.environ.get(WARM_ENVIRON):
+            metrics.record_request(route, wall_ms, trace, response.status_code)
+
+        response.headers['Server-Timing'] = (
+            f'app;dur={wall_ms:.1f}, '
+            f'db;dur={trace.backend_ms:.1f};desc="{len(trace.calls)} queries, {trace.rows} rows"'
+        )
+        return response
+
+    @app.teardown_request
+    def _clear_request_trace(exc=None):
+        token = g.pop('request_trace_token', None)
+        if token is not None:
+            _current_trace.reset(token)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """The trace of the request being served in this context, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def query_budget(max_queries: int, client=None):
+    """
+    Fail when a block makes more backend calls than allowed, e.g.
+
+        with query_budget(3):
+            client.get('/api/foundation/123/stats')
+
+    so N+1 query regressions surface as AssertionErrors in CI.
+    """
+    if client is not None:
+        install_backend_hooks(client)
+    trace = RequestTrace(parent=_current_trace.get())
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+    if len(trace.calls) > max_queries:
+        tables = ', '.join(f"{call['method']} {call['table']}" for call in trace.calls)
+        raise AssertionError(f"Expected at most {max_queries} backend queries, got {len(trace.calls)}: {tables}")
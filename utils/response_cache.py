@@ -0,0 +1,120 @@
+"""
+Pre-encoded response cache for grant_finder.
+Heavy JSON routes keep their successful responses as the encoded bytes,
+keyed by path and query string, in a process-wide LRU bounded by total size.
+A hit skips the backend, the per-field dict rebuilding and serialization
+entirely: the stored bytes go straight out with an ETag, or as a 304 when
+the client already has them. Entries expire after RESPONSE_CACHE_SECONDS
+and the whole cache is dropped when caches are re-warmed after an
+ingestion. GRANT_FINDER_RESPONSE_CACHE=0 turns it off.
+"""
+import functools
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+RESPONSE_CACHE_SECONDS = 300.0
+RESPONSE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def response_cache_enabled() -> bool:
+    return os.environ.get('GRANT_FINDER_RESPONSE_CACHE', '1') != '0'
+
+
+class ResponseCache:
+    """Path -> (expiry, encoded body, ETag), least recently used evicted first."""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_BYTES, ttl: float = RESPONSE_CACHE_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries: 'OrderedDict[str, Tuple[float, bytes, str]]' = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key: str, body: bytes, etag: str) -> None:
+        if len(body) > self.max_bytes // 4:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, body, etag)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, key: str) -> None:
+        _, body, _ = self.entries.pop(key)
+        self.size -= len(body)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+
+
+cache = ResponseCache()
+
+
+def cached_response(view):
+    """Route decorator: serve successful JSON GET responses from the cache, as stored bytes."""
+    from flask import current_app, request
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method != 'GET' or not response_cache_enabled():
+            return view(*args, **kwargs)
+
+        key = request.full_path
+        entry = cache.get(key)
+        if entry is not None:
+            body, etag = entry
+            response = current_app.response_class(body, mimetype='application/json')
+            response.set_etag(etag)
+            return response.make_conditional(request)
+
+        response = current_app.make_response(view(*args, **kwargs))
+        # Only plain JSON bodies; responses with their own encoding or ETag (pre-rendered profiles) pass through
+        if (response.status_code == 200 and response.mimetype == 'application/json' and not response.is_streamed
+                and 'Content-Encoding' not in response.headers and response.get_etag()[0] is None):
+            body = response.get_data()
+            etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+            cache.put(key, body, etag)
+            response.set_etag(etag)
+            return response.make_conditional(request)
+        return response
+
+    return wrapper
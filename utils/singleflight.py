@@ -0,0 +1,124 @@
+"""
+Single-flight request coalescing for grant_finder.
+Concurrent calls to a wrapped function with the same arguments share one
+execution: the first caller runs it, callers arriving while it is in flight
+wait for its result (or exception) instead of repeating the same backend
+work. Nothing is cached afterwards; the next call after it finishes runs
+again. Per-function counts of calls, executions and coalesced calls are kept
+for /debug/metrics.
+"""
+import functools
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Flight:
+    """One in-flight execution and the callers waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls by (name, key) and counts how many were shared."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights: Dict[Hashable, _Flight] = {}
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {
+            'calls': 0,
+            'executions': 0,
+            'coalesced': 0,
+            'errors': 0,
+            'max_waiters': 0
+        })
+
+    def do(self, name: str, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return fn(), or the result of an identical call already in flight."""
+        flight_key = (name, key)
+        with self.lock:
+            stats = self.stats[name]
+            stats['calls'] += 1
+            flight = self.flights.get(flight_key)
+            if flight is not None:
+                flight.waiters += 1
+                stats['coalesced'] += 1
+                stats['max_waiters'] = max(stats['max_waiters'], flight.waiters)
+                leader = False
+            else:
+                flight = self.flights[flight_key] = _Flight()
+                stats['executions'] += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            with self.lock:
+                self.stats[name]['errors'] += 1
+            raise
+        finally:
+            # Later callers start a new flight; waiters already hold this one
+            with self.lock:
+                self.flights.pop(flight_key, None)
+            flight.done.set()
+        return flight.result
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            functions = {name: dict(stats) for name, stats in sorted(self.stats.items())}
+            in_flight = len(self.flights)
+        calls = sum(stats['calls'] for stats in functions.values())
+        coalesced = sum(stats['coalesced'] for stats in functions.values())
+        return {
+            'calls': calls,
+            'coalesced': coalesced,
+            'coalesced_ratio': round(coalesced / calls, 4) if calls else 0.0,
+            'in_flight': in_flight,
+            'functions': functions
+        }
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stats.clear()
+
+
+flights = SingleFlight()
+
+
+def _freeze(value: Any) -> Hashable:
+    """A hashable stand-in for an argument (lists and dicts become tuples)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+def singleflight(fn: Callable) -> Callable:
+    """Decorator: concurrent calls with equal arguments share one execution of fn."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        try:
+            key = (_freeze(args), _freeze(kwargs))
+            hash(key)
+        except TypeError:
+            # Unhashable arguments: nothing to coalesce on
+            return fn(*args, **kwargs)
+        return flights.do(name, key, lambda: fn(*args, **kwargs))
+
+    return wrapper
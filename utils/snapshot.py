@@ -0,0 +1,272 @@
+"""
+Prebuilt data snapshot for grant_finder.
+build_snapshot.py writes the hot, slow-to-build data (foundation name index,
+global stats, EIN aggregates, search indexes) into one file that the app maps with mmap on
+cold start instead of scanning the database. Nothing is decoded up front:
+blobs are read as memoryviews and record sections are looked up by binary
+search over an 8-byte key table, so opening a snapshot takes milliseconds
+whatever its size.
+
+Layout: MAGIC, 8-byte header length, JSON header (section offsets), then
+8-byte aligned sections. A record section is [keys: int64 * n] (optional),
+[offsets: uint64 * (n + 1)] and the concatenated record bytes; an array
+section is a numpy array's raw bytes (dtype and shape in the header), read
+back with np.frombuffer over the mapping.
+"""
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+MAGIC = b'GFSNAP1\n'
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                     'snapshot', 'grant_finder.snap')
+
+
+def _pad(length: int) -> bytes:
+    return b'\0' * (-length % 8)
+
+
+class RecordSection:
+    """n byte records, optionally keyed by sorted int64 keys."""
+
+    def __init__(self, view: memoryview, count: int, keyed: bool):
+        self.count = count
+        position = 0
+        self.keys = None
+        if keyed:
+            self.keys = view[:count * 8].cast('q')
+            position = count * 8
+        self.offsets = view[position:position + (count + 1) * 8].cast('Q')
+        self.data = view[position + (count + 1) * 8:]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> memoryview:
+        return self.data[self.offsets[i]:self.offsets[i + 1]]
+
+    def find(self, key: int) -> Optional[memoryview]:
+        """The record stored under key, by binary search."""
+        i = bisect.bisect_left(self.keys, key)
+        if i < self.count and self.keys[i] == key:
+            return self[i]
+        return None
+
+
+class SnapshotWriter:
+    """Collects sections in memory and writes them atomically."""
+
+    def __init__(self):
+        self.sections: Dict[str, Dict] = {}
+        self.payloads: List[bytes] = []
+
+    def _add(self, name: str, kind: str, payload: bytes, **info) -> None:
+        self.sections[name] = dict(info, kind=kind, length=len(payload))
+        self.payloads.append(payload)
+
+    def add_blob(self, name: str, data: bytes) -> None:
+        self._add(name, 'blob', bytes(data))
+
+    def add_json(self, name: str, value) -> None:
+        self._add(name, 'json', json.dumps(value).encode('utf-8'))
+
+    def add_array(self, name: str, array) -> None:
+        """Store a numpy array's raw bytes, for Snapshot.array to map without decoding."""
+        self._add(name, 'array', array.tobytes(), dtype=array.dtype.str, shape=list(array.shape))
+
+    def add_records(self, name: str, records: Iterable[bytes], keys: Optional[List[int]] = None) -> None:
+        """Store records in order; with keys (ascending), they can be found by key."""
+        records = list(records)
+        if keys is not None and list(keys) != sorted(keys):
+            raise ValueError(f"Keys of section {name} must be sorted")
+        offsets = [0]
+        for record in records:
+            offsets.append(offsets[-1] + len(record))
+        parts = []
+        if keys is not None:
+            parts.append(struct.pack(f'<{len(records)}q', *keys))
+        parts.append(struct.pack(f'<{len(offsets)}Q', *offsets))
+        parts.extend(records)
+        self._add(name, 'records', b''.join(parts), count=len(records), keyed=keys is not None)
+
+    def add_name_index(self, name: str, names: List[str]) -> None:
+        """Store names (in the order they should be returned) for NameIndex substring search."""
+        upper = [n.upper().encode('utf-8') + b'\n' for n in names]
+        starts = [0]
+        for line in upper[:-1]:
+            starts.append(starts[-1] + len(line))
+        self.add_blob(f'{name}_upper', b''.join(upper))
+        self.add_records(name, (n.encode('utf-8') for n in names), keys=starts if names else [])
+
+    def write(self, path: str) -> int:
+        """Write the snapshot (via a temporary file, so readers never see half of it); returns its size."""
+        # Section offsets depend on the header length, which depends on the offsets: iterate until stable
+        header = {'built_at': int(time.time()), 'sections': self.sections}
+        encoded = b''
+        while True:
+            position = len(MAGIC) + 8 + len(encoded) + len(_pad(len(encoded)))
+            for name, payload in zip(self.sections, self.payloads):
+                self.sections[name]['offset'] = position
+                position += len(payload) + len(_pad(len(payload)))
+            previous, encoded = encoded, json.dumps(header).encode('utf-8')
+            if len(encoded) == len(previous):
+                break
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temporary = f'{path}.tmp'
+        with open(temporary, 'wb') as fh:
+            fh.write(MAGIC)
+            fh.write(struct.pack('<Q', len(encoded)))
+            fh.write(encoded + _pad(len(encoded)))
+            for payload in self.payloads:
+                fh.write(payload + _pad(len(payload)))
+            size = fh.tell()
+        os.replace(temporary, path)
+        return size
+
+
+class Snapshot:
+    """A snapshot file mapped read-only into memory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as fh:
+            self.mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a grant_finder snapshot")
+        (header_length,) = struct.unpack_from('<Q', self.mmap, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(self.mmap[start:start + header_length])
+        self.built_at: int = header['built_at']
+        self.sections: Dict[str, Dict] = header['sections']
+        self.view = memoryview(self.mmap)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.sections
+
+    def _view(self, name: str) -> memoryview:
+        section = self.sections[name]
+        return self.view[section['offset']:section['offset'] + section['length']]
+
+    def blob(self, name: str) -> memoryview:
+        return self._view(name)
+
+    def json(self, name: str):
+        return json.loads(bytes(self._view(name)))
+
+    def array(self, name: str):
+        """Read-only numpy view of an array section (no copy)."""
+        import numpy as np
+        section = self.sections[name]
+        return np.frombuffer(self._view(name), dtype=section['dtype']).reshape(section['shape'])
+
+    def records(self, name: str) -> RecordSection:
+        section = self.sections[name]
+        return RecordSection(self._view(name), section['count'], section['keyed'])
+
+
+class NameIndex:
+    """Case-insensitive substring search over a name list, run directly on the mapped file."""
+
+    def __init__(self, snapshot: Snapshot, name: str):
+        section = snapshot.sections[f'{name}_upper']
+        self.mmap = snapshot.mmap
+        self.start = section['offset']
+        self.end = section['offset'] + section['length']
+        self.names = snapshot.records(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _name(self, i: int) -> str:
+        return bytes(self.names[i]).decode('utf-8')
+
+    def all(self) -> List[str]:
+        return [self._name(i) for i in range(len(self.names))]
+
+    def search(self, query: str, limit: int = 50) -> List[str]:
+        """The first `limit` names containing query, in stored order."""
+        needle = query.upper().encode('utf-8')
+        if not needle:
+            return [self._name(i) for i in range(min(limit, len(self.names)))]
+        if b'\n' in needle:
+            return []
+
+        results = []
+        position = self.start
+        while len(results) < limit:
+            found = self.mmap.find(needle, position, self.end)
+            if found < 0:
+                break
+            line = bisect.bisect_right(self.names.keys, found - self.start) - 1
+            results.append(self._name(line))
+            # Resume at the next name so each name is returned once
+            if line + 1 >= len(self.names):
+                break
+            position = self.start + self.names.keys[line + 1]
+        return results
+
+
+_snapshot: Optional[Snapshot] = None
+_snapshot_loaded = False
+_snapshot_lock = threading.Lock()
+# Snapshots built before this time (the last data change) are stale and ignored
+_stale_before = 0
+
+
+def snapshot_path() -> str:
+    """GRANT_FINDER_SNAPSHOT, or snapshot/grant_finder.snap in the repository (empty disables snapshots)."""
+    return os.environ.get('GRANT_FINDER_SNAPSHOT', DEFAULT_SNAPSHOT_PATH)
+
+
+def is_stale(built_at: int) -> bool:
+    """Whether an artifact built at this time predates the last data change."""
+    return built_at < _stale_before
+
+
+def read_snapshot(path: str) -> Optional[Snapshot]:
+    """Map the snapshot file at path; None when it is missing, unreadable or built before the last data change."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        snapshot = Snapshot(path)
+    except Exception as e:
+        print(f"Error opening snapshot {path}: {e}")
+        return None
+    if is_stale(snapshot.built_at):
+        print(f"Ignoring snapshot {path}: built before the last data change")
+        return None
+    return snapshot
+
+
+def open_snapshot() -> Optional[Snapshot]:
+    """Return the process-wide snapshot, or None when there is none (or it is unreadable or stale)."""
+    global _snapshot, _snapshot_loaded
+    if not _snapshot_loaded:
+        with _snapshot_lock:
+            if not _snapshot_loaded:
+                _snapshot = read_snapshot(snapshot_path())
+                _snapshot_loaded = True
+    return _snapshot
+
+
+def reset_snapshot() -> None:
+    """Forget the mapped snapshot so the next open_snapshot() re-reads it (e.g. after a rebuild)."""
+    global _snapshot, _snapshot_loaded
+    with _snapshot_lock:
+        _snapshot = None
+        _snapshot_loaded = False
+
+
+def invalidate_snapshot() -> None:
+    """The data changed: drop the mapped snapshot and ignore files built before now until one is rebuilt."""
+    global _stale_before
+    with _snapshot_lock:
+        _stale_before = int(time.time())
+    reset_snapshot()
@@ -0,0 +1,144 @@
+"""
+Streaming frequency and cardinality summaries.
+SpaceSaving keeps an approximate top-K of a stream in bounded memory;
+HyperLogLog estimates the number of distinct values. Both update one item
+at a time and can be merged, so they are maintained while grants load.
+"""
+import hashlib
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+_NON_ALNUM = re.compile(r'[^A-Z0-9 ]+')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Uppercase and strip punctuation so 'General support.' == 'GENERAL SUPPORT'."""
+    if not value:
+        return ''
+    value = _NON_ALNUM.sub(' ', str(value).upper())
+    return _SPACES.sub(' ', value).strip()
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters (Metwally et al.).
+    Tracks at most `capacity` items; any item with true frequency above
+    n / capacity is guaranteed to be tracked, and each count overestimates
+    the truth by at most its recorded error.
+    """
+
+    __slots__ = ('capacity', 'n', 'counts', 'errors', 'labels')
+
+    def __init__(self, capacity: int = 32):
+        self.capacity = capacity
+        self.n = 0
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.labels: Dict[str, str] = {}
+
+    def update(self, key: str, weight: int = 1, label: Optional[str] = None) -> None:
+        """Count one occurrence of key (label is the display form, first seen wins)."""
+        if not key:
+            return
+        self.n += weight
+        if key in self.counts:
+            self.counts[key] += weight
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[key] = weight
+            self.errors[key] = 0
+        else:
+            # Replace the current minimum; the newcomer inherits its count as error
+            victim = min(self.counts, key=self.counts.get)
+            floor = self.counts.pop(victim)
+            self.errors.pop(victim)
+            self.labels.pop(victim, None)
+            self.counts[key] = floor + weight
+            self.errors[key] = floor
+        self.labels[key] = label or key
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """Combine two summaries, keeping the `capacity` largest counts."""
+        counts = dict(self.counts)
+        errors = dict(self.errors)
+        labels = dict(other.labels)
+        labels.update(self.labels)
+        for key, count in other.counts.items():
+            counts[key] = counts.get(key, 0) + count
+            errors[key] = errors.get(key, 0) + other.errors[key]
+        keep = sorted(counts, key=counts.get, reverse=True)[:self.capacity]
+        self.counts = {k: counts[k] for k in keep}
+        self.errors = {k: errors[k] for k in keep}
+        self.labels = {k: labels[k] for k in keep}
+        self.n += other.n
+        return self
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """Top k (label, estimated count), most frequent first; ties broken by label."""
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], self.labels[item[0]]))
+        return [(self.labels[key], count) for key, count in ranked[:k]]
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter; exact (a plain set) until it holds `exact_limit` values."""
+
+    __slots__ = ('p', 'exact_limit', 'values', 'registers')
+
+    def __init__(self, p: int = 10, exact_limit: int = 64):
+        self.p = p
+        self.exact_limit = exact_limit
+        self.values: Optional[set] = set()
+        self.registers: Optional[bytearray] = None
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def _switch_to_registers(self) -> None:
+        self.registers = bytearray(1 << self.p)
+        values, self.values = self.values, None
+        for value in values:
+            self._add_hashed(self._hash(value))
+
+    def _add_hashed(self, h: int) -> None:
+        index = h >> (64 - self.p)
+        rest = (h << self.p) & ((1 << 64) - 1)
+        rank = 64 - self.p + 1 if rest == 0 else (64 - rest.bit_length()) + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def add(self, value: str) -> None:
+        if not value:
+            return
+        if self.values is not None:
+            self.values.add(value)
+            if len(self.values) > self.exact_limit:
+                self._switch_to_registers()
+            return
+        self._add_hashed(self._hash(value))
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        if other.values is not None:
+            for value in other.values:
+                self.add(value)
+            return self
+        if self.values is not None:
+            self._switch_to_registers()
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        if self.values is not None:
+            return len(self.values)
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def __len__(self) -> int:
+        return self.count()
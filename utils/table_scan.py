@@ -0,0 +1,178 @@
+"""
+Paged table reads for grant_finder.
+Walks a Supabase table by primary-key keyset (key > last seen key, in
+fixed-size chunks) so full-table reads are neither truncated by the
+PostgREST max-rows limit nor slowed down by deep OFFSETs. Scans can be
+split into key-range partitions read in parallel, and independent queries
+can run concurrently.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from utils.supabase_client import supabase
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# PostgREST max-rows of the hosted project; larger chunks would come back short
+MAX_ROWS = 1000
+
+# Concurrent backend queries per parallel_map call
+PARALLEL_QUERIES = 8
+
+# Primary keys are lowercase UUID text, so the first hex digit splits them evenly
+_HEX_DIGITS = '0123456789abcdef'
+
+_DONE = object()
+
+
+def hex_boundaries(partitions: int) -> List[str]:
+    """Split points dividing UUID-like keys into `partitions` similar ranges (at most 16)."""
+    partitions = max(1, min(partitions, len(_HEX_DIGITS)))
+    return [_HEX_DIGITS[i * len(_HEX_DIGITS) // partitions] for i in range(1, partitions)]
+
+
+def _scan_range(
+    table: str,
+    columns: str,
+    key: str,
+    chunk_size: int,
+    where: Optional[Callable],
+    client,
+    low: Optional[str],
+    high: Optional[str]
+) -> Iterator[List[Dict]]:
+    """Chunks of rows with low <= key < high (None = unbounded), in key order."""
+    last = None
+    while True:
+        query = client.table(table).select(columns)
+        if where is not None:
+            query = where(query)
+        if last is not None:
+            query = query.gt(key, last)
+        elif low is not None:
+            query = query.gte(key, low)
+        if high is not None:
+            query = query.lt(key, high)
+        response = query.order(key).limit(chunk_size).execute()
+
+        rows = response.data or []
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1][key]
+
+
+def _parallel_chunks(ranges: List[Tuple], scan_args: Tuple) -> Iterator[List[Dict]]:
+    """Chunks from every key range, read on one thread per range, in arrival order."""
+    chunks = queue.Queue(maxsize=2 * len(ranges))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Give up once the consumer has gone away, so abandoned scans end
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker(low, high):
+        try:
+            for rows in _scan_range(*scan_args, low, high):
+                if not put(rows):
+                    return
+        except Exception as e:
+            put(e)
+        finally:
+            put(_DONE)
+
+    # Each worker runs in a copy of the caller's context so request tracing still sees its queries
+    for low, high in ranges:
+        threading.Thread(target=copy_context().run, args=(worker, low, high), daemon=True).start()
+
+    finished = 0
+    try:
+        while finished < len(ranges):
+            item = chunks.get()
+            if item is _DONE:
+                finished += 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
+
+
+def scan_table(
+    table: str,
+    columns: str = '*',
+    key: str = 'id',
+    chunk_size: int = MAX_ROWS,
+    where: Optional[Callable] = None,
+    partitions: int = 1,
+    boundaries: Optional[List[str]] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    client=None
+) -> Iterator[Dict]:
+    """
+    Yield every row of a table (or of where(query), e.g. lambda q: q.eq('state', 'CA')).
+    key must be unique (the primary key). With partitions > 1 the key space
+    is split at `boundaries` (default: hex_boundaries) and the ranges are
+    read in parallel; rows then arrive in no particular order. progress is
+    called with the running row count after every chunk. client defaults to
+    the app's Supabase client.
+    """
+    if columns != '*' and key not in [c.strip() for c in columns.split(',')]:
+        columns = f'{columns}, {key}'
+    scan_args = (table, columns, key, min(chunk_size, MAX_ROWS), where, client or supabase)
+
+    if partitions > 1 or boundaries:
+        splits = boundaries if boundaries is not None else hex_boundaries(partitions)
+        chunks = _parallel_chunks(list(zip([None] + splits, splits + [None])), scan_args)
+    else:
+        chunks = _scan_range(*scan_args, None, None)
+
+    scanned = 0
+    for rows in chunks:
+        yield from rows
+        scanned += len(rows)
+        if progress is not None:
+            progress(scanned)
+
+
+def progress_printer(label: str, every: int = 100000) -> Callable[[int], None]:
+    """A scan_table progress callback printing a line every `every` rows."""
+    state = {'next': every}
+
+    def report(scanned: int) -> None:
+        if scanned >= state['next']:
+            print(f"  {label}: {scanned:,} rows")
+            state['next'] = (scanned // every + 1) * every
+
+    return report
+
+
+def iter_table_rows(
+    table: str,
+    columns: str = '*',
+    order_by: str = 'id',
+    page_size: int = MAX_ROWS
+) -> Iterator[Dict]:
+    """Yield every row of a table in order_by (primary key) order, one page at a time."""
+    return scan_table(table, columns, key=order_by, chunk_size=page_size)
+
+
+def parallel_map(function: Callable, items: List, workers: int = PARALLEL_QUERIES) -> List:
+    """
+    function(item) for every item on a thread pool, results in item order.
+    Each call runs in a copy of the caller's context, so request tracing
+    (utils.request_metrics) still attributes its backend calls to the request.
+    """
+    if len(items) <= 1:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        futures = [pool.submit(copy_context().run, function, item) for item in items]
+        return [future.result() for future in futures]